@@ -12,7 +12,8 @@ Vamos usar FastAPI + Jinja2 por ser mais moderno e assíncrono
 from fastapi import FastAPI, Request, HTTPException, Depends
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
@@ -21,8 +22,10 @@ from typing import Optional
 import httpx
 
 from config import DashboardConfig, BotConfig
-from database.models import Event, Team, Match, User, Inscription, Payment
+from database.models import Event, Team, Match, User, Inscription, Payment, Bracket
 from database.manager import get_db_session
+from cogs.brackets_system import BracketVisualizer, CompactBracket
+from utils.render_cache import RenderCache, content_key
 
 # =============================================
 # INICIALIZAÇÃO DO FASTAPI
@@ -47,6 +50,9 @@ app.add_middleware(
 templates = Jinja2Templates(directory="dashboard/templates")
 app.mount("/static", StaticFiles(directory="dashboard/static"), name="static")
 
+# Mesmo diretório do bot: imagens geradas por um são servidas pelo outro
+render_cache = RenderCache()
+
 # =============================================
 # AUTENTICAÇÃO DISCORD OAUTH2
 # =============================================
@@ -253,6 +259,82 @@ async def get_bracket(event_id: int, db: AsyncSession = Depends(get_db_session))
     
     return bracket
 
+async def _bracket_render_data(event_id: int, db: AsyncSession) -> dict:
+    """Dados de desenho da chave salva do evento (404 se não houver)"""
+    result = await db.execute(select(Bracket).where(Bracket.event_id == event_id))
+    bracket_row = result.scalars().first()
+    # Grupos, Suíço e todos contra todos guardam outro formato em Bracket.data
+    if not bracket_row or not bracket_row.data or \
+            bracket_row.bracket_type not in ('single_elimination', 'double_elimination'):
+        raise HTTPException(status_code=404, detail="Chaveamento não encontrado")
+    
+    return BracketVisualizer.to_render_data(CompactBracket.from_json(bracket_row.data).to_dict())
+
+@app.get("/api/event/{event_id}/bracket.{extension}")
+async def get_bracket_image(
+    event_id: int,
+    extension: str,
+    compact: bool = False,
+    db: AsyncSession = Depends(get_db_session)
+):
+    """
+    Imagem do chaveamento (servida do cache quando a chave não mudou)
+    
+    bracket.png (com ?compact=true para a versão de 16 cores) ou bracket.svg
+    """
+    if extension == "svg":
+        image_format = "svg"
+    elif extension == "png":
+        image_format = "png_compact" if compact else "png"
+    else:
+        raise HTTPException(status_code=404, detail="Formato de imagem não suportado")
+    
+    render_data = await _bracket_render_data(event_id, db)
+    key = BracketVisualizer.cache_key(render_data, image_format)
+    
+    image = await render_cache.aget(key)
+    if image is None:
+        image = await run_in_threadpool(BracketVisualizer.render, render_data, image_format)
+        if image is None:
+            raise HTTPException(status_code=404, detail="Formato sem visualização")
+        await render_cache.aput(key, image)
+    
+    return Response(
+        content=image,
+        media_type=BracketVisualizer.IMAGE_FORMATS[image_format],
+        headers={"ETag": f'"{key}"'}
+    )
+
+@app.get("/api/event/{event_id}/bracket/tiles")
+async def get_bracket_tile_info(event_id: int, db: AsyncSession = Depends(get_db_session)):
+    """Tamanho da chave e níveis de zoom disponíveis para os blocos"""
+    info = BracketVisualizer.tile_info(await _bracket_render_data(event_id, db))
+    if info is None:
+        raise HTTPException(status_code=404, detail="Formato sem visualização")
+    return info
+
+@app.get("/api/event/{event_id}/bracket/tiles/{zoom}/{column}/{row}.png")
+async def get_bracket_tile(
+    event_id: int,
+    zoom: int,
+    column: int,
+    row: int,
+    db: AsyncSession = Depends(get_db_session)
+):
+    """Bloco da chave para navegação com zoom (gerado sob demanda e guardado no cache)"""
+    render_data = await _bracket_render_data(event_id, db)
+    key = content_key(BracketVisualizer.cache_key(render_data), tile=[zoom, column, row])
+    
+    png = await render_cache.aget(key)
+    if png is None:
+        # Só o bloco é desenhado; os já desenhados (e os níveis acima) ficam no cache do processo
+        png = await run_in_threadpool(BracketVisualizer.render_tile, render_data, zoom, column, row)
+        if png is None:
+            raise HTTPException(status_code=404, detail="Bloco fora da chave")
+        await render_cache.aput(key, png)
+    
+    return Response(content=png, media_type="image/png", headers={"ETag": f'"{key}"'})
+
 @app.get("/api/event/{event_id}/standings")
 async def get_standings(event_id: int, db: AsyncSession = Depends(get_db_session)):
     """Classificação dos times"""
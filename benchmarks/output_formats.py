@@ -0,0 +1,62 @@
+"""
+Benchmark dos Formatos de Saída do Chaveamento
+
+Compara tamanho do arquivo e tempo de renderização/codificação de cada
+formato de BracketVisualizer.render em chaves sintéticas.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.output_formats
+    python -m benchmarks.output_formats --teams 16 64 256 --repeat 5
+"""
+
+import argparse
+import statistics
+import time
+from types import SimpleNamespace
+
+from cogs.brackets_system import BracketGenerator, BracketVisualizer
+
+
+def synthetic_teams(count: int) -> list:
+    """Times falsos com nomes de tamanho variado (só o nome é desenhado)"""
+    return [SimpleNamespace(id=i + 1, name=f"Equipe {i + 1}" + " Esports" * (i % 3)) for i in range(count)]
+
+
+def measure(render_data: dict, image_format: str, repeat: int) -> tuple:
+    """(mediana em ms, tamanho em bytes); sem lineage, cada rodada compõe a imagem inteira"""
+    timings, size = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = BracketVisualizer.render(render_data, image_format)
+        timings.append((time.perf_counter() - started) * 1000)
+        size = len(output)
+    return statistics.median(timings), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--teams", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--types", nargs="+", default=["single", "double"], choices=["single", "double", "swiss"])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    generators = {
+        "single": lambda teams: BracketGenerator.create_single_elimination(teams, shuffle=False),
+        "double": lambda teams: BracketGenerator.create_double_elimination(teams, shuffle=False),
+        "swiss": BracketGenerator.create_swiss
+    }
+
+    print(f"{'tipo':<8}{'times':>6}  {'formato':<12}{'ms':>9}{'KB':>10}")
+    for bracket_type in args.types:
+        for count in args.teams:
+            render_data = BracketVisualizer.to_render_data(generators[bracket_type](synthetic_teams(count)))
+            # Primeira chamada aquece fontes e camada base (mesmo estado de um worker em uso)
+            BracketVisualizer.render(render_data)
+
+            for image_format in BracketVisualizer.IMAGE_FORMATS:
+                elapsed, size = measure(render_data, image_format, args.repeat)
+                print(f"{bracket_type:<8}{count:>6}  {image_format:<12}{elapsed:>9.1f}{size / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Benchmark de Renderização do Chaveamento
+
+Gera chaves sintéticas (8 a 512 times, todos os formatos de chave) e mede
+cada uma com BracketVisualizer: tempo de parede, pico de memória (RSS) e
+tamanho da saída. Cada caso roda em um processo novo, para que o pico de
+memória e os caches de um caso não contaminem o seguinte.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.render_suite run --output base.json
+    python -m benchmarks.render_suite run --types single --teams 64 256 --output novo.json
+    python -m benchmarks.render_suite compare base.json novo.json --threshold 0.10
+
+O compare sai com código 1 se algum caso ficou mais lento, mais pesado
+ou maior que o limite, então pode ser usado como verificação antes do merge.
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows: sem getrusage, o RSS fica de fora
+    resource = None
+
+BRACKET_TYPES = ["single", "double", "swiss", "groups"]
+TEAM_COUNTS = [8, 16, 32, 64, 128, 256, 512]
+
+# Métricas comparadas (menor é melhor)
+METRICS = ["cold_ms", "warm_ms", "update_ms", "peak_rss_mb", "bytes"]
+
+# Variações de tempo abaixo disso são ruído, mesmo que passem do limite percentual
+MIN_TIME_CHANGE_MS = 5.0
+
+# =============================================
+# CASOS
+# =============================================
+
+def peak_rss_mb() -> Optional[float]:
+    """Pico de RSS do processo atual em MB"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB, macOS em bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def build_bracket(bracket_type: str, teams: list) -> Dict:
+    from cogs.brackets_system import BracketGenerator
+
+    if bracket_type == "single":
+        return BracketGenerator.create_single_elimination(teams, shuffle=False)
+    if bracket_type == "double":
+        return BracketGenerator.create_double_elimination(teams, shuffle=False)
+    if bracket_type == "swiss":
+        return BracketGenerator.create_swiss(teams)
+    if bracket_type == "groups":
+        return BracketGenerator.create_groups(teams, seed=1)
+    raise ValueError(f"Tipo de chave desconhecido: {bracket_type}")
+
+
+def run_case(bracket_type: str, team_count: int, image_format: str, repeat: int) -> Optional[Dict]:
+    """
+    Mede um caso (roda no processo filho)
+
+    cold_ms: primeira renderização (fontes, camada base e paleta ainda vazias)
+    warm_ms: mediana das seguintes, sem lineage (imagem inteira composta)
+    update_ms: com lineage, depois de registrar um resultado (só eliminatórias)
+    """
+    from benchmarks.output_formats import synthetic_teams
+    from cogs.brackets_system import BracketState, BracketVisualizer
+
+    bracket = build_bracket(bracket_type, synthetic_teams(team_count))
+    render_data = BracketVisualizer.to_render_data(bracket)
+
+    def render(data: Dict, lineage: Optional[str] = None) -> Optional[bytes]:
+        if data["type"] == "groups":
+            pages = BracketVisualizer.render_group_pages(data, image_format=image_format)
+            return b"".join(pages) if pages else None
+        return BracketVisualizer.render(data, image_format, lineage)
+
+    started = time.perf_counter()
+    output = render(render_data)
+    cold_ms = (time.perf_counter() - started) * 1000
+    if output is None:
+        return None
+
+    warm = []
+    for _ in range(max(1, repeat - 1)):
+        started = time.perf_counter()
+        render(render_data)
+        warm.append((time.perf_counter() - started) * 1000)
+
+    update_ms = None
+    if bracket_type in ("single", "double") and image_format != "svg":
+        render(render_data, "benchmark")
+        state = BracketState(bracket)
+        match = bracket["rounds"][0]["matches"][0]
+        key = state.find_pending_match(match["team1"])
+        if key is not None:
+            state.record_result(key, match["team1"])
+            updated = BracketVisualizer.to_render_data(state.bracket)
+            started = time.perf_counter()
+            render(updated, "benchmark")
+            update_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    return {
+        "type": bracket_type,
+        "teams": team_count,
+        "format": image_format,
+        "cold_ms": round(cold_ms, 1),
+        "warm_ms": round(statistics.median(warm), 1),
+        "update_ms": update_ms,
+        "peak_rss_mb": peak_rss_mb(),
+        "bytes": len(output)
+    }
+
+
+def run_isolated(bracket_type: str, team_count: int, image_format: str, repeat: int) -> Optional[Dict]:
+    """Roda o caso em um processo novo (spawn) e devolve o resultado"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(run_case, bracket_type, team_count, image_format, repeat).result()
+
+# =============================================
+# RESULTADOS
+# =============================================
+
+def metadata() -> Dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    import PIL
+
+    return {
+        "commit": commit,
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pillow": PIL.__version__,
+        "platform": platform.platform()
+    }
+
+
+def case_key(result: Dict) -> tuple:
+    return result["type"], result["teams"], result["format"]
+
+
+def print_results(results: List[Dict]):
+    print(f"{'tipo':<8}{'times':>6}  {'formato':<12}{'frio ms':>9}{'quente ms':>11}"
+          f"{'update ms':>11}{'RSS MB':>9}{'KB':>10}")
+    for result in results:
+        update = "-" if result["update_ms"] is None else f"{result['update_ms']:.1f}"
+        rss = "-" if result["peak_rss_mb"] is None else f"{result['peak_rss_mb']:.1f}"
+        print(f"{result['type']:<8}{result['teams']:>6}  {result['format']:<12}{result['cold_ms']:>9.1f}"
+              f"{result['warm_ms']:>11.1f}{update:>11}{rss:>9}{result['bytes'] / 1024:>10.1f}")
+
+
+def compare(base: Dict, new: Dict, threshold: float) -> int:
+    """Mostra a variação de cada métrica e conta as regressões acima do limite"""
+    base_results = {case_key(result): result for result in base["results"]}
+    regressions = 0
+
+    print(f"base: {base['meta'].get('commit')}  novo: {new['meta'].get('commit')}  limite: {threshold:.0%}")
+    for result in new["results"]:
+        previous = base_results.get(case_key(result))
+        if previous is None:
+            continue
+
+        changes = []
+        for metric in METRICS:
+            old_value, new_value = previous.get(metric), result.get(metric)
+            if not old_value or new_value is None:
+                continue
+            change = new_value / old_value - 1
+            noise = metric.endswith("_ms") and new_value - old_value < MIN_TIME_CHANGE_MS
+            flag = ""
+            if change > threshold and not noise:
+                flag = " !"
+                regressions += 1
+            changes.append(f"{metric} {change:+.0%}{flag}")
+
+        label = f"{result['type']} {result['teams']} {result['format']}"
+        print(f"{label:<28}" + "  ".join(changes))
+
+    print(f"\n{regressions} regressão(ões) acima de {threshold:.0%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="mede os casos e grava o JSON")
+    run_parser.add_argument("--types", nargs="+", default=BRACKET_TYPES, choices=BRACKET_TYPES)
+    run_parser.add_argument("--teams", type=int, nargs="+", default=TEAM_COUNTS)
+    run_parser.add_argument("--formats", nargs="+", default=None, help="padrão: todos de IMAGE_FORMATS")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--output", default=None, help="arquivo JSON de resultados")
+
+    compare_parser = subparsers.add_parser("compare", help="compara dois JSON de resultados")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.10)
+
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        with open(args.base, encoding="utf-8") as base_file, open(args.new, encoding="utf-8") as new_file:
+            regressions = compare(json.load(base_file), json.load(new_file), args.threshold)
+        sys.exit(1 if regressions else 0)
+
+    from cogs.brackets_system import BracketVisualizer
+
+    formats = args.formats or list(BracketVisualizer.IMAGE_FORMATS)
+    results = []
+    for bracket_type in args.types:
+        for team_count in args.teams:
+            for image_format in formats:
+                result = run_isolated(bracket_type, team_count, image_format, args.repeat)
+                if result is not None:
+                    results.append(result)
+
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump({"meta": metadata(), "results": results}, output_file, indent=2, ensure_ascii=False)
+        print(f"\nResultados gravados em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,35 @@
 import discord
 from discord import app_commands
-from discord.ext import commands
-from typing import List, Dict, Optional
+from discord.ext import commands, tasks
+from typing import Callable, List, Dict, Iterator, Optional
+import asyncio
 import random
 import math
+import json
+import struct
+import sys
+import threading
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
-from PIL import Image, ImageDraw, ImageFont
+from itertools import islice
+from xml.sax.saxutils import escape
+import numpy as np
+from PIL import Image, ImageColor, ImageDraw
+from loguru import logger
 
-from config import BotConfig, TournamentPhases
+from sqlalchemy import Index, insert, select, update
+
+from config import BotConfig, Messages, TournamentPhases
 from database.models import Event, Team, Match, Bracket, PhaseType
+from database.manager import get_db_session
+from utils.render_pool import RenderFailed, RenderPool, RenderQueueFull, RenderTimeout
+from utils.render_cache import RenderCache, content_key
+from utils.fonts import fit_text, load_font
+
+# /avancar_fase e /resultado_chave só leem as partidas de uma fase
+ix_match_event_phase = Index('ix_match_event_phase', Match.event_id, Match.phase)
 
 class BracketGenerator:
     """Gerador de chaveamentos para torneios"""
@@ -20,15 +41,55 @@ class BracketGenerator:
             # Deve ser potência de 2
             return teams_count > 0 and (teams_count & (teams_count - 1)) == 0
         elif bracket_type == "groups":
-            # Múltiplo de 4 (grupos de 4)
-            return teams_count >= 8 and teams_count % 4 == 0
+            # Pelo menos dois grupos de 3 (grupos incompletos são permitidos)
+            return teams_count >= 6
         return True
     
     @staticmethod
-    def create_single_elimination(teams: List[Team]) -> Dict:
+    def seeding_order(bracket_size: int) -> List[int]:
+        """
+        Ordem padrão das sementes nas vagas da 1ª rodada
+        
+        Ex.: 8 vagas -> [1, 8, 4, 5, 2, 7, 3, 6]. A semente 1 enfrenta a
+        última e as sementes 1 e 2 só podem se cruzar na final.
+        """
+        order = [1]
+        while len(order) < bracket_size:
+            size = len(order) * 2
+            order = [slot for seed in order for slot in (seed, size + 1 - seed)]
+        return order
+    
+    @staticmethod
+    def shuffle_seed_pots(teams: List[Team], rng: random.Random) -> List[Team]:
+        """
+        Sorteia a ordem dentro de cada pote de sementes
+        
+        Potes: [1], [2], [3-4], [5-8], [9-16]... Um time nunca sai do seu pote.
+        """
+        teams = list(teams)
+        start = 1
+        while start < len(teams):
+            end = min(len(teams), start * 2)
+            pot = teams[start:end]
+            rng.shuffle(pot)
+            teams[start:end] = pot
+            start = end
+        return teams
+    
+    @staticmethod
+    def create_single_elimination(
+        teams: List[Team],
+        shuffle: bool = True,
+        seed: Optional[int] = None
+    ) -> Dict:
         """
         Cria chaveamento de eliminatória simples
         
+        A ordem de `teams` é a ordem das sementes (1ª posição = cabeça de chave 1).
+        Byes ficam com as melhores sementes, então dois byes nunca se enfrentam.
+        Com shuffle, sorteia só dentro dos potes de sementes; `seed` torna o
+        sorteio reproduzível.
+        
         Returns:
             {
                 'rounds': [
@@ -45,18 +106,18 @@ class BracketGenerator:
         """
         teams_count = len(teams)
         
-        # Verificar se é potência de 2
-        if not BracketGenerator.validate_teams_count(teams_count, "single_elimination"):
-            # Adicionar "bye" (vagas vazias) até a próxima potência de 2
-            next_power = 2 ** math.ceil(math.log2(teams_count))
-            teams = teams + [None] * (next_power - teams_count)
-            teams_count = next_power
+        # Sortear dentro dos potes de sementes
+        if shuffle:
+            teams = BracketGenerator.shuffle_seed_pots(teams, random.Random(seed))
         
-        # Embaralhar times
-        random.shuffle(teams)
+        # Completar com "bye" (vagas vazias) até a próxima potência de 2
+        bracket_size = 2 ** math.ceil(math.log2(teams_count)) if teams_count > 1 else 2
         
         rounds = []
-        current_teams = teams.copy()
+        current_teams = [
+            teams[seed_number - 1] if seed_number <= teams_count else None
+            for seed_number in BracketGenerator.seeding_order(bracket_size)
+        ]
         round_number = 1
         
         while len(current_teams) > 1:
@@ -88,15 +149,149 @@ class BracketGenerator:
         return {'rounds': rounds, 'type': 'single_elimination'}
     
     @staticmethod
-    def create_double_elimination(teams: List[Team]) -> Dict:
-        """Cria chaveamento de eliminatória dupla (Winners + Losers bracket)"""
-        # TODO: Implementar dupla eliminação
-        pass
+    def create_double_elimination(
+        teams: List[Team],
+        grand_final_reset: bool = True,
+        shuffle: bool = True,
+        seed: Optional[int] = None
+    ) -> Dict:
+        """
+        Cria chaveamento de eliminatória dupla (Winners + Losers bracket)
+        
+        Returns:
+            Mesmo formato de create_single_elimination ('rounds' é o winners
+            bracket) mais a chave dos perdedores e a grande final:
+            {
+                'rounds': [...],
+                'losers_rounds': [
+                    {'name': 'Losers - Rodada 1', 'phase': 'L1', 'matches': [...]},
+                    ...
+                ],
+                'grand_final': {'team1': None, 'team2': None, 'match_number': 1,
+                                'winner': None, 'reset': True},
+                'type': 'double_elimination'
+            }
+            
+            Cada partida do winners bracket recebe 'loser_to' indicando para onde
+            cai o perdedor: {'round': índice em losers_rounds (ou 'grand_final'),
+            'match': índice da partida, 'slot': 'team1'/'team2'}
+        """
+        bracket = BracketGenerator.create_single_elimination(teams, shuffle, seed)
+        winners = bracket['rounds']
+        total_wb = len(winners)
+        
+        def empty_match(number: int) -> Dict:
+            return {'team1': None, 'team2': None, 'match_number': number, 'winner': None}
+        
+        # Rodada j dos perdedores:
+        #   j = 0        -> perdedores da 1ª rodada do winners se enfrentam
+        #   j ímpar      -> vencedores de j-1 recebem quem cai da rodada (j+1)/2 do winners
+        #   j par (> 0)  -> vencedores de j-1 se enfrentam entre si
+        losers_rounds = []
+        for j in range(2 * (total_wb - 1)):
+            if j == 0:
+                count = len(winners[0]['matches']) // 2
+            elif j % 2 == 1:
+                count = len(losers_rounds[j - 1]['matches'])
+            else:
+                count = len(losers_rounds[j - 1]['matches']) // 2
+            
+            losers_rounds.append({
+                'name': f'Losers - Rodada {j + 1}',
+                'phase': f'L{j + 1}',
+                'matches': [empty_match(i + 1) for i in range(count)]
+            })
+        
+        # Mapeamento de queda (winners -> losers)
+        for i, match in enumerate(winners[0]['matches']):
+            if losers_rounds:
+                match['loser_to'] = {'round': 0, 'match': i // 2, 'slot': 'team1' if i % 2 == 0 else 'team2'}
+            else:
+                match['loser_to'] = {'round': 'grand_final', 'match': 0, 'slot': 'team2'}
+        
+        for r in range(1, total_wb):
+            j = 2 * r - 1
+            matches = winners[r]['matches']
+            count = len(matches)
+            for i, match in enumerate(matches):
+                # Inverte a ordem em rodadas alternadas para evitar revanches imediatas
+                target = count - 1 - i if r % 2 == 1 else i
+                match['loser_to'] = {'round': j, 'match': target, 'slot': 'team2'}
+        
+        grand_final = empty_match(1)
+        grand_final['reset'] = grand_final_reset
+        
+        return {
+            'rounds': winners,
+            'losers_rounds': losers_rounds,
+            'grand_final': grand_final,
+            'type': 'double_elimination'
+        }
+    
+    @staticmethod
+    def _assign_pot(
+        pot: List[Team],
+        groups: List[List[Team]],
+        rng: random.Random,
+        org_key: Optional[Callable[[Team], Optional[str]]] = None
+    ):
+        """
+        Coloca cada time do pote em um grupo diferente
+        
+        Usa emparelhamento com caminhos aumentantes para respeitar a restrição
+        de organização sempre que existir uma distribuição válida. Se não
+        existir, os times que sobrarem vão para os grupos livres mesmo assim.
+        """
+        def org(team: Team) -> Optional[str]:
+            return org_key(team) if org_key else None
+        
+        used_orgs = [{org(team) for team in group} - {None} for group in groups]
+        
+        candidates = []
+        for team in pot:
+            allowed = [g for g in range(len(groups)) if org(team) is None or org(team) not in used_orgs[g]]
+            rng.shuffle(allowed)
+            candidates.append(allowed)
+        
+        owner: Dict[int, int] = {}  # grupo -> índice no pote
+        
+        def augment(i: int, seen: set) -> bool:
+            for g in candidates[i]:
+                if g in seen:
+                    continue
+                seen.add(g)
+                if g not in owner or augment(owner[g], seen):
+                    owner[g] = i
+                    return True
+            return False
+        
+        unmatched = [i for i in range(len(pot)) if not augment(i, set())]
+        free_groups = [g for g in range(len(groups)) if g not in owner]
+        rng.shuffle(free_groups)
+        for i, g in zip(unmatched, free_groups):
+            owner[g] = i
+        
+        for g, i in owner.items():
+            groups[g].append(pot[i])
     
     @staticmethod
-    def create_groups(teams: List[Team], teams_per_group: int = 4) -> Dict:
+    def create_groups(
+        teams: List[Team],
+        teams_per_group: int = 4,
+        shuffle: bool = True,
+        seed: Optional[int] = None,
+        org_key: Optional[Callable[[Team], Optional[str]]] = None,
+        tiebreakers: Optional[List[str]] = None
+    ) -> Dict:
         """
-        Cria fase de grupos
+        Cria fase de grupos por potes de sementes
+        
+        A ordem de `teams` é a ordem das sementes. O pote 1 tem as melhores
+        sementes (uma por grupo), o pote 2 as seguintes e assim por diante;
+        cada pote é sorteado entre os grupos. Nenhum time fica de fora: se a
+        divisão não for exata, alguns grupos ficam com um time a menos.
+        Com `org_key`, dois times da mesma organização não caem no mesmo grupo
+        (quando isso for possível).
         
         Returns:
             {
@@ -104,267 +299,3057 @@ class BracketGenerator:
                     {
                         'name': 'Grupo A',
                         'teams': [Team1, Team2, Team3, Team4],
-                        'matches': [...]
+                        'rounds': [...],  # ver iter_round_robin
+                        'matches': [...],  # todas as partidas do grupo
+                        'standings': GroupStandings
                     },
                     ...
-                ]
+                ],
+                'type': 'groups'
             }
         """
-        teams_count = len(teams)
-        groups_count = teams_count // teams_per_group
+        rng = random.Random(seed)
+        groups_count = max(1, math.ceil(len(teams) / teams_per_group))
+        members: List[List[Team]] = [[] for _ in range(groups_count)]
         
-        # Embaralhar times
-        random.shuffle(teams)
+        for start in range(0, len(teams), groups_count):
+            pot = list(teams[start:start + groups_count])
+            if shuffle:
+                rng.shuffle(pot)
+            BracketGenerator._assign_pot(pot, members, rng, org_key)
         
+        return BracketGenerator._group_stage(members, tiebreakers)
+    
+    @staticmethod
+    def _group_stage(members: List[List[Team]], tiebreakers: Optional[List[str]] = None) -> Dict:
+        """Grupos a partir dos times já sorteados (mesma estrutura de create_groups)"""
         groups = []
-        for i in range(groups_count):
+        for i, group_teams in enumerate(members):
             group_letter = chr(65 + i)  # A, B, C, ...
-            group_teams = teams[i * teams_per_group:(i + 1) * teams_per_group]
             
-            # Criar confrontos do grupo (todos contra todos)
-            matches = []
-            for j, team1 in enumerate(group_teams):
-                for team2 in group_teams[j + 1:]:
-                    matches.append({
-                        'team1': team1,
-                        'team2': team2,
-                        'match_number': len(matches) + 1
-                    })
+            # Rodadas do grupo pelo método do círculo (cada time joga uma vez por rodada)
+            rounds = list(BracketGenerator.iter_round_robin(group_teams, home_away=False))
             
             groups.append({
                 'name': f'Grupo {group_letter}',
                 'teams': group_teams,
-                'matches': matches
+                'rounds': rounds,
+                'matches': [match for round_data in rounds for match in round_data['matches']],
+                'standings': GroupStandings(group_teams, tiebreakers)
             })
         
         return {'groups': groups, 'type': 'groups'}
     
+    @staticmethod
+    def record_group_result(group: Dict, match: Dict, winner: Optional[Team], kills1: int = 0, kills2: int = 0):
+        """Registra uma partida do grupo (winner=None é empate; abates na ordem team1, team2)"""
+        if winner is None:
+            match['draw'] = True
+        else:
+            match['winner'] = winner
+        match['kills'] = (kills1, kills2)
+        group['standings'].record_result(match['team1'], match['team2'], winner, kills1, kills2)
+    
+    @staticmethod
+    def group_stage_state(stage: Dict) -> Dict:
+        """
+        Fase de grupos em dados simples, para salvar
+        
+        Os times ficam de fora: a ordem esperada em group_stage_from_state é
+        a dos grupos (todos do A, depois do B...). Resultados são
+        [grupo, partida, vencedor (1, 2 ou 0 = empate), abates1, abates2].
+        """
+        results = []
+        for g, group in enumerate(stage['groups']):
+            for m, match in enumerate(group['matches']):
+                if match.get('draw'):
+                    winner = 0
+                elif match['winner'] is not None:
+                    winner = 1 if match['winner'] is match['team1'] else 2
+                else:
+                    continue
+                results.append([g, m, winner, *match.get('kills', (0, 0))])
+        
+        groups = stage['groups']
+        return {
+            'sizes': [len(group['teams']) for group in groups],
+            'tiebreakers': groups[0]['standings'].tiebreakers if groups else None,
+            'results': results
+        }
+    
+    @staticmethod
+    def group_stage_from_state(state: Dict, teams: List[Team]) -> Dict:
+        """Refaz a fase de grupos salva por group_stage_state, reaplicando os resultados"""
+        members = []
+        start = 0
+        for size in state['sizes']:
+            members.append(list(teams[start:start + size]))
+            start += size
+        
+        stage = BracketGenerator._group_stage(members, state['tiebreakers'])
+        for g, m, winner, kills1, kills2 in state['results']:
+            group = stage['groups'][g]
+            match = group['matches'][m]
+            team = None if winner == 0 else match['team1' if winner == 1 else 'team2']
+            BracketGenerator.record_group_result(group, match, team, kills1, kills2)
+        return stage
+    
+    @staticmethod
+    def create_knockout_from_groups(groups_data: Dict, qualifiers: int = 2) -> Dict:
+        """
+        Monta a eliminatória com os classificados de cada grupo
+        
+        Os primeiros colocados são as melhores sementes. Os segundos são
+        encaixados de forma que ninguém reencontre um time do próprio grupo
+        na 1ª rodada.
+        """
+        groups = groups_data['groups']
+        groups_count = len(groups)
+        placements = [
+            [row['team'] for row in group['standings'].standings()[:qualifiers]]
+            for group in groups
+        ]
+        
+        seeds = []
+        for place in range(qualifiers):
+            tier: List[Optional[Team]] = [None] * groups_count
+            for k in range(1, groups_count + 1):
+                # Semente k (1º do grupo k) enfrenta a vaga G-k do pote seguinte
+                group_index = (k - 1 + place) % groups_count
+                position = k - 1 if place == 0 else groups_count - k
+                if place < len(placements[group_index]):
+                    tier[position] = placements[group_index][place]
+            seeds.extend(team for team in tier if team is not None)
+        
+        return BracketGenerator.create_single_elimination(seeds, shuffle=False)
+    
     @staticmethod
     def create_swiss(teams: List[Team], rounds: int = None) -> Dict:
-        """Sistema Suíço - times com pontuação similar enfrentam-se"""
-        if rounds is None:
-            rounds = math.ceil(math.log2(len(teams)))
+        """
+        Sistema Suíço - times com pontuação similar enfrentam-se
         
-        # TODO: Implementar sistema suíço
-        pass
+        Returns:
+            {
+                'rounds': [primeira rodada],
+                'rounds_total': 5,
+                'swiss': SwissSystem,  # registra resultados e gera as próximas rodadas
+                'type': 'swiss'
+            }
+        """
+        swiss = SwissSystem(teams, rounds)
+        swiss.pair_next_round()
+        return BracketGenerator.swiss_bracket(swiss)
     
     @staticmethod
-    def create_round_robin(teams: List[Team]) -> Dict:
-        """Todos contra todos"""
-        matches = []
-        for i, team1 in enumerate(teams):
-            for team2 in teams[i + 1:]:
-                matches.append({
+    def swiss_bracket(swiss: "SwissSystem") -> Dict:
+        """Chave do Suíço (formato de create_swiss) em volta de um SwissSystem já existente"""
+        return {
+            'rounds': swiss.rounds,
+            'rounds_total': swiss.rounds_total,
+            'swiss': swiss,
+            'type': 'swiss'
+        }
+    
+    @staticmethod
+    def iter_round_robin(
+        teams: List[Team],
+        home_away: bool = True,
+        lobbies: Optional[int] = None
+    ) -> Iterator[Dict]:
+        """
+        Gera as rodadas do todos contra todos pelo método do círculo, uma por vez
+        
+        Cada time joga no máximo uma vez por rodada. Com número ímpar de times
+        um deles folga ('bye') em cada rodada. Com home_away, team1 é o
+        mandante e os mandos ficam equilibrados; com lobbies, as partidas da
+        rodada são distribuídas entre as salas 1..lobbies.
+        """
+        slots = list(teams)
+        if len(slots) % 2 == 1:
+            # A vaga fixa vira a folga, assim os mandos fecham equilibrados
+            slots.insert(0, None)
+        
+        total = len(slots)
+        fixed, rotating = slots[0], slots[1:]
+        
+        for round_idx in range(total - 1):
+            lineup = [fixed] + rotating
+            matches = []
+            bye = None
+            
+            for i in range(total // 2):
+                team1, team2 = lineup[i], lineup[total - 1 - i]
+                if team1 is None or team2 is None:
+                    bye = team1 or team2
+                    continue
+                
+                # Alterna o mando do time fixo a cada rodada e dos demais pela posição
+                if home_away and ((i == 0 and round_idx % 2 == 1) or (i > 0 and i % 2 == 1)):
+                    team1, team2 = team2, team1
+                
+                match = {
                     'team1': team1,
                     'team2': team2,
-                    'match_number': len(matches) + 1
-                })
+                    'match_number': len(matches) + 1,
+                    'winner': None
+                }
+                if lobbies:
+                    match['lobby'] = len(matches) % lobbies + 1
+                matches.append(match)
+            
+            yield {
+                'name': f'Rodada {round_idx + 1}',
+                'phase': f'R{round_idx + 1}',
+                'matches': matches,
+                'bye': bye
+            }
+            
+            rotating = [rotating[-1]] + rotating[:-1]
+    
+    @staticmethod
+    def create_round_robin(
+        teams: List[Team],
+        home_away: bool = True,
+        lobbies: Optional[int] = None
+    ) -> Dict:
+        """
+        Todos contra todos
+        
+        As rodadas não são montadas aqui: 'rounds' é o gerador e, como a
+        ordem dos times e as opções ficam na chave, qualquer trecho da tabela
+        pode ser gerado de novo com iter_round_robin (ex.: uma página da
+        imagem), sem expandir as outras rodadas.
+        
+        Returns:
+            {
+                'rounds': <gerador de rodadas>,  # ver iter_round_robin
+                'rounds_total': 19,
+                'matches_total': 190,
+                'teams': [...],  # ordem usada no método do círculo
+                'home_away': True,
+                'lobbies': None,
+                'type': 'round_robin'
+            }
+        """
+        teams_count = len(teams)
         
         return {
-            'matches': matches,
+            'rounds': BracketGenerator.iter_round_robin(teams, home_away, lobbies),
+            'rounds_total': teams_count - 1 if teams_count % 2 == 0 else teams_count,
+            'matches_total': teams_count * (teams_count - 1) // 2,
+            'teams': list(teams),
+            'home_away': home_away,
+            'lobbies': lobbies,
             'type': 'round_robin'
         }
 
-class BracketVisualizer:
-    """Gera visualização gráfica do chaveamento"""
+class GroupStandings:
+    """
+    Classificação de um grupo, atualizada a cada resultado registrado
     
-    @staticmethod
-    def generate_bracket_image(bracket_data: Dict) -> BytesIO:
-        """Gera imagem do chaveamento"""
+    Critérios de desempate disponíveis (aplicados na ordem informada):
+        'points'        -> pontos (vitória e empate configuráveis)
+        'wins'          -> vitórias
+        'kills'         -> abates
+        'head_to_head'  -> pontos só nos jogos entre os times empatados
+    Persistindo o empate, vale a ordem das sementes.
+    """
+    
+    TIEBREAKERS = ('points', 'wins', 'kills', 'head_to_head')
+    
+    def __init__(
+        self,
+        teams: List[Team],
+        tiebreakers: Optional[List[str]] = None,
+        points_win: int = 3,
+        points_draw: int = 1
+    ):
+        self.tiebreakers = list(tiebreakers or GroupStandings.TIEBREAKERS)
+        invalid = [name for name in self.tiebreakers if name not in GroupStandings.TIEBREAKERS]
+        if invalid:
+            raise ValueError(f"Critério de desempate inválido: {', '.join(invalid)}")
         
-        if bracket_data['type'] == 'single_elimination':
-            return BracketVisualizer._draw_single_elimination(bracket_data)
-        elif bracket_data['type'] == 'groups':
-            return BracketVisualizer._draw_groups(bracket_data)
+        self.teams = list(teams)
+        self.points_win = points_win
+        self.points_draw = points_draw
+        self._index = {id(team): i for i, team in enumerate(self.teams)}
         
-        return None
+        size = len(self.teams)
+        self.points = [0] * size
+        self.wins = [0] * size
+        self.draws = [0] * size
+        self.losses = [0] * size
+        self.kills = [0] * size
+        self.played = [0] * size
+        self.head_to_head: Dict[tuple, int] = {}  # (i, j) -> pontos de i contra j
+    
+    def __contains__(self, team: Team) -> bool:
+        return id(team) in self._index
+    
+    def record_result(self, team1: Team, team2: Team, winner: Optional[Team], kills1: int = 0, kills2: int = 0):
+        """Soma um resultado (winner=None é empate) sem recalcular o grupo"""
+        a, b = self._index[id(team1)], self._index[id(team2)]
+        
+        if winner is None:
+            gained = {a: self.points_draw, b: self.points_draw}
+            self.draws[a] += 1
+            self.draws[b] += 1
+        else:
+            w = self._index[id(winner)]
+            l = b if w == a else a
+            gained = {w: self.points_win, l: 0}
+            self.wins[w] += 1
+            self.losses[l] += 1
+        
+        for i, j in ((a, b), (b, a)):
+            self.points[i] += gained[i]
+            self.played[i] += 1
+            self.head_to_head[(i, j)] = self.head_to_head.get((i, j), 0) + gained[i]
+        self.kills[a] += kills1
+        self.kills[b] += kills2
+    
+    def _values(self, criterion: str, cluster: List[int]) -> Dict[int, int]:
+        if criterion == 'head_to_head':
+            return {i: sum(self.head_to_head.get((i, j), 0) for j in cluster if j != i) for i in cluster}
+        column = getattr(self, criterion)
+        return {i: column[i] for i in cluster}
+    
+    def standings(self) -> List[Dict]:
+        """Classificação atual aplicando os critérios em sequência"""
+        clusters = [list(range(len(self.teams)))]
+        
+        for criterion in self.tiebreakers:
+            refined = []
+            for cluster in clusters:
+                if len(cluster) == 1:
+                    refined.append(cluster)
+                    continue
+                # Critério avaliado só dentro do grupo de empatados
+                values = self._values(criterion, cluster)
+                cluster = sorted(cluster, key=lambda i: -values[i])
+                current = [cluster[0]]
+                for i in cluster[1:]:
+                    if values[i] == values[current[-1]]:
+                        current.append(i)
+                    else:
+                        refined.append(current)
+                        current = [i]
+                refined.append(current)
+            clusters = refined
+        
+        return [{
+            'team': self.teams[i],
+            'points': self.points[i],
+            'played': self.played[i],
+            'wins': self.wins[i],
+            'draws': self.draws[i],
+            'losses': self.losses[i],
+            'kills': self.kills[i]
+        } for cluster in clusters for i in cluster]
+
+class SwissSystem:
+    """
+    Estado incremental do Sistema Suíço
+    
+    Os resultados entram um a um com record_result e cada chamada de
+    pair_next_round monta só a rodada seguinte, sem refazer o histórico.
+    """
+    
+    def __init__(self, teams: List[Team], rounds: int = None):
+        if len(teams) < 2:
+            raise ValueError("O Sistema Suíço precisa de pelo menos 2 times")
+        
+        self.teams = list(teams)
+        self.rounds_total = rounds or math.ceil(math.log2(len(self.teams)))
+        self.rounds: List[Dict] = []
+        
+        count = len(self.teams)
+        self._index = {SwissSystem._key(team): i for i, team in enumerate(self.teams)}
+        self.scores = [0] * count
+        self.wins = [0] * count
+        self.losses = [0] * count
+        self.opponents = [set() for _ in range(count)]
+        self.had_bye = [False] * count
     
     @staticmethod
-    def _draw_single_elimination(bracket_data: Dict) -> BytesIO:
-        """Desenha chave de eliminatória simples"""
+    def _key(team) -> tuple:
+        """Identifica o time pelo ID do banco (ou nome): sobrevive a recarregar os objetos"""
+        team_id = getattr(team, 'id', None)
+        return ('id', team_id) if team_id is not None else ('name', team.name)
+    
+    def _ranking(self) -> List[int]:
+        """Índices dos times por pontuação (empate mantém a ordem de inscrição)"""
+        return sorted(range(len(self.teams)), key=lambda i: -self.scores[i])
+    
+    def _pair(self, order: List[int]) -> List[tuple]:
+        """
+        Emparelha times vizinhos na classificação evitando revanches
         
-        rounds = bracket_data['rounds']
+        Emparelhamento máximo (algoritmo de Edmonds, com blossoms) no grafo
+        dos confrontos ainda inéditos: começa pelo guloso entre vizinhos da
+        classificação e aplica caminhos aumentantes até não haver mais.
+        Os vizinhos são testados do mais próximo ao mais distante na
+        classificação, para manter as pontuações parecidas. Revanche só se
+        não existir emparelhamento perfeito sem ela.
+        """
+        count = len(order)
+        # Posições na classificação, das mais próximas para as mais distantes
+        adjacency = [
+            sorted((q for q in range(count) if q != p and order[q] not in self.opponents[order[p]]),
+                   key=lambda q: abs(q - p))
+            for p in range(count)
+        ]
         
-        # Dimensões
-        match_height = 60
-        match_width = 200
-        horizontal_spacing = 100
-        vertical_spacing = 20
+        match = [-1] * count
+        for p in range(count):
+            if match[p] == -1:
+                q = next((q for q in adjacency[p] if q > p and match[q] == -1), None)
+                if q is not None:
+                    match[p], match[q] = q, p
         
-        # Calcular tamanho da imagem
-        width = len(rounds) * (match_width + horizontal_spacing) + 100
-        max_matches = max(len(r['matches']) for r in rounds)
-        height = max_matches * (match_height + vertical_spacing) + 100
+        # Sem caminho aumentante a partir de um vértice agora, não haverá depois
+        for root in range(count):
+            if match[root] == -1:
+                SwissSystem._augment(root, match, adjacency)
         
-        # Criar imagem
-        img = Image.new('RGB', (width, height), color='#2C2F33')
-        draw = ImageDraw.Draw(img)
+        pairs = [(order[p], order[match[p]]) for p in range(count) if match[p] > p]
         
-        try:
-            font = ImageFont.truetype("arial.ttf", 14)
-            title_font = ImageFont.truetype("arial.ttf", 18)
-        except:
-            font = ImageFont.load_default()
-            title_font = ImageFont.load_default()
-        
-        # Desenhar cada rodada
-        x = 50
-        for round_idx, round_data in enumerate(rounds):
-            # Título da rodada
-            draw.text((x, 20), round_data['name'], fill='#FFFFFF', font=title_font)
-            
-            # Calcular espaçamento vertical para centralizar
-            total_matches = len(round_data['matches'])
-            spacing_multiplier = 2 ** round_idx
-            y_start = 60
-            
-            for match_idx, match in enumerate(round_data['matches']):
-                y = y_start + match_idx * (match_height + vertical_spacing) * spacing_multiplier
-                
-                # Desenhar caixa do confronto
-                draw.rectangle(
-                    [(x, y), (x + match_width, y + match_height)],
-                    outline='#7289DA',
-                    width=2
-                )
-                
-                # Team 1
-                team1_name = match['team1'].name if match['team1'] else 'TBD'
-                draw.text((x + 10, y + 10), team1_name, fill='#FFFFFF', font=font)
-                
-                # Linha divisória
-                draw.line(
-                    [(x, y + match_height // 2), (x + match_width, y + match_height // 2)],
-                    fill='#7289DA',
-                    width=1
-                )
+        # Sem emparelhamento perfeito: os que sobraram se enfrentam em ordem (revanche)
+        leftovers = [order[p] for p in range(count) if match[p] == -1]
+        pairs.extend(zip(leftovers[0::2], leftovers[1::2]))
+        return sorted(pairs, key=lambda pair: order.index(pair[0]))
+    
+    @staticmethod
+    def _augment(root: int, match: List[int], adjacency: List[List[int]]) -> bool:
+        """
+        Busca (BFS) um caminho aumentante a partir de `root` e o aplica em `match`
+        
+        Ciclos ímpares (blossoms) são contraídos no vértice base, como no
+        algoritmo de Edmonds; O(V²) por busca.
+        """
+        count = len(match)
+        parent = [-1] * count
+        base = list(range(count))
+        used = [False] * count
+        used[root] = True
+        queue = deque([root])
+        
+        def common_base(a: int, b: int) -> int:
+            seen = [False] * count
+            while True:
+                a = base[a]
+                seen[a] = True
+                if match[a] == -1:
+                    break
+                a = parent[match[a]]
+            while True:
+                b = base[b]
+                if seen[b]:
+                    return b
+                b = parent[match[b]]
+        
+        def mark_blossom(v: int, blossom_base: int, child: int, blossom: List[bool]):
+            while base[v] != blossom_base:
+                blossom[base[v]] = blossom[base[match[v]]] = True
+                parent[v] = child
+                child = match[v]
+                v = parent[match[v]]
+        
+        while queue:
+            v = queue.popleft()
+            for to in adjacency[v]:
+                if base[v] == base[to] or match[v] == to:
+                    continue
                 
-                # Team 2
-                team2_name = match['team2'].name if match['team2'] else 'TBD'
-                draw.text((x + 10, y + match_height // 2 + 10), team2_name, fill='#FFFFFF', font=font)
+                if to == root or (match[to] != -1 and parent[match[to]] != -1):
+                    # Ciclo ímpar: contrai a blossom no vértice base comum
+                    blossom_base = common_base(v, to)
+                    blossom = [False] * count
+                    mark_blossom(v, blossom_base, to, blossom)
+                    mark_blossom(to, blossom_base, v, blossom)
+                    for i in range(count):
+                        if blossom[base[i]]:
+                            base[i] = blossom_base
+                            if not used[i]:
+                                used[i] = True
+                                queue.append(i)
                 
-                # Conectar ao próximo round
-                if round_idx < len(rounds) - 1:
-                    next_x = x + match_width + horizontal_spacing
-                    next_y = y_start + (match_idx // 2) * (match_height + vertical_spacing) * (spacing_multiplier * 2)
-                    
-                    # Linha horizontal
-                    draw.line(
-                        [(x + match_width, y + match_height // 2), (next_x, y + match_height // 2)],
-                        fill='#7289DA',
-                        width=2
-                    )
-                    
-                    # Linha vertical conectando aos pares
-                    if match_idx % 2 == 1:
-                        prev_y = y_start + (match_idx - 1) * (match_height + vertical_spacing) * spacing_multiplier
-                        draw.line(
-                            [(next_x, prev_y + match_height // 2), (next_x, y + match_height // 2)],
-                            fill='#7289DA',
-                            width=2
-                        )
-            
-            x += match_width + horizontal_spacing
+                elif parent[to] == -1:
+                    parent[to] = v
+                    if match[to] == -1:
+                        # Caminho achado: cada vértice dele troca de par
+                        while to != -1:
+                            previous = parent[to]
+                            following = match[previous]
+                            match[to], match[previous] = previous, to
+                            to = following
+                        return True
+                    used[match[to]] = True
+                    queue.append(match[to])
         
-        # Salvar em buffer
-        buffer = BytesIO()
-        img.save(buffer, format='PNG')
-        buffer.seek(0)
+        return False
+    
+    def pair_next_round(self) -> Optional[Dict]:
+        """Gera a próxima rodada a partir da classificação atual (None se o torneio acabou)"""
+        if len(self.rounds) >= self.rounds_total:
+            return None
         
-        return buffer
+        order = self._ranking()
+        
+        # Bye para o pior colocado que ainda não folgou (conta como vitória)
+        bye = None
+        if len(order) % 2 == 1:
+            bye = next((i for i in reversed(order) if not self.had_bye[i]), order[-1])
+            order.remove(bye)
+        
+        return self._add_round(self._pair(order), bye)
+    
+    def _add_round(self, pairs: List[tuple], bye: Optional[int]) -> Dict:
+        """Aplica uma rodada já emparelhada (índices dos times)"""
+        if bye is not None:
+            self.had_bye[bye] = True
+            self.scores[bye] += 1
+            self.wins[bye] += 1
+        
+        matches = []
+        for a, b in pairs:
+            self.opponents[a].add(b)
+            self.opponents[b].add(a)
+            matches.append({
+                'team1': self.teams[a],
+                'team2': self.teams[b],
+                'match_number': len(matches) + 1,
+                'winner': None
+            })
+        
+        round_number = len(self.rounds) + 1
+        round_data = {
+            'name': f'Rodada {round_number}',
+            'phase': f'S{round_number}',
+            'matches': matches,
+            'bye': self.teams[bye] if bye is not None else None
+        }
+        self.rounds.append(round_data)
+        return round_data
+    
+    def record_result(self, round_number: int, match_number: int, winner: Optional[Team]):
+        """Registra o vencedor de uma partida (None = empate, meio ponto para cada)"""
+        match = self.rounds[round_number - 1]['matches'][match_number - 1]
+        if match['winner'] is not None or match.get('draw'):
+            raise ValueError("Resultado já registrado para essa partida")
+        
+        team1 = self._index[SwissSystem._key(match['team1'])]
+        team2 = self._index[SwissSystem._key(match['team2'])]
+        
+        if winner is None:
+            match['draw'] = True
+            self.scores[team1] += 0.5
+            self.scores[team2] += 0.5
+            return
+        
+        winner_idx = self._index[SwissSystem._key(winner)]
+        if winner_idx not in (team1, team2):
+            raise ValueError("O vencedor precisa ser um dos times da partida")
+        loser_idx = team2 if winner_idx == team1 else team1
+        
+        match['winner'] = winner
+        self.scores[winner_idx] += 1
+        self.wins[winner_idx] += 1
+        self.losses[loser_idx] += 1
+    
+    def to_state(self) -> Dict:
+        """
+        Rodadas e resultados em dados simples, para salvar
+        
+        Times são índices em `teams` (a ordem precisa ser a mesma em
+        from_state); resultado -1 = pendente, -2 = empate.
+        """
+        rounds = []
+        for round_data in self.rounds:
+            pairs, results = [], []
+            for match in round_data['matches']:
+                pairs.append([
+                    self._index[SwissSystem._key(match['team1'])],
+                    self._index[SwissSystem._key(match['team2'])]
+                ])
+                if match.get('draw'):
+                    results.append(-2)
+                elif match['winner'] is not None:
+                    results.append(self._index[SwissSystem._key(match['winner'])])
+                else:
+                    results.append(-1)
+            bye = round_data['bye']
+            rounds.append({
+                'pairs': pairs,
+                'bye': self._index[SwissSystem._key(bye)] if bye is not None else None,
+                'results': results
+            })
+        return {'rounds_total': self.rounds_total, 'rounds': rounds}
     
     @staticmethod
-    def _draw_groups(bracket_data: Dict) -> BytesIO:
-        """Desenha fase de grupos"""
-        # TODO: Implementar visualização de grupos
-        pass
+    def from_state(state: Dict, teams: List[Team]) -> "SwissSystem":
+        """Refaz o Suíço salvo por to_state sem emparelhar de novo"""
+        swiss = SwissSystem(teams, state['rounds_total'])
+        for round_data in state['rounds']:
+            swiss._add_round([tuple(pair) for pair in round_data['pairs']], round_data['bye'])
+            round_number = len(swiss.rounds)
+            for match_number, result in enumerate(round_data['results'], start=1):
+                if result == -1:
+                    continue
+                swiss.record_result(round_number, match_number, None if result == -2 else swiss.teams[result])
+        return swiss
+    
+    def standings(self) -> List[Dict]:
+        """Classificação com desempate por Buchholz (soma da pontuação dos adversários)"""
+        buchholz = [sum(self.scores[o] for o in self.opponents[i]) for i in range(len(self.teams))]
+        order = sorted(range(len(self.teams)), key=lambda i: (-self.scores[i], -buchholz[i]))
+        
+        return [{
+            'team': self.teams[i],
+            'points': self.scores[i],
+            'wins': self.wins[i],
+            'losses': self.losses[i],
+            'buchholz': buchholz[i]
+        } for i in order]
 
-class BracketsCog(commands.Cog):
-    """Sistema de chaveamento automático"""
+class MatchNode:
+    """Partida ligada à próxima partida do vencedor e (na dupla) à do perdedor"""
     
-    def __init__(self, bot):
-        self.bot = bot
+    __slots__ = ('match', 'next_key', 'next_slot', 'loser_key', 'loser_slot', 'bye_slots')
     
-    @app_commands.command(
-        name="gerar_chave",
-        description="Gera chaveamento automático para o evento"
-    )
-    @app_commands.describe(
-        evento="Nome do evento",
-        tipo="Tipo de chaveamento",
-        sortear="Sortear ordem dos times aleatoriamente"
-    )
-    @app_commands.choices(tipo=[
-        app_commands.Choice(name="Eliminatória Simples", value="single"),
-        app_commands.Choice(name="Eliminatória Dupla", value="double"),
-        app_commands.Choice(name="Fase de Grupos", value="groups"),
-        app_commands.Choice(name="Sistema Suíço", value="swiss"),
-        app_commands.Choice(name="Todos contra Todos", value="round_robin")
-    ])
-    async def gerar_chave(
-        self,
-        interaction: discord.Interaction,
-        evento: str,
-        tipo: str,
-        sortear: bool = True
-    ):
-        await interaction.response.defer()
+    def __init__(self, match: Dict):
+        self.match = match
+        self.next_key = None
+        self.next_slot = None
+        self.loser_key = None
+        self.loser_slot = None
+        self.bye_slots = set()
+    
+    def resolved(self, slot: str) -> bool:
+        """A vaga já tem time ou é um bye"""
+        return self.match[slot] is not None or slot in self.bye_slots
+
+
+class BracketState:
+    """
+    Estado de progressão de uma chave eliminatória (simples ou dupla)
+    
+    As partidas ficam indexadas por chave:
+        ('W', rodada, índice)  -> winners bracket / eliminatória simples
+        ('L', rodada, índice)  -> losers bracket
+        ('GF', 0, 0)           -> grande final ('GF', 1, 0 é o reset)
+    
+    Registrar um resultado move o vencedor (e o perdedor, na dupla) para a
+    vaga seguinte em O(1) e resolve byes automaticamente. Os dicts de partida
+    são os mesmos de bracket_data, que continua pronto para o BracketVisualizer.
+    """
+    
+    def __init__(self, bracket_data: Dict):
+        if bracket_data['type'] not in ('single_elimination', 'double_elimination'):
+            raise ValueError("Progressão disponível apenas para eliminatórias")
         
-        # Verificar permissões
-        if not self.bot.is_vip_or_owner(interaction.user):
-            await interaction.followup.send(
-                Messages.error(Messages.VIP_ONLY),
-                ephemeral=True
-            )
-            return
+        self.bracket = bracket_data
+        self.nodes: Dict[tuple, MatchNode] = {}
+        self.phase = 0  # Rodada do winners bracket anunciada pelo /avancar_fase
         
-        # Buscar evento e times
-        # (implementar busca no DB)
-        teams = []  # Lista de times do evento
+        winners = bracket_data['rounds']
+        for r, round_data in enumerate(winners):
+            for i, match in enumerate(round_data['matches']):
+                node = self.nodes[('W', r, i)] = MatchNode(match)
+                if r < len(winners) - 1:
+                    node.next_key, node.next_slot = ('W', r + 1, i // 2), BracketState._slot(i)
         
-        if len(teams) < 2:
-            await interaction.followup.send(
-                Messages.error("É necessário pelo menos 2 times para gerar chaveamento!"),
-                ephemeral=True
-            )
-            return
+        if bracket_data['type'] == 'double_elimination':
+            self._link_double_elimination()
         
-        # Gerar chaveamento
-        if tipo == "single":
-            bracket = BracketGenerator.create_single_elimination(teams)
-        elif tipo == "groups":
-            bracket = BracketGenerator.create_groups(teams)
-        elif tipo == "round_robin":
-            bracket = BracketGenerator.create_round_robin(teams)
+        # Vagas vazias da 1ª rodada são byes
+        for i, match in enumerate(winners[0]['matches']):
+            node = self.nodes[('W', 0, i)]
+            for slot in ('team1', 'team2'):
+                if match[slot] is None:
+                    node.bye_slots.add(slot)
+        
+        for i in range(len(winners[0]['matches'])):
+            self._auto_advance(('W', 0, i))
+    
+    @staticmethod
+    def _slot(index: int) -> str:
+        return 'team1' if index % 2 == 0 else 'team2'
+    
+    def _link_double_elimination(self):
+        losers = self.bracket['losers_rounds']
+        grand_final = ('GF', 0, 0)
+        self.nodes[grand_final] = MatchNode(self.bracket['grand_final'])
+        
+        last_winners = len(self.bracket['rounds']) - 1
+        self.nodes[('W', last_winners, 0)].next_key = grand_final
+        self.nodes[('W', last_winners, 0)].next_slot = 'team1'
+        
+        for j, round_data in enumerate(losers):
+            for i, match in enumerate(round_data['matches']):
+                node = self.nodes[('L', j, i)] = MatchNode(match)
+                if j == len(losers) - 1:
+                    node.next_key, node.next_slot = grand_final, 'team2'
+                elif j % 2 == 0:
+                    # Próxima rodada recebe quem cai do winners na vaga team2
+                    node.next_key, node.next_slot = ('L', j + 1, i), 'team1'
+                else:
+                    node.next_key, node.next_slot = ('L', j + 1, i // 2), BracketState._slot(i)
+        
+        for r, round_data in enumerate(self.bracket['rounds']):
+            for i, match in enumerate(round_data['matches']):
+                target = match.get('loser_to')
+                if target is None:
+                    continue
+                node = self.nodes[('W', r, i)]
+                if target['round'] == 'grand_final':
+                    node.loser_key = grand_final
+                else:
+                    node.loser_key = ('L', target['round'], target['match'])
+                node.loser_slot = target['slot']
+    
+    def _place(self, key: Optional[tuple], slot: Optional[str], team: Optional[Team]):
+        """Coloca um time (ou um bye, se team for None) na vaga e tenta resolver a partida"""
+        if key is None:
+            return
+        node = self.nodes[key]
+        if team is None:
+            node.bye_slots.add(slot)
         else:
-            await interaction.followup.send(
-                Messages.error("Tipo de chaveamento não implementado ainda!"),
-                ephemeral=True
-            )
+            node.match[slot] = team
+        self._auto_advance(key)
+    
+    def _auto_advance(self, key: tuple):
+        """Resolve partidas com bye: o time presente avança sem jogar"""
+        node = self.nodes[key]
+        if not node.bye_slots or not (node.resolved('team1') and node.resolved('team2')):
+            return
+        if node.match['winner'] is not None or key[0] == 'GF':
             return
         
-        # Gerar imagem
-        image_buffer = BracketVisualizer.generate_bracket_image(bracket)
+        team = node.match['team1'] or node.match['team2']
+        node.match['winner'] = team
+        self._place(node.next_key, node.next_slot, team)
+        self._place(node.loser_key, node.loser_slot, None)
+    
+    def record_result(self, key: tuple, winner: Team) -> Optional[tuple]:
+        """
+        Registra o vencedor de uma partida e o leva para a próxima
         
-        if image_buffer:
-            file = discord.File(image_buffer, filename="bracket.png")
-            
-            embed = discord.Embed(
-                title=f"{BotConfig.EMOJIS['trophy']} Chaveamento Gerado",
-                description=f"**Evento:** {evento}\n"
-                           f"**Times:** {len(teams)}\n"
-                           f"**Tipo:** {tipo}",
-                color=BotConfig.COLORS['success']
+        Returns:
+            Chave da partida para onde o vencedor foi (None se acabou o torneio)
+        """
+        node = self.nodes[key]
+        match = node.match
+        
+        if match['winner'] is not None:
+            raise ValueError("Essa partida já tem vencedor")
+        if match['team1'] is None or match['team2'] is None:
+            raise ValueError("Essa partida ainda não tem os dois times definidos")
+        if winner is not match['team1'] and winner is not match['team2']:
+            raise ValueError("O vencedor precisa ser um dos times da partida")
+        
+        loser = match['team2'] if winner is match['team1'] else match['team1']
+        match['winner'] = winner
+        
+        # Grande final: se o time do losers vencer, joga-se o reset
+        if key == ('GF', 0, 0) and winner is match['team2'] and match.get('reset'):
+            reset = {'team1': match['team1'], 'team2': match['team2'], 'match_number': 2, 'winner': None}
+            self.bracket['grand_final_reset'] = reset
+            self.nodes[('GF', 1, 0)] = MatchNode(reset)
+            return ('GF', 1, 0)
+        
+        self._place(node.next_key, node.next_slot, winner)
+        self._place(node.loser_key, node.loser_slot, loser)
+        return node.next_key
+    
+    def find_pending_match(self, team: Team) -> Optional[tuple]:
+        """Chave da partida pronta (dois times, sem vencedor) em que o time está"""
+        for key, node in self.nodes.items():
+            match = node.match
+            if match['winner'] is None and (match['team1'] is team or match['team2'] is team):
+                if match['team1'] is not None and match['team2'] is not None:
+                    return key
+        return None
+    
+    def find_team(self, name: str) -> Optional[Team]:
+        """Busca um time da chave pelo nome (sem diferenciar maiúsculas)"""
+        name = name.strip().lower()
+        for match in self.bracket['rounds'][0]['matches']:
+            for team in (match['team1'], match['team2']):
+                if team is not None and team.name.lower() == name:
+                    return team
+        return None
+    
+    def phase_name(self) -> str:
+        """Nome da fase anunciada"""
+        if self.phase < len(self.bracket['rounds']):
+            return self.bracket['rounds'][self.phase]['name']
+        return 'Grande Final'
+    
+    def phase_matches(self) -> List[Dict]:
+        """Partidas da fase anunciada (na dupla, a última fase é a grande final)"""
+        if self.phase < len(self.bracket['rounds']):
+            return self.bracket['rounds'][self.phase]['matches']
+        
+        matches = [self.bracket['grand_final']]
+        if 'grand_final_reset' in self.bracket:
+            matches.append(self.bracket['grand_final_reset'])
+        return matches
+    
+    def pending_matches(self) -> List[Dict]:
+        """Partidas da fase anunciada que ainda não têm vencedor"""
+        return [m for m in self.phase_matches() if m['winner'] is None]
+    
+    def losers_pending(self) -> List[Dict]:
+        """
+        Partidas do losers bracket ainda em aberto que impedem a grande final
+        
+        Só vale na última rodada do winners da dupla; partidas que ficaram
+        vazias por byes dos dois lados não contam.
+        """
+        if self.bracket['type'] != 'double_elimination' or self.phase != len(self.bracket['rounds']) - 1:
+            return []
+        
+        pending = []
+        for j, round_data in enumerate(self.bracket['losers_rounds']):
+            for i, match in enumerate(round_data['matches']):
+                node = self.nodes[('L', j, i)]
+                empty = node.resolved('team1') and node.resolved('team2') and match['team1'] is None and match['team2'] is None
+                if match['winner'] is None and not empty:
+                    pending.append(match)
+        return pending
+    
+    def advance_phase(self) -> bool:
+        """Passa para a próxima fase se todas as partidas da atual (e, antes da grande final, do losers) tiverem vencedor"""
+        last_phase = len(self.bracket['rounds']) - (1 if self.bracket['type'] == 'single_elimination' else 0)
+        if self.pending_matches() or self.losers_pending() or self.phase >= last_phase:
+            return False
+        self.phase += 1
+        return True
+    
+    def champion(self) -> Optional[Team]:
+        """Campeão do torneio, se já definido"""
+        if self.bracket['type'] == 'single_elimination':
+            return self.bracket['rounds'][-1]['matches'][0]['winner']
+        
+        reset = self.bracket.get('grand_final_reset')
+        if reset is not None:
+            return reset['winner']
+        return self.bracket['grand_final']['winner']
+
+class TeamRef:
+    """Referência leve a um time da chave compacta (só índice e nome)"""
+    
+    __slots__ = ('index', 'name')
+    
+    def __init__(self, index: int, name: str):
+        self.index = index
+        self.name = name
+    
+    def __reduce__(self):
+        return (TeamRef, (self.index, self.name))
+    
+    def __repr__(self) -> str:
+        return f"TeamRef({self.index}, {self.name!r})"
+
+
+class CompactBracket:
+    """
+    Chave eliminatória em vetores paralelos (array) em vez de dicts por partida
+    
+    Times viram índices em `team_names` (-1 = vaga vazia/bye), com o ID do
+    banco em `team_ids` quando houver (renomear o time não quebra a chave). As partidas
+    ficam em ordem: winners bracket, losers bracket e grande final (e reset),
+    e cada rodada guarda (seção, nome, fase, primeira partida). Ocupa poucos
+    bytes por partida e serializa direto em binário ou JSON.
+    """
+    
+    __slots__ = ('bracket_type', 'team_names', 'team_ids', 'rounds', 'team1', 'team2', 'winner',
+                 'loser_round', 'loser_match', 'loser_slot', 'grand_final_reset')
+    
+    SECTION_WINNERS = 0
+    SECTION_LOSERS = 1
+    SECTION_GRAND_FINAL = 2
+    
+    NO_TEAM = -1
+    NO_LOSER = -1        # loser_round: partida sem queda para o losers
+    LOSER_TO_FINAL = -2  # loser_round: perdedor vai para a grande final
+    
+    MAGIC = b'CBK1'
+    
+    def __init__(self, bracket_type: str, team_names: List[str], team_ids: Optional[List[Optional[int]]] = None):
+        self.bracket_type = bracket_type
+        self.team_names = list(team_names)
+        self.team_ids = list(team_ids) if team_ids is not None else [None] * len(self.team_names)
+        self.rounds: List[tuple] = []  # (seção, nome, fase, primeira partida)
+        self.team1 = array('h')
+        self.team2 = array('h')
+        self.winner = array('h')
+        self.loser_round = array('h')
+        self.loser_match = array('h')
+        self.loser_slot = array('b')   # 1 = team1, 2 = team2
+        self.grand_final_reset = False
+    
+    def __len__(self) -> int:
+        return len(self.team1)
+    
+    # ---------- Conversão de/para o formato em dicts ----------
+    
+    @staticmethod
+    def from_dict(bracket_data: Dict) -> "CompactBracket":
+        """Converte a saída de create_single_elimination / create_double_elimination"""
+        if bracket_data['type'] not in ('single_elimination', 'double_elimination'):
+            raise ValueError("Formato compacto disponível apenas para eliminatórias")
+        
+        # Índices na ordem em que os times aparecem na 1ª rodada
+        indexes: Dict[int, int] = {}
+        names: List[str] = []
+        ids: List[Optional[int]] = []
+        for match in bracket_data['rounds'][0]['matches']:
+            for team in (match['team1'], match['team2']):
+                if team is not None and id(team) not in indexes:
+                    indexes[id(team)] = len(names)
+                    names.append(team.name)
+                    ids.append(getattr(team, 'id', None))
+        
+        compact = CompactBracket(bracket_data['type'], names, ids)
+        
+        def team_index(team) -> int:
+            return CompactBracket.NO_TEAM if team is None else indexes[id(team)]
+        
+        def add_round(section: int, name: str, phase: str, matches: List[Dict]):
+            compact.rounds.append((section, name, phase, len(compact)))
+            for match in matches:
+                compact.team1.append(team_index(match['team1']))
+                compact.team2.append(team_index(match['team2']))
+                compact.winner.append(team_index(match['winner']))
+                
+                target = match.get('loser_to')
+                if target is None:
+                    compact.loser_round.append(CompactBracket.NO_LOSER)
+                    compact.loser_match.append(0)
+                    compact.loser_slot.append(0)
+                else:
+                    final = target['round'] == 'grand_final'
+                    compact.loser_round.append(CompactBracket.LOSER_TO_FINAL if final else target['round'])
+                    compact.loser_match.append(target['match'])
+                    compact.loser_slot.append(1 if target['slot'] == 'team1' else 2)
+        
+        for round_data in bracket_data['rounds']:
+            add_round(CompactBracket.SECTION_WINNERS, round_data['name'], round_data['phase'], round_data['matches'])
+        
+        if bracket_data['type'] == 'double_elimination':
+            for round_data in bracket_data['losers_rounds']:
+                add_round(CompactBracket.SECTION_LOSERS, round_data['name'], round_data['phase'], round_data['matches'])
+            
+            compact.grand_final_reset = bool(bracket_data['grand_final'].get('reset'))
+            add_round(CompactBracket.SECTION_GRAND_FINAL, 'Grande Final', 'GF', [bracket_data['grand_final']])
+            if 'grand_final_reset' in bracket_data:
+                add_round(CompactBracket.SECTION_GRAND_FINAL, 'Grande Final (Reset)', 'GF2',
+                          [bracket_data['grand_final_reset']])
+        
+        return compact
+    
+    def to_dict(self, teams: Optional[List] = None) -> Dict:
+        """
+        Volta para o formato em dicts usado pelo BracketVisualizer e pelo BracketState
+        
+        Args:
+            teams: Objetos de time na ordem de `team_names`. Sem eles, usa TeamRef.
+        """
+        if teams is None:
+            teams = [TeamRef(i, name) for i, name in enumerate(self.team_names)]
+        
+        def team_at(index: int):
+            return None if index == CompactBracket.NO_TEAM else teams[index]
+        
+        sections = {CompactBracket.SECTION_WINNERS: [], CompactBracket.SECTION_LOSERS: [],
+                    CompactBracket.SECTION_GRAND_FINAL: []}
+        
+        bounds = [start for _, _, _, start in self.rounds[1:]] + [len(self)]
+        for (section, name, phase, start), end in zip(self.rounds, bounds):
+            matches = []
+            for m in range(start, end):
+                match = {
+                    'team1': team_at(self.team1[m]),
+                    'team2': team_at(self.team2[m]),
+                    'match_number': m - start + 1,
+                    'winner': team_at(self.winner[m])
+                }
+                if self.loser_round[m] != CompactBracket.NO_LOSER:
+                    final = self.loser_round[m] == CompactBracket.LOSER_TO_FINAL
+                    match['loser_to'] = {
+                        'round': 'grand_final' if final else self.loser_round[m],
+                        'match': self.loser_match[m],
+                        'slot': 'team1' if self.loser_slot[m] == 1 else 'team2'
+                    }
+                matches.append(match)
+            sections[section].append({'name': name, 'phase': phase, 'matches': matches})
+        
+        bracket = {'rounds': sections[CompactBracket.SECTION_WINNERS], 'type': self.bracket_type}
+        
+        if self.bracket_type == 'double_elimination':
+            finals = sections[CompactBracket.SECTION_GRAND_FINAL]
+            bracket['losers_rounds'] = sections[CompactBracket.SECTION_LOSERS]
+            bracket['grand_final'] = dict(finals[0]['matches'][0], reset=self.grand_final_reset)
+            if len(finals) > 1:
+                bracket['grand_final_reset'] = dict(finals[1]['matches'][0], match_number=2)
+        
+        return bracket
+    
+    # ---------- Serialização ----------
+    
+    def _header(self) -> Dict:
+        return {
+            'type': self.bracket_type,
+            'teams': self.team_names,
+            'ids': self.team_ids,
+            'rounds': [list(r) for r in self.rounds],
+            'reset': self.grand_final_reset
+        }
+    
+    @staticmethod
+    def _load_header(header: Dict) -> "CompactBracket":
+        # Chaves salvas antes dos IDs só têm os nomes
+        compact = CompactBracket(header['type'], header['teams'], header.get('ids'))
+        compact.rounds = [tuple(r) for r in header['rounds']]
+        compact.grand_final_reset = header['reset']
+        return compact
+    
+    def to_json(self) -> str:
+        """JSON compacto: cabeçalho + vetores de inteiros"""
+        data = self._header()
+        data.update({
+            'team1': self.team1.tolist(),
+            'team2': self.team2.tolist(),
+            'winner': self.winner.tolist(),
+            'loser_round': self.loser_round.tolist(),
+            'loser_match': self.loser_match.tolist(),
+            'loser_slot': self.loser_slot.tolist()
+        })
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    
+    @staticmethod
+    def from_json(text: str) -> "CompactBracket":
+        data = json.loads(text)
+        compact = CompactBracket._load_header(data)
+        for field in ('team1', 'team2', 'winner', 'loser_round', 'loser_match', 'loser_slot'):
+            getattr(compact, field).extend(data[field])
+        return compact
+    
+    def to_bytes(self) -> bytes:
+        """
+        Binário: MAGIC + tamanho do cabeçalho + cabeçalho JSON + vetores (little-endian)
+        
+        Os vetores ocupam 11 bytes por partida (índices em int16, até 32767 times).
+        """
+        header = json.dumps(self._header(), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        
+        buffer = BytesIO()
+        buffer.write(CompactBracket.MAGIC)
+        buffer.write(struct.pack('<II', len(header), len(self)))
+        buffer.write(header)
+        for field in ('team1', 'team2', 'winner', 'loser_round', 'loser_match', 'loser_slot'):
+            values = getattr(self, field)
+            if sys.byteorder == 'big':
+                values = array(values.typecode, values)
+                values.byteswap()
+            buffer.write(values.tobytes())
+        return buffer.getvalue()
+    
+    @staticmethod
+    def from_bytes(data: bytes) -> "CompactBracket":
+        if data[:4] != CompactBracket.MAGIC:
+            raise ValueError("Dados de chave inválidos")
+        
+        header_size, matches = struct.unpack_from('<II', data, 4)
+        offset = 12
+        compact = CompactBracket._load_header(json.loads(data[offset:offset + header_size].decode('utf-8')))
+        offset += header_size
+        
+        for field in ('team1', 'team2', 'winner', 'loser_round', 'loser_match', 'loser_slot'):
+            values = getattr(compact, field)
+            size = matches * values.itemsize
+            values.frombytes(data[offset:offset + size])
+            if sys.byteorder == 'big':
+                values.byteswap()
+            offset += size
+        return compact
+
+
+class BracketSimulator:
+    """
+    Monte Carlo de uma chave eliminatória (simples ou dupla)
+    
+    Cada partida é simulada para todas as execuções de uma vez: os times de
+    cada vaga são vetores de tamanho `runs` e o vencedor sai de um sorteio
+    vetorizado com probabilidade Elo. Partidas já decididas no BracketState
+    são respeitadas, então a simulação parte do estado atual do torneio.
+    
+    O construtor copia do BracketState tudo o que run() usa (times das
+    vagas, vencedores já definidos, ordem das partidas): run() pode rodar
+    em outra thread enquanto o estado ao vivo recebe resultados.
+    """
+    
+    DEFAULT_RATING = 1500.0
+    
+    def __init__(self, state: BracketState, ratings: Optional[Dict[str, float]] = None):
+        self.teams: List[Team] = []
+        indexes: Dict[int, int] = {}
+        for match in state.bracket['rounds'][0]['matches']:
+            for team in (match['team1'], match['team2']):
+                if team is not None and id(team) not in indexes:
+                    indexes[id(team)] = len(self.teams)
+                    self.teams.append(team)
+        self._indexes = indexes
+        
+        ratings = ratings or {}
+        self.ratings = np.array(
+            [ratings.get(team.name, BracketSimulator.DEFAULT_RATING) for team in self.teams],
+            dtype=np.float64
+        )
+        self._ratings_with_bye = np.append(self.ratings, 0.0)  # índice -1 aponta para o sentinela
+        
+        # De onde vem cada vaga: (partida de origem, 'winner' ou 'loser')
+        self._feeders: Dict[tuple, tuple] = {}
+        for key, node in state.nodes.items():
+            if node.next_key is not None:
+                self._feeders[(node.next_key, node.next_slot)] = (key, 'winner')
+            if node.loser_key is not None:
+                self._feeders[(node.loser_key, node.loser_slot)] = (key, 'loser')
+        
+        # Winners antes do losers (que recebe quem cai do winners) e a final por último.
+        # Cada partida vira (chave, time1, time2, time1 venceu, reset pendente):
+        # time é o índice em self.teams ou None (vem da partida de origem) e
+        # "time1 venceu" é None enquanto a partida não tem resultado
+        section_order = {'W': 0, 'L': 1, 'GF': 2}
+        self._plan: List[tuple] = []
+        for key in sorted(state.nodes, key=lambda key: (section_order[key[0]], key[1], key[2])):
+            match = state.nodes[key].match
+            self._plan.append((
+                key,
+                self._index(match['team1']) if match['team1'] is not None else None,
+                self._index(match['team2']) if match['team2'] is not None else None,
+                None if match['winner'] is None else match['winner'] is match['team1'],
+                key == ('GF', 0, 0) and bool(match.get('reset')) and ('GF', 1, 0) not in state.nodes
+            ))
+        
+        self._winners_rounds = len(state.bracket['rounds'])
+        self._columns = [round_data['name'] for round_data in state.bracket['rounds']]
+        if state.bracket['type'] == 'double_elimination':
+            self._columns.append('Grande Final')
+        self._columns.append('Campeão')
+    
+    def _index(self, team: Optional[Team]) -> int:
+        return -1 if team is None else self._indexes[id(team)]
+    
+    def columns(self) -> List[str]:
+        """Fases reportadas: rodadas do winners (+ grande final na dupla) e campeão"""
+        return list(self._columns)
+    
+    def _play(self, team1: np.ndarray, team2: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """Sorteia o vencedor de cada execução (-1 é bye: o outro time passa)"""
+        ratings = self._ratings_with_bye
+        p_team1 = 1.0 / (1.0 + 10.0 ** ((ratings[team2] - ratings[team1]) / 400.0))
+        team1_wins = rng.random(team1.shape[0]) < p_team1
+        team1_wins |= team2 < 0
+        team1_wins &= team1 >= 0
+        return team1_wins
+    
+    def run(self, runs: int = 10000, seed: Optional[int] = None) -> np.ndarray:
+        """
+        Simula `runs` torneios
+        
+        Returns:
+            Matriz (times x colunas) com a probabilidade de cada time chegar a
+            cada fase, na ordem de `self.teams` e `self.columns()`
+        """
+        rng = np.random.default_rng(seed)
+        results: Dict[tuple, tuple] = {}  # chave -> (vencedores, perdedores)
+        reached = np.zeros((len(self.teams) + 1, len(self.columns())), dtype=np.int64)
+        
+        def slot_teams(key: tuple, slot: str, fixed: Optional[int]) -> np.ndarray:
+            if fixed is not None:
+                return np.full(runs, fixed, dtype=np.int64)
+            feeder = self._feeders.get((key, slot))
+            if feeder is None:
+                return np.full(runs, -1, dtype=np.int64)
+            winners, losers = results[feeder[0]]
+            return winners if feeder[1] == 'winner' else losers
+        
+        def count(column: int, teams: np.ndarray):
+            # +1 desloca o bye (-1) para a linha 0, descartada no final
+            reached[:, column] += np.bincount(teams + 1, minlength=reached.shape[0])
+        
+        champion = None
+        for key, fixed1, fixed2, fixed_winner, reset_pending in self._plan:
+            team1, team2 = slot_teams(key, 'team1', fixed1), slot_teams(key, 'team2', fixed2)
+            
+            if key[0] == 'W':
+                count(key[1], team1)
+                count(key[1], team2)
+            elif key == ('GF', 0, 0):
+                count(self._winners_rounds, team1)
+                count(self._winners_rounds, team2)
+            
+            if fixed_winner is not None:
+                team1_wins = np.full(runs, fixed_winner)
+            else:
+                team1_wins = self._play(team1, team2, rng)
+            
+            winners = np.where(team1_wins, team1, team2)
+            losers = np.where(team1_wins, team2, team1)
+            
+            # Grande final com reset ainda não jogado: o time do losers precisa vencer duas vezes
+            if reset_pending:
+                rematch = ~team1_wins
+                second = self._play(team1[rematch], team2[rematch], rng)
+                winners[rematch] = np.where(second, team1[rematch], team2[rematch])
+            
+            results[key] = (winners, losers)
+            champion = winners
+        
+        count(len(self.columns()) - 1, champion)
+        return reached[1:] / runs
+    
+    @staticmethod
+    def play_out(state: BracketState, ratings: Optional[Dict[str, float]] = None,
+                 seed: Optional[int] = None) -> int:
+        """
+        Joga o restante da chave de verdade no BracketState (uma execução)
+        
+        Útil como gerador de carga para testar progressão e desenho.
+        
+        Returns:
+            Número de resultados registrados
+        """
+        rng = random.Random(seed)
+        ratings = ratings or {}
+        recorded = 0
+        
+        while True:
+            ready = [
+                key for key, node in state.nodes.items()
+                if node.match['winner'] is None and node.match['team1'] is not None
+                and node.match['team2'] is not None
+            ]
+            if not ready:
+                return recorded
+            
+            for key in ready:
+                match = state.nodes[key].match
+                rating1 = ratings.get(match['team1'].name, BracketSimulator.DEFAULT_RATING)
+                rating2 = ratings.get(match['team2'].name, BracketSimulator.DEFAULT_RATING)
+                p_team1 = 1.0 / (1.0 + 10.0 ** ((rating2 - rating1) / 400.0))
+                state.record_result(key, match['team1'] if rng.random() < p_team1 else match['team2'])
+                recorded += 1
+
+
+class BracketVisualizer:
+    """Gera visualização gráfica do chaveamento"""
+    
+    # Dimensões
+    MATCH_HEIGHT = 60
+    MATCH_WIDTH = 200
+    HORIZONTAL_SPACING = 100
+    VERTICAL_SPACING = 20
+    
+    # Cores do tema (a paleta das imagens é derivada delas)
+    BACKGROUND = '#2C2F33'
+    ACCENT = '#7289DA'
+    TEXT_COLOR = '#FFFFFF'
+    BACKGROUND_INDEX = 0
+    ACCENT_INDEX = 191
+    
+    FONT_SIZE = 14
+    TITLE_FONT_SIZE = 18
+    
+    # Fase de grupos: (título, posição x, alinhamento à direita) de cada coluna
+    GROUP_TILE_WIDTH = 420
+    GROUP_TITLE_HEIGHT = 40
+    GROUP_ROW_HEIGHT = 28
+    GROUP_TILE_GAP = 20
+    GROUP_GRID_COLUMNS = 4
+    GROUP_MAX_PAGE_HEIGHT = 4000
+    GROUP_COLUMNS = [
+        ("#", 12, False),
+        ("Time", 40, False),
+        ("J", 232, True),
+        ("V", 256, True),
+        ("E", 280, True),
+        ("D", 304, True),
+        ("Abates", 372, True),
+        ("Pts", 405, True),
+    ]
+    
+    # Todos contra todos: rodadas por página e altura máxima da página (as
+    # partidas de uma rodada que não cabem vão para a página seguinte)
+    ROUND_ROBIN_PAGE_ROUNDS = 8
+    ROUND_ROBIN_MAX_PAGE_HEIGHT = 4000
+    
+    # Limite de anexo do Discord (servidores sem boost)
+    DISCORD_FILE_LIMIT = 8 * 1024 * 1024
+    
+    # Formato -> tipo MIME (ver render)
+    IMAGE_FORMATS = {
+        'png': 'image/png',
+        'png_compact': 'image/png',
+        'svg': 'image/svg+xml'
+    }
+    # Níveis de cada rampa da paleta no PNG leve (fundo->texto, fundo->destaque, destaque->texto)
+    COMPACT_LEVELS = (8, 4, 4)
+    
+    # Animação do resultado (render_reveal)
+    ANIMATION_FORMATS = {
+        'gif': 'image/gif',
+        'webp': 'image/webp'
+    }
+    ANIMATION_FRAMES = 12
+    ANIMATION_FRAME_MS = 50
+    ANIMATION_HOLD_MS = 2000
+    
+    # Mudou o desenho? Incrementar invalida as imagens em cache
+    RENDER_VERSION = 3
+    
+    # Blocos do modo com zoom (dashboard)
+    TILE_SIZE = 512
+    
+    # Caches do processo de renderização (camadas base, últimas imagens compostas
+    # e blocos já desenhados da pirâmide). Cada worker tem os seus: o
+    # RenderPool do cog manda a mesma lineage sempre para o mesmo worker.
+    MAX_BASE_LAYERS = 4
+    MAX_COMPOSED = 8
+    MAX_TILES = 64
+    _palette_image: Optional[Image.Image] = None
+    _compact_palette: Optional[tuple] = None
+    _base_layers: "OrderedDict[str, Image.Image]" = OrderedDict()
+    _composed: "OrderedDict[str, tuple]" = OrderedDict()
+    _tiles: "OrderedDict[tuple, Image.Image]" = OrderedDict()
+    _layers_lock = threading.Lock()
+    _thread_fonts = threading.local()
+    
+    @staticmethod
+    def cache_key(render_data: Dict, image_format: str = 'png') -> str:
+        """Chave de cache: conteúdo desenhado + layout e versão do renderizador"""
+        return content_key(
+            render_data,
+            format=image_format,
+            version=BracketVisualizer.RENDER_VERSION,
+            layout=[
+                BracketVisualizer.MATCH_HEIGHT, BracketVisualizer.MATCH_WIDTH,
+                BracketVisualizer.HORIZONTAL_SPACING, BracketVisualizer.VERTICAL_SPACING
+            ]
+        )
+    
+    @staticmethod
+    def generate_bracket_image(bracket_data: Dict) -> BytesIO:
+        """Gera imagem do chaveamento"""
+        png = BracketVisualizer.render_png(BracketVisualizer.to_render_data(bracket_data))
+        return BytesIO(png) if png else None
+    
+    @staticmethod
+    def to_render_data(bracket_data: Dict) -> Dict:
+        """
+        Cópia da chave só com o que é desenhado, em tipos simples
+        
+        Times viram nomes, então o resultado pode ser enviado para outro
+        processo (sem objetos do banco, geradores ou SwissSystem).
+        """
+        def name(team) -> Optional[str]:
+            if team is None or isinstance(team, str):
+                return team
+            return team.name
+        
+        def match_data(match: Dict) -> Dict:
+            return {
+                'team1': name(match['team1']),
+                'team2': name(match['team2']),
+                'winner': name(match.get('winner')),
+                'match_number': match['match_number']
+            }
+        
+        def rounds_data(rounds: List[Dict]) -> List[Dict]:
+            return [{
+                'name': round_data['name'],
+                'phase': round_data.get('phase'),
+                'matches': [match_data(match) for match in round_data['matches']]
+            } for round_data in rounds]
+        
+        data = {'type': bracket_data['type']}
+        if isinstance(bracket_data.get('rounds'), list):
+            data['rounds'] = rounds_data(bracket_data['rounds'])
+        
+        if bracket_data['type'] == 'double_elimination':
+            data['losers_rounds'] = rounds_data(bracket_data['losers_rounds'])
+            data['grand_final'] = match_data(bracket_data['grand_final'])
+            if 'grand_final_reset' in bracket_data:
+                data['grand_final_reset'] = match_data(bracket_data['grand_final_reset'])
+        
+        if bracket_data['type'] == 'round_robin':
+            # Só o necessário para gerar as rodadas de novo, uma página por vez
+            data['teams'] = [name(team) for team in bracket_data['teams']]
+            data['home_away'] = bracket_data['home_away']
+            data['lobbies'] = bracket_data['lobbies']
+        
+        if bracket_data['type'] == 'groups':
+            data['groups'] = [{
+                'name': group['name'],
+                'teams': [name(team) for team in group['teams']],
+                'rounds': rounds_data(group['rounds']),
+                'standings': [
+                    dict(row, team=name(row['team']))
+                    for row in (group['standings'] if isinstance(group['standings'], list)
+                                else group['standings'].standings())
+                ]
+            } for group in bracket_data['groups']]
+        
+        return data
+    
+    @staticmethod
+    def _team_label(team) -> str:
+        """Nome exibido na caixa (aceita objeto de time ou nome)"""
+        if team is None:
+            return 'TBD'
+        return team if isinstance(team, str) else team.name
+    
+    @staticmethod
+    def _load_fonts():
+        """Fontes do registro (carregadas uma vez por processo)"""
+        return load_font(BracketVisualizer.FONT_SIZE), load_font(BracketVisualizer.TITLE_FONT_SIZE)
+    
+    @staticmethod
+    def _columns_size(rounds: List[Dict], multipliers: List[int]) -> tuple:
+        """Largura e altura ocupadas por uma sequência de rodadas"""
+        stride = BracketVisualizer.MATCH_HEIGHT + BracketVisualizer.VERTICAL_SPACING
+        width = len(rounds) * (BracketVisualizer.MATCH_WIDTH + BracketVisualizer.HORIZONTAL_SPACING)
+        height = max(len(r['matches']) * m for r, m in zip(rounds, multipliers)) * stride
+        return width, height
+    
+    @staticmethod
+    def _sections(render_data: Dict) -> Optional[tuple]:
+        """
+        Layout da chave: (largura, altura, seções)
+        
+        Cada seção é (rodadas, x, y_inicial, multiplicadores, conectar).
+        multipliers[i] é o espaçamento vertical da rodada i em "alturas de
+        partida"; cada partida fica centralizada entre as que a alimentam.
+        """
+        bracket_type = render_data['type']
+        
+        if bracket_type == 'single_elimination':
+            rounds = render_data['rounds']
+            multipliers = [2 ** i for i in range(len(rounds))]
+            columns_width, columns_height = BracketVisualizer._columns_size(rounds, multipliers)
+            return columns_width + 100, columns_height + 100, [(rounds, 50, 60, multipliers, True)]
+        
+        if bracket_type == 'double_elimination':
+            # Winners bracket (com a grande final) acima do losers bracket
+            winners = render_data['rounds'] + [{
+                'name': 'Grande Final',
+                'matches': [render_data['grand_final']]
+            }]
+            winners_multipliers = [2 ** i for i in range(len(render_data['rounds']))]
+            winners_multipliers.append(winners_multipliers[-1])
+            
+            losers = render_data['losers_rounds']
+            losers_multipliers = [2 ** (j // 2) for j in range(len(losers))]
+            
+            winners_width, winners_height = BracketVisualizer._columns_size(winners, winners_multipliers)
+            losers_width, losers_height = (
+                BracketVisualizer._columns_size(losers, losers_multipliers) if losers else (0, 0)
+            )
+            
+            section_gap = 80
+            width = max(winners_width, losers_width) + 100
+            height = winners_height + 100 + (losers_height + section_gap if losers else 0)
+            
+            sections = [(winners, 50, 60, winners_multipliers, True)]
+            if losers:
+                sections.append((losers, 50, 60 + winners_height + section_gap, losers_multipliers, True))
+            return width, height, sections
+        
+        if bracket_type in ('swiss', 'round_robin'):
+            # Rodadas já emparelhadas, independentes (sem linhas). O todos contra
+            # todos só tem rodadas aqui uma página por vez (render_round_robin_pages)
+            rounds = render_data.get('rounds')
+            if rounds is None:
+                return None
+            multipliers = [1] * len(rounds)
+            columns_width, columns_height = BracketVisualizer._columns_size(rounds, multipliers)
+            return columns_width + 100, columns_height + 100, [(rounds, 50, 60, multipliers, False)]
+        
+        return None
+    
+    @staticmethod
+    def _match_y(y_start: int, multiplier: int, match_idx: int) -> int:
+        stride = BracketVisualizer.MATCH_HEIGHT + BracketVisualizer.VERTICAL_SPACING
+        return y_start + match_idx * stride * multiplier + (multiplier - 1) * stride // 2
+    
+    @staticmethod
+    def _boxes(sections: List[tuple]) -> List[tuple]:
+        """(x, y, partida) de todas as caixas, sempre na mesma ordem"""
+        boxes = []
+        for rounds, x, y_start, multipliers, _ in sections:
+            for round_idx, round_data in enumerate(rounds):
+                column_x = x + round_idx * (BracketVisualizer.MATCH_WIDTH + BracketVisualizer.HORIZONTAL_SPACING)
+                for match_idx, match in enumerate(round_data['matches']):
+                    boxes.append((column_x, BracketVisualizer._match_y(y_start, multipliers[round_idx], match_idx), match))
+        return boxes
+    
+    @staticmethod
+    def _structure_key(width: int, height: int, sections: List[tuple]) -> str:
+        """Identifica a camada base: só a estrutura, sem os nomes dos times"""
+        return content_key([width, height, [
+            [[[r['name'], len(r['matches'])] for r in rounds], x, y, multipliers, connect]
+            for rounds, x, y, multipliers, connect in sections
+        ]])
+    
+    # ---------- Camadas ----------
+    
+    @staticmethod
+    def _palette() -> Image.Image:
+        """
+        Paleta fixa do tema (imagem 'P' de referência para quantize)
+        
+        Rampa fundo -> texto (0-127), fundo -> destaque (128-191) e
+        destaque -> texto (192-255): cobre o antialiasing do texto e das
+        linhas sem perder cor em relação ao desenho em RGB.
+        """
+        if BracketVisualizer._palette_image is None:
+            def ramp(start: str, end: str, steps: int) -> List[int]:
+                a, b = ImageColor.getrgb(start), ImageColor.getrgb(end)
+                return [
+                    round(a[c] + (b[c] - a[c]) * i / (steps - 1))
+                    for i in range(steps) for c in range(3)
+                ]
+            
+            colors = (
+                ramp(BracketVisualizer.BACKGROUND, BracketVisualizer.TEXT_COLOR, 128)
+                + ramp(BracketVisualizer.BACKGROUND, BracketVisualizer.ACCENT, 64)
+                + ramp(BracketVisualizer.ACCENT, BracketVisualizer.TEXT_COLOR, 64)
+            )
+            palette = Image.new('P', (1, 1))
+            palette.putpalette(colors)
+            BracketVisualizer._palette_image = palette
+        return BracketVisualizer._palette_image
+    
+    @staticmethod
+    def _patch(size: tuple, draw_fn) -> Image.Image:
+        """Desenha em RGB (texto com antialiasing) e converte para a paleta do tema"""
+        patch = Image.new('RGB', size, color=BracketVisualizer.BACKGROUND)
+        draw_fn(ImageDraw.Draw(patch))
+        return patch.quantize(palette=BracketVisualizer._palette(), dither=Image.Dither.NONE)
+    
+    @staticmethod
+    def _box_patch(match: Dict, font) -> Image.Image:
+        """Caixa de uma partida (contorno, divisória e nomes) recortada no tamanho da caixa"""
+        match_width = BracketVisualizer.MATCH_WIDTH
+        match_height = BracketVisualizer.MATCH_HEIGHT
+        
+        # Nomes longos terminam em reticências em vez de vazar da caixa
+        label_width = match_width - 20
+        team1 = fit_text(BracketVisualizer._team_label(match['team1']), BracketVisualizer.FONT_SIZE, label_width)
+        team2 = fit_text(BracketVisualizer._team_label(match['team2']), BracketVisualizer.FONT_SIZE, label_width)
+        
+        def draw_box(draw):
+            draw.rectangle([(0, 0), (match_width, match_height)], outline=BracketVisualizer.ACCENT, width=2)
+            draw.line([(0, match_height // 2), (match_width, match_height // 2)], fill=BracketVisualizer.ACCENT, width=1)
+            draw.text((10, 10), team1, fill=BracketVisualizer.TEXT_COLOR, font=font)
+            draw.text((10, match_height // 2 + 10), team2, fill=BracketVisualizer.TEXT_COLOR, font=font)
+        
+        return BracketVisualizer._patch((match_width + 1, match_height + 1), draw_box)
+    
+    @staticmethod
+    def _titles(sections: List[tuple]) -> List[tuple]:
+        """(x, y, nome) do título de cada rodada"""
+        column_width = BracketVisualizer.MATCH_WIDTH + BracketVisualizer.HORIZONTAL_SPACING
+        return [
+            (x + round_idx * column_width, y_start - 40, round_data['name'])
+            for rounds, x, y_start, _, _ in sections
+            for round_idx, round_data in enumerate(rounds)
+        ]
+    
+    @staticmethod
+    def _connectors(sections: List[tuple]) -> List[tuple]:
+        """Segmentos ((x1, y1), (x2, y2)) das linhas que ligam cada partida à seguinte"""
+        match_height = BracketVisualizer.MATCH_HEIGHT
+        match_width = BracketVisualizer.MATCH_WIDTH
+        column_width = match_width + BracketVisualizer.HORIZONTAL_SPACING
+        
+        segments = []
+        for rounds, x, y_start, multipliers, connect in sections:
+            if not connect:
+                continue
+            for round_idx, round_data in enumerate(rounds[:-1]):
+                column_x = x + round_idx * column_width
+                next_x = column_x + column_width
+                halves = len(rounds[round_idx + 1]['matches']) < len(round_data['matches'])
+                
+                for match_idx in range(len(round_data['matches'])):
+                    middle = BracketVisualizer._match_y(y_start, multipliers[round_idx], match_idx) + match_height // 2
+                    
+                    # Linha horizontal até a próxima rodada
+                    segments.append(((column_x + match_width, middle), (next_x, middle)))
+                    
+                    # Linha vertical conectando aos pares
+                    if halves and match_idx % 2 == 1:
+                        previous = BracketVisualizer._match_y(y_start, multipliers[round_idx], match_idx - 1)
+                        segments.append(((next_x, previous + match_height // 2), (next_x, middle)))
+        
+        return segments
+    
+    @staticmethod
+    def _title_patch(name: str, title_font) -> Image.Image:
+        """Título de uma rodada, cortado na largura da coluna"""
+        title_width = BracketVisualizer.MATCH_WIDTH + BracketVisualizer.HORIZONTAL_SPACING - 10
+        title_text = fit_text(name, BracketVisualizer.TITLE_FONT_SIZE, title_width)
+        return BracketVisualizer._patch(
+            (title_width, 30),
+            lambda d: d.text((0, 0), title_text, fill=BracketVisualizer.TEXT_COLOR, font=title_font)
+        )
+    
+    @staticmethod
+    def _draw_base(width: int, height: int, sections: List[tuple], fonts) -> Image.Image:
+        """Camada base na paleta do tema: títulos das rodadas e linhas de conexão"""
+        _, title_font = fonts
+        
+        img = Image.new('P', (width, height), color=BracketVisualizer.BACKGROUND_INDEX)
+        img.putpalette(BracketVisualizer._palette().getpalette())
+        draw = ImageDraw.Draw(img)
+        
+        for x, y, name in BracketVisualizer._titles(sections):
+            img.paste(BracketVisualizer._title_patch(name, title_font), (x, y))
+        
+        for segment in BracketVisualizer._connectors(sections):
+            draw.line(segment, fill=BracketVisualizer.ACCENT_INDEX, width=2)
+        
+        return img
+    
+    @staticmethod
+    def _base_layer(structure_key: str, width: int, height: int, sections: List[tuple], fonts) -> Image.Image:
+        base = BracketVisualizer._base_layers.get(structure_key)
+        if base is None:
+            base = BracketVisualizer._draw_base(width, height, sections, fonts)
+            BracketVisualizer._base_layers[structure_key] = base
+            while len(BracketVisualizer._base_layers) > BracketVisualizer.MAX_BASE_LAYERS:
+                BracketVisualizer._base_layers.popitem(last=False)
+        else:
+            BracketVisualizer._base_layers.move_to_end(structure_key)
+        return base
+    
+    @staticmethod
+    def _box_content(match: Dict) -> tuple:
+        return (BracketVisualizer._team_label(match['team1']), BracketVisualizer._team_label(match['team2']))
+    
+    @staticmethod
+    def render(render_data: Dict, image_format: str = 'png', lineage: Optional[str] = None) -> Optional[bytes]:
+        """
+        Ponto de entrada dos processos de renderização (dados de to_render_data)
+        
+        Formatos (IMAGE_FORMATS):
+            'png'          -> paleta do tema, compressão padrão (rápido)
+            'png_compact'  -> 16 cores em 4 bits (cerca de metade do tamanho;
+                              acima do nível 5 o zlib quase não reduz mais)
+            'svg'          -> vetorial, para o dashboard (sem fase de grupos)
+        
+        A camada base (títulos e linhas) fica em cache por estrutura da chave.
+        Com `lineage` (ex.: "guild:evento"), a última imagem composta também
+        fica em cache e a próxima renderização da mesma chave redesenha só
+        as caixas cujo conteúdo mudou.
+        """
+        if image_format not in BracketVisualizer.IMAGE_FORMATS:
+            raise ValueError(f"Formato de imagem inválido: {image_format}")
+        
+        layout = BracketVisualizer._sections(render_data)
+        if layout is None:
+            # Grupos e todos contra todos: só a primeira página
+            # (render_group_pages e render_round_robin_pages trazem as outras)
+            if image_format == 'svg':
+                return None
+            if render_data['type'] == 'groups':
+                pages = BracketVisualizer.render_group_pages(render_data, image_format=image_format)
+            elif render_data['type'] == 'round_robin':
+                pages = BracketVisualizer.render_round_robin_pages(render_data, 0, 1, image_format)
+            else:
+                return None
+            return pages[0] if pages else None
+        
+        if image_format == 'svg':
+            return BracketVisualizer._to_svg(*layout).encode('utf-8')
+        
+        with BracketVisualizer._layers_lock:
+            img, _ = BracketVisualizer._compose(layout, lineage)
+            return BracketVisualizer._encode(img, image_format)
+    
+    @staticmethod
+    def _compose(layout: tuple, lineage: Optional[str] = None) -> tuple:
+        """
+        Imagem composta (base + caixas) e a chave do seu conteúdo
+        
+        Chamar com _layers_lock: a imagem de uma lineage é alterada no lugar
+        na próxima renderização.
+        """
+        width, height, sections = layout
+        structure_key = BracketVisualizer._structure_key(width, height, sections)
+        boxes = BracketVisualizer._boxes(sections)
+        contents = [BracketVisualizer._box_content(match) for _, _, match in boxes]
+        fonts = BracketVisualizer._load_fonts()
+        
+        cached = BracketVisualizer._composed.get(lineage) if lineage else None
+        if cached is not None and cached[0] == structure_key:
+            _, img, previous = cached
+            changed = [i for i, (old, new) in enumerate(zip(previous, contents)) if old != new]
+        else:
+            img = BracketVisualizer._base_layer(structure_key, width, height, sections, fonts).copy()
+            changed = range(len(boxes))
+        
+        for i in changed:
+            x, y, match = boxes[i]
+            img.paste(BracketVisualizer._box_patch(match, fonts[0]), (x, y))
+        
+        if lineage:
+            BracketVisualizer._composed[lineage] = (structure_key, img, contents)
+            BracketVisualizer._composed.move_to_end(lineage)
+            while len(BracketVisualizer._composed) > BracketVisualizer.MAX_COMPOSED:
+                BracketVisualizer._composed.popitem(last=False)
+        
+        return img, content_key([structure_key, contents])
+    
+    @staticmethod
+    def render_png(render_data: Dict, lineage: Optional[str] = None) -> Optional[bytes]:
+        """Atalho para render() em PNG"""
+        return BracketVisualizer.render(render_data, 'png', lineage)
+    
+    # ---------- Recortes e blocos (chaves grandes) ----------
+    
+    @staticmethod
+    def match_region(render_data: Dict, keys: List[tuple], margin: int = 40) -> Optional[tuple]:
+        """
+        Retângulo (x0, y0, x1, y1) que cobre as partidas informadas
+        
+        As chaves seguem o BracketState: ('W', rodada, índice), ('L', rodada,
+        índice) e ('GF', n, 0). Chaves None ou fora do desenho são ignoradas.
+        """
+        layout = BracketVisualizer._sections(render_data)
+        if layout is None:
+            return None
+        width, height, sections = layout
+        
+        corners = [box[:2] for box in (BracketVisualizer._box_at(sections, key) for key in keys) if box]
+        if not corners:
+            return None
+        return (
+            max(0, min(x for x, _ in corners) - margin),
+            max(0, min(y for _, y in corners) - margin),
+            min(width, max(x for x, _ in corners) + BracketVisualizer.MATCH_WIDTH + margin),
+            min(height, max(y for _, y in corners) + BracketVisualizer.MATCH_HEIGHT + margin)
+        )
+    
+    @staticmethod
+    def _box_at(sections: List[tuple], key: Optional[tuple]) -> Optional[tuple]:
+        """(x, y, partida) da caixa de uma chave do BracketState, ou None"""
+        if key is None:
+            return None
+        section, round_index, match_index = key
+        if section == 'GF':
+            # Grande final (e o reset) ocupa a última coluna do winners
+            round_index, match_index = len(sections[0][0]) - 1, 0
+        section_index = 1 if section == 'L' else 0
+        if section_index >= len(sections):
+            return None
+        
+        rounds, x, y_start, multipliers, _ = sections[section_index]
+        if round_index >= len(rounds) or match_index >= len(rounds[round_index]['matches']):
+            return None
+        return (
+            x + round_index * (BracketVisualizer.MATCH_WIDTH + BracketVisualizer.HORIZONTAL_SPACING),
+            BracketVisualizer._match_y(y_start, multipliers[round_index], match_index),
+            rounds[round_index]['matches'][match_index]
+        )
+    
+    @staticmethod
+    def render_region(render_data: Dict, region: tuple, image_format: str = 'png',
+                      lineage: Optional[str] = None) -> Optional[bytes]:
+        """Só um recorte da chave (ex.: a partida registrada e a seguinte)"""
+        layout = BracketVisualizer._sections(render_data)
+        if layout is None or image_format == 'svg':
+            return None
+        
+        with BracketVisualizer._layers_lock:
+            img, _ = BracketVisualizer._compose(layout, lineage)
+            return BracketVisualizer._encode(img.crop(region), image_format)
+    
+    @staticmethod
+    def tile_info(render_data: Dict) -> Optional[Dict]:
+        """
+        Pirâmide de blocos da chave
+        
+        No zoom máximo cada bloco é um pedaço da imagem original; cada nível
+        abaixo reduz a imagem pela metade, até o zoom 0 caber em um bloco.
+        """
+        layout = BracketVisualizer._sections(render_data)
+        if layout is None:
+            return None
+        width, height, _ = layout
+        tile_size = BracketVisualizer.TILE_SIZE
+        return {
+            'width': width,
+            'height': height,
+            'tile_size': tile_size,
+            'max_zoom': max(0, math.ceil(math.log2(max(width, height) / tile_size)))
+        }
+    
+    @staticmethod
+    def render_tile(render_data: Dict, zoom: int, column: int, row: int) -> Optional[bytes]:
+        """
+        Bloco PNG (TILE_SIZE x TILE_SIZE) de um nível de zoom
+        
+        Retorna None fora da pirâmide. Nenhum nível monta a chave inteira:
+        no zoom máximo o bloco é desenhado direto do layout (_draw_region) e
+        cada bloco abaixo é a redução dos quatro blocos do nível acima. Os
+        blocos ficam em cache pelo conteúdo da chave, então os vizinhos e os
+        níveis seguintes reaproveitam o que já foi desenhado.
+        """
+        info = BracketVisualizer.tile_info(render_data)
+        if info is None or not 0 <= zoom <= info['max_zoom'] or column < 0 or row < 0:
+            return None
+        
+        tile_size = info['tile_size']
+        factor = 2 ** (info['max_zoom'] - zoom)
+        if column * tile_size * factor >= info['width'] or row * tile_size * factor >= info['height']:
+            return None
+        
+        layout = BracketVisualizer._sections(render_data)
+        width, height, sections = layout
+        content_id = content_key([
+            BracketVisualizer._structure_key(width, height, sections),
+            [BracketVisualizer._box_content(match) for _, _, match in BracketVisualizer._boxes(sections)]
+        ])
+        with BracketVisualizer._layers_lock:
+            tile = BracketVisualizer._tile_image(layout, content_id, factor, column, row)
+            return BracketVisualizer._encode(tile)
+    
+    @staticmethod
+    def _tile_image(layout: tuple, content_id: str, factor: int, column: int, row: int) -> Image.Image:
+        """Bloco na paleta do tema; `factor` é quantos pixels da chave cada pixel do bloco cobre"""
+        key = (content_id, factor, column, row)
+        tile = BracketVisualizer._tiles.get(key)
+        if tile is not None:
+            BracketVisualizer._tiles.move_to_end(key)
+            return tile
+        
+        tile_size = BracketVisualizer.TILE_SIZE
+        if factor == 1:
+            x, y = column * tile_size, row * tile_size
+            tile = BracketVisualizer._draw_region(layout, (x, y, x + tile_size, y + tile_size))
+        else:
+            # Média por blocos em RGB dos quatro filhos; fora da chave fica o fundo.
+            # Os filhos vêm antes do RGB: só um nível da recursão o aloca por vez
+            width, height, _ = layout
+            child_span = tile_size * factor // 2
+            children = [
+                (dx, dy, BracketVisualizer._tile_image(layout, content_id, factor // 2, column * 2 + dx, row * 2 + dy))
+                for dx in (0, 1) for dy in (0, 1)
+                if (column * 2 + dx) * child_span < width and (row * 2 + dy) * child_span < height
+            ]
+            merged = Image.new('RGB', (tile_size * 2, tile_size * 2), color=BracketVisualizer.BACKGROUND)
+            for dx, dy, child in children:
+                merged.paste(child.convert('RGB'), (dx * tile_size, dy * tile_size))
+            tile = merged.reduce(2).quantize(palette=BracketVisualizer._palette(), dither=Image.Dither.NONE)
+        
+        BracketVisualizer._tiles[key] = tile
+        while len(BracketVisualizer._tiles) > BracketVisualizer.MAX_TILES:
+            BracketVisualizer._tiles.popitem(last=False)
+        return tile
+    
+    @staticmethod
+    def _draw_region(layout: tuple, region: tuple) -> Image.Image:
+        """
+        Só o retângulo (x0, y0, x1, y1) da chave, desenhado a partir do layout
+        
+        Títulos, linhas e caixas são deslocados pela origem do retângulo e
+        só os que o cruzam são desenhados: a memória é a do retângulo, não a
+        da chave.
+        """
+        x0, y0, x1, y1 = region
+        _, _, sections = layout
+        font, title_font = BracketVisualizer._load_fonts()
+        title_width = BracketVisualizer.MATCH_WIDTH + BracketVisualizer.HORIZONTAL_SPACING - 10
+        
+        def overlaps(x: int, y: int, w: int, h: int) -> bool:
+            return x < x1 and x + w > x0 and y < y1 and y + h > y0
+        
+        img = Image.new('P', (x1 - x0, y1 - y0), color=BracketVisualizer.BACKGROUND_INDEX)
+        img.putpalette(BracketVisualizer._palette().getpalette())
+        draw = ImageDraw.Draw(img)
+        
+        for x, y, name in BracketVisualizer._titles(sections):
+            if overlaps(x, y, title_width, 30):
+                img.paste(BracketVisualizer._title_patch(name, title_font), (x - x0, y - y0))
+        
+        for (ax, ay), (bx, by) in BracketVisualizer._connectors(sections):
+            # Folga de 1 px: a linha tem 2 px de largura
+            if overlaps(min(ax, bx) - 1, min(ay, by) - 1, abs(bx - ax) + 3, abs(by - ay) + 3):
+                draw.line(((ax - x0, ay - y0), (bx - x0, by - y0)), fill=BracketVisualizer.ACCENT_INDEX, width=2)
+        
+        for x, y, match in BracketVisualizer._boxes(sections):
+            if overlaps(x, y, BracketVisualizer.MATCH_WIDTH + 1, BracketVisualizer.MATCH_HEIGHT + 1):
+                img.paste(BracketVisualizer._box_patch(match, font), (x - x0, y - y0))
+        
+        return img
+    
+    # ---------- Animação do resultado ----------
+    
+    @staticmethod
+    def _slot_at(sections: List[tuple], key: Optional[tuple], team: str) -> Optional[tuple]:
+        """Canto superior esquerdo da metade da caixa onde `team` aparece"""
+        box = BracketVisualizer._box_at(sections, key)
+        if box is None:
+            return None
+        x, y, match = box
+        offset = BracketVisualizer.MATCH_HEIGHT // 2 if match['team2'] == team and match['team1'] != team else 0
+        return x, y + offset
+    
+    @staticmethod
+    def _winner_label(team: str, font) -> Image.Image:
+        """Rótulo destacado que se move da partida para a vaga seguinte"""
+        label_width = BracketVisualizer.MATCH_WIDTH
+        label_height = BracketVisualizer.MATCH_HEIGHT // 2
+        text = fit_text(team, BracketVisualizer.FONT_SIZE, label_width - 20)
+        
+        def draw_label(draw):
+            draw.rectangle([(0, 0), (label_width, label_height)], fill=BracketVisualizer.ACCENT,
+                           outline=BracketVisualizer.TEXT_COLOR, width=2)
+            draw.text((10, 10), text, fill=BracketVisualizer.TEXT_COLOR, font=font)
+        
+        return BracketVisualizer._patch((label_width + 1, label_height + 1), draw_label)
+    
+    @staticmethod
+    def render_reveal(before: Dict, after: Dict, key: tuple, next_key: Optional[tuple], winner: str,
+                      image_format: str = 'gif', lineage: Optional[str] = None) -> Optional[bytes]:
+        """
+        Animação do vencedor saindo da partida e ocupando a vaga seguinte
+        
+        Só a região das duas partidas é animada. O quadro base (chave antes
+        do resultado) é composto uma vez e cada quadro é uma cópia dele com
+        o rótulo em movimento colado por cima; o último quadro mostra a chave
+        depois do resultado. Sem `next_key` (final), o rótulo fica parado.
+        """
+        if image_format not in BracketVisualizer.ANIMATION_FORMATS:
+            raise ValueError(f"Formato de animação inválido: {image_format}")
+        
+        layout_before = BracketVisualizer._sections(before)
+        layout_after = BracketVisualizer._sections(after)
+        if layout_before is None or layout_after is None:
+            return None
+        
+        region = BracketVisualizer.match_region(after, [key, next_key])
+        source = BracketVisualizer._slot_at(layout_after[2], key, winner)
+        target = BracketVisualizer._slot_at(layout_after[2], next_key, winner) or source
+        if region is None or source is None:
+            return None
+        
+        with BracketVisualizer._layers_lock:
+            # A imagem da lineage é alterada no lugar: recortar antes de compor a seguinte
+            img, _ = BracketVisualizer._compose(layout_before, lineage)
+            base = img.crop(region)
+            img, _ = BracketVisualizer._compose(layout_after, lineage)
+            final = img.crop(region)
+        
+        label = BracketVisualizer._winner_label(winner, BracketVisualizer._load_fonts()[0])
+        source_x, source_y = source[0] - region[0], source[1] - region[1]
+        target_x, target_y = target[0] - region[0], target[1] - region[1]
+        
+        frames = []
+        steps = BracketVisualizer.ANIMATION_FRAMES
+        for step in range(steps):
+            progress = step / (steps - 1)
+            eased = progress * progress * (3 - 2 * progress)
+            frame = base.copy()
+            frame.paste(label, (
+                round(source_x + (target_x - source_x) * eased),
+                round(source_y + (target_y - source_y) * eased)
+            ))
+            frames.append(frame)
+        
+        final.paste(label, (target_x, target_y))
+        frames.append(final)
+        durations = [BracketVisualizer.ANIMATION_FRAME_MS] * steps + [BracketVisualizer.ANIMATION_HOLD_MS]
+        
+        return BracketVisualizer._encode_animation(frames, durations, image_format)
+    
+    @staticmethod
+    def _encode_animation(frames: List[Image.Image], durations: List[int], image_format: str) -> bytes:
+        buffer = BytesIO()
+        if image_format == 'gif':
+            # Quadros já na paleta do tema: o GIF só grava a área que mudou entre eles
+            frames[0].save(buffer, format='GIF', save_all=True, append_images=frames[1:],
+                           duration=durations, loop=0, disposal=1)
+        else:
+            frames = [frame.convert('RGB') for frame in frames]
+            frames[0].save(buffer, format='WEBP', save_all=True, append_images=frames[1:],
+                           duration=durations, loop=0, lossless=True, method=4)
+        return buffer.getvalue()
+    
+    # ---------- Codificação ----------
+    
+    @staticmethod
+    def _encode(img: Image.Image, image_format: str = 'png') -> bytes:
+        buffer = BytesIO()
+        if image_format == 'png_compact':
+            BracketVisualizer._compact(img).save(buffer, format='PNG', bits=4, compress_level=5)
+        else:
+            img.save(buffer, format='PNG')
+        return buffer.getvalue()
+    
+    @staticmethod
+    def _compact(img: Image.Image) -> Image.Image:
+        """
+        Reduz a paleta do tema a 16 cores
+        
+        Cada índice vai para o nível mais próximo da própria rampa (fundo,
+        texto e destaque continuam exatos; só o antialiasing perde tons).
+        """
+        if BracketVisualizer._compact_palette is None:
+            lut, indices = [], []
+            for (start, size), levels in zip(((0, 128), (128, 64), (192, 64)), BracketVisualizer.COMPACT_LEVELS):
+                offset = len(indices)
+                lut.extend(offset + round(i * (levels - 1) / (size - 1)) for i in range(size))
+                indices.extend(start + round(j * (size - 1) / (levels - 1)) for j in range(levels))
+            
+            palette = BracketVisualizer._palette().getpalette()
+            colors = [value for index in indices for value in palette[index * 3:index * 3 + 3]]
+            BracketVisualizer._compact_palette = (lut, colors)
+        
+        lut, colors = BracketVisualizer._compact_palette
+        compact = img.point(lut)
+        compact.putpalette(colors)
+        return compact
+    
+    @staticmethod
+    def _to_svg(width: int, height: int, sections: List[tuple]) -> str:
+        """Mesma geometria do PNG em SVG (texto cortado com as métricas do registro de fontes)"""
+        match_width = BracketVisualizer.MATCH_WIDTH
+        match_height = BracketVisualizer.MATCH_HEIGHT
+        title_width = match_width + BracketVisualizer.HORIZONTAL_SPACING - 10
+        font_family = "DejaVu Sans, Arial, sans-serif"
+        
+        parts = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'viewBox="0 0 {width} {height}">',
+            '<style>'
+            f'.t{{fill:{BracketVisualizer.TEXT_COLOR};font:{BracketVisualizer.FONT_SIZE}px {font_family}}}'
+            f'.h{{fill:{BracketVisualizer.TEXT_COLOR};font:{BracketVisualizer.TITLE_FONT_SIZE}px {font_family}}}'
+            f'.b{{fill:none;stroke:{BracketVisualizer.ACCENT};stroke-width:2}}'
+            f'.l{{fill:none;stroke:{BracketVisualizer.ACCENT};stroke-width:1}}'
+            '</style>',
+            f'<rect width="100%" height="100%" fill="{BracketVisualizer.BACKGROUND}"/>'
+        ]
+        
+        # Títulos (y do SVG é a linha de base; no Pillow é o topo do texto)
+        for x, y, name in BracketVisualizer._titles(sections):
+            title = escape(fit_text(name, BracketVisualizer.TITLE_FONT_SIZE, title_width))
+            parts.append(f'<text class="h" x="{x}" y="{y + BracketVisualizer.TITLE_FONT_SIZE}">{title}</text>')
+        
+        # Linhas de conexão em um único path
+        path = "".join(f"M{x1} {y1}L{x2} {y2}" for (x1, y1), (x2, y2) in BracketVisualizer._connectors(sections))
+        if path:
+            parts.append(f'<path class="b" d="{path}"/>')
+        
+        label_width = match_width - 20
+        for x, y, match in BracketVisualizer._boxes(sections):
+            team1, team2 = (
+                escape(fit_text(label, BracketVisualizer.FONT_SIZE, label_width))
+                for label in BracketVisualizer._box_content(match)
+            )
+            parts.append(
+                f'<g transform="translate({x},{y})">'
+                f'<rect class="b" width="{match_width}" height="{match_height}"/>'
+                f'<path class="l" d="M0 {match_height // 2}H{match_width}"/>'
+                f'<text class="t" x="10" y="{10 + BracketVisualizer.FONT_SIZE}">{team1}</text>'
+                f'<text class="t" x="10" y="{match_height // 2 + 10 + BracketVisualizer.FONT_SIZE}">{team2}</text>'
+                '</g>'
+            )
+        
+        parts.append('</svg>')
+        return "\n".join(parts)
+    
+    # ---------- Fase de grupos ----------
+    
+    @staticmethod
+    def _group_labels(group: Dict) -> tuple:
+        """
+        Nome do grupo e dos times já cortados para caber no quadro
+        
+        Medido antes das threads: fit_text usa as fontes compartilhadas do
+        registro, e FreeType não é thread-safe.
+        """
+        width = BracketVisualizer.GROUP_TILE_WIDTH
+        team_width = BracketVisualizer.GROUP_COLUMNS[2][1] - BracketVisualizer.GROUP_COLUMNS[1][1] - 40
+        return (
+            fit_text(group['name'], BracketVisualizer.TITLE_FONT_SIZE, width - 24),
+            [fit_text(BracketVisualizer._team_label(row['team']), BracketVisualizer.FONT_SIZE, team_width)
+             for row in group['standings']]
+        )
+    
+    @staticmethod
+    def _group_tile(group: Dict, labels: tuple) -> Image.Image:
+        """Tabela de um grupo (nome, cabeçalho e uma linha por time) na paleta do tema"""
+        # Cada thread usa a própria cópia das fontes; os textos já vêm cortados (_group_labels)
+        fonts = getattr(BracketVisualizer._thread_fonts, 'fonts', None)
+        if fonts is None:
+            fonts = tuple(font.font_variant() for font in BracketVisualizer._load_fonts())
+            BracketVisualizer._thread_fonts.fonts = fonts
+        font, title_font = fonts
+        
+        width = BracketVisualizer.GROUP_TILE_WIDTH
+        row_height = BracketVisualizer.GROUP_ROW_HEIGHT
+        header_y = BracketVisualizer.GROUP_TITLE_HEIGHT
+        height = header_y + row_height * (len(group['standings']) + 1) + 10
+        title, team_labels = labels
+        
+        def draw_tile(draw):
+            def write(y: int, values: list):
+                for (_, x, right), value in zip(BracketVisualizer.GROUP_COLUMNS, values):
+                    text = str(value)
+                    if right:
+                        x -= draw.textlength(text, font=font)
+                    draw.text((x, y + 6), text, fill=BracketVisualizer.TEXT_COLOR, font=font)
+            
+            draw.rectangle([(0, 0), (width - 1, height - 1)], outline=BracketVisualizer.ACCENT, width=2)
+            draw.text((12, 8), title, fill=BracketVisualizer.TEXT_COLOR, font=title_font)
+            
+            draw.rectangle([(2, header_y), (width - 3, header_y + row_height)], fill=BracketVisualizer.ACCENT)
+            write(header_y, [title for title, _, _ in BracketVisualizer.GROUP_COLUMNS])
+            
+            y = header_y
+            for position, (row, label) in enumerate(zip(group['standings'], team_labels), start=1):
+                y += row_height
+                write(y, [
+                    position,
+                    label,
+                    row['played'], row['wins'], row['draws'], row['losses'], row['kills'], row['points']
+                ])
+        
+        return BracketVisualizer._patch((width, height), draw_tile)
+    
+    @staticmethod
+    def _group_pages(tiles: List[Image.Image]) -> List[List[Image.Image]]:
+        """Distribui os quadros em linhas da grade e as linhas em páginas de altura limitada"""
+        columns = BracketVisualizer.GROUP_GRID_COLUMNS
+        gap = BracketVisualizer.GROUP_TILE_GAP
+        
+        pages, page, page_height = [], [], 0
+        for start in range(0, len(tiles), columns):
+            row = tiles[start:start + columns]
+            row_height = max(tile.height for tile in row) + gap
+            if page and page_height + row_height > BracketVisualizer.GROUP_MAX_PAGE_HEIGHT:
+                pages.append(page)
+                page, page_height = [], 0
+            page.extend(row)
+            page_height += row_height
+        
+        if page:
+            pages.append(page)
+        return pages
+    
+    @staticmethod
+    def _compose_groups(tiles: List[Image.Image]) -> Image.Image:
+        """Cola os quadros de uma página em uma grade"""
+        columns = min(BracketVisualizer.GROUP_GRID_COLUMNS, len(tiles))
+        gap = BracketVisualizer.GROUP_TILE_GAP
+        margin = 30
+        
+        rows = [tiles[start:start + columns] for start in range(0, len(tiles), columns)]
+        row_heights = [max(tile.height for tile in row) for row in rows]
+        width = margin * 2 + columns * BracketVisualizer.GROUP_TILE_WIDTH + (columns - 1) * gap
+        height = margin * 2 + sum(row_heights) + (len(rows) - 1) * gap
+        
+        img = Image.new('P', (width, height), color=BracketVisualizer.BACKGROUND_INDEX)
+        img.putpalette(BracketVisualizer._palette().getpalette())
+        
+        y = margin
+        for row, row_height in zip(rows, row_heights):
+            for column, tile in enumerate(row):
+                img.paste(tile, (margin + column * (BracketVisualizer.GROUP_TILE_WIDTH + gap), y))
+            y += row_height + gap
+        
+        return img
+    
+    @staticmethod
+    def render_group_pages(render_data: Dict, max_bytes: Optional[int] = None,
+                           image_format: str = 'png') -> List[bytes]:
+        """
+        Tabelas da fase de grupos em uma ou mais imagens PNG
+        
+        Os quadros (um por grupo) são desenhados em paralelo e colados em
+        grade, com altura máxima por página. Uma página que passar de
+        `max_bytes` (padrão: limite de anexo do Discord) é dividida ao meio.
+        Só formatos PNG (sem SVG para a fase de grupos).
+        """
+        if max_bytes is None:
+            max_bytes = BracketVisualizer.DISCORD_FILE_LIMIT
+        
+        groups = render_data.get('groups') or []
+        if not groups or image_format == 'svg':
+            return []
+        
+        labels = [BracketVisualizer._group_labels(group) for group in groups]
+        with ThreadPoolExecutor(max_workers=min(4, len(groups)), thread_name_prefix="group-tile") as executor:
+            tiles = list(executor.map(BracketVisualizer._group_tile, groups, labels))
+        
+        pages = []
+        pending = deque(BracketVisualizer._group_pages(tiles))
+        while pending:
+            page_tiles = pending.popleft()
+            png = BracketVisualizer._encode(BracketVisualizer._compose_groups(page_tiles), image_format)
+            if len(png) > max_bytes and len(page_tiles) > 1:
+                half = len(page_tiles) // 2
+                pending.appendleft(page_tiles[half:])
+                pending.appendleft(page_tiles[:half])
+                continue
+            pages.append(png)
+        
+        return pages
+    
+    # ---------- Todos contra todos ----------
+    
+    @staticmethod
+    def _round_robin_page_matches() -> int:
+        """Partidas de uma rodada que cabem na altura máxima da página"""
+        stride = BracketVisualizer.MATCH_HEIGHT + BracketVisualizer.VERTICAL_SPACING
+        return max(1, (BracketVisualizer.ROUND_ROBIN_MAX_PAGE_HEIGHT - 100) // stride)
+    
+    @staticmethod
+    def round_robin_page_count(render_data: Dict) -> int:
+        """Quantas páginas render_round_robin_pages gera para a tabela inteira"""
+        teams_count = len(render_data['teams'])
+        rounds_total = teams_count - 1 if teams_count % 2 == 0 else teams_count
+        match_blocks = math.ceil(max(1, teams_count // 2) / BracketVisualizer._round_robin_page_matches())
+        return math.ceil(rounds_total / BracketVisualizer.ROUND_ROBIN_PAGE_ROUNDS) * match_blocks
+    
+    @staticmethod
+    def _round_robin_page(render_data: Dict, page: int) -> Dict:
+        """
+        Dados de uma página: até ROUND_ROBIN_PAGE_ROUNDS rodadas, cada uma
+        com as partidas que cabem na altura máxima
+        
+        As rodadas são geradas de novo por iter_round_robin e só as da
+        página são guardadas; as páginas seguem rodada por rodada e, dentro
+        de cada bloco de rodadas, as partidas de cima para baixo.
+        """
+        round_matches = max(1, len(render_data['teams']) // 2)
+        match_blocks = math.ceil(round_matches / BracketVisualizer._round_robin_page_matches())
+        # Blocos do mesmo tamanho (100 partidas: 34 + 34 + 32, e não 48 + 48 + 4)
+        per_page = math.ceil(round_matches / match_blocks)
+        round_block, match_block = divmod(page, match_blocks)
+        first_round = round_block * BracketVisualizer.ROUND_ROBIN_PAGE_ROUNDS
+        first_match = match_block * per_page
+        
+        rounds = BracketGenerator.iter_round_robin(
+            render_data['teams'], render_data['home_away'], render_data['lobbies']
+        )
+        page_rounds = []
+        for round_data in islice(rounds, first_round, first_round + BracketVisualizer.ROUND_ROBIN_PAGE_ROUNDS):
+            name = round_data['name']
+            if match_blocks > 1:
+                name = f"{name} ({match_block + 1}/{match_blocks})"
+            page_rounds.append({
+                'name': name,
+                'phase': round_data['phase'],
+                'matches': round_data['matches'][first_match:first_match + per_page]
+            })
+        
+        return {'type': 'round_robin', 'rounds': page_rounds}
+    
+    @staticmethod
+    def render_round_robin_pages(render_data: Dict, first: int = 0, count: int = 1,
+                                 image_format: str = 'png') -> List[bytes]:
+        """
+        Páginas `first`..`first + count - 1` da tabela do todos contra todos
+        
+        Cada página é desenhada e codificada antes da seguinte, então o
+        pico de memória é o de uma página (no máximo ROUND_ROBIN_PAGE_ROUNDS
+        colunas por ROUND_ROBIN_MAX_PAGE_HEIGHT), seja qual for o número de
+        times. Só formatos PNG.
+        """
+        if image_format == 'svg' or not render_data.get('teams'):
+            return []
+        
+        last = min(first + count, BracketVisualizer.round_robin_page_count(render_data))
+        pages = []
+        for page in range(first, last):
+            layout = BracketVisualizer._sections(BracketVisualizer._round_robin_page(render_data, page))
+            with BracketVisualizer._layers_lock:
+                img, _ = BracketVisualizer._compose(layout)
+                pages.append(BracketVisualizer._encode(img, image_format))
+        
+        return pages
+
+class BracketsCog(commands.Cog):
+    """Sistema de chaveamento automático"""
+    
+    # Páginas do todos contra todos enviadas junto com /gerar_chave (as outras em /rodadas_chave)
+    ROUND_ROBIN_PREVIEW_PAGES = 3
+    
+    def __init__(self, bot):
+        self.bot = bot
+        self.active_brackets: Dict[tuple, BracketState] = {}  # (guild_id, evento) -> progressão
+        self.active_groups: Dict[tuple, Dict] = {}  # (guild_id, evento) -> fase de grupos
+        self.active_swiss: Dict[tuple, Dict] = {}  # (guild_id, evento) -> chave do Suíço (com o SwissSystem)
+        self._index_ready = False
+        self.render_pool = RenderPool(max_workers=2, max_queue=8, timeout=30.0, name="chaves")
+        self.render_cache = RenderCache()
+        self.render_stats_task.start()
+    
+    def cog_unload(self):
+        self.render_stats_task.cancel()
+        self.render_pool.shutdown()
+    
+    # =============================================
+    # MÉTRICAS DE RENDERIZAÇÃO
+    # =============================================
+    
+    @tasks.loop(minutes=30)
+    async def render_stats_task(self):
+        """Registra a latência de renderização no log (só se houve trabalho desde o início)"""
+        stats = self.render_pool.stats()
+        if stats["completed"] or stats["timeouts"] or stats["failures"]:
+            logger.info(self.render_pool.summary())
+    
+    @render_stats_task.before_loop
+    async def before_render_stats(self):
+        await self.bot.wait_until_ready()
+    
+    @commands.command(name="render_status")
+    @commands.is_owner()
+    async def render_status(self, ctx):
+        """Latência e contadores das filas de renderização (chaves e gráficos)"""
+        pools = [self.render_pool]
+        qol = self.bot.get_cog("QualityOfLifeCog")
+        if qol is not None:
+            pools.append(qol.charts.pool)
+        
+        embed = discord.Embed(title="🖼️ Renderização", color=BotConfig.COLORS['info'])
+        for pool in pools:
+            stats = pool.stats()
+            embed.add_field(
+                name=pool.name,
+                value="\n".join(f"**{key}:** {'-' if value is None else value}" for key, value in stats.items()),
+                inline=True
+            )
+        
+        await ctx.send(embed=embed)
+    
+    async def _render_bracket(
+        self,
+        bracket: Dict,
+        lineage: Optional[str] = None,
+        image_format: str = 'png'
+    ) -> Optional[BytesIO]:
+        """
+        Desenha a chave no pool de processos, sem travar o event loop
+        
+        Retorna None se o formato não tiver desenho, a fila estiver cheia
+        ou a renderização estourar o tempo. Chaves já desenhadas (mesmo
+        conteúdo e layout) saem do cache sem passar pelo Pillow; com
+        `lineage`, o worker redesenha só as partidas que mudaram desde a
+        última imagem daquela chave.
+        """
+        render_data = BracketVisualizer.to_render_data(bracket)
+        key = BracketVisualizer.cache_key(render_data, image_format)
+        
+        png = await self.render_cache.aget(key)
+        if png is None:
+            try:
+                png = await self.render_pool.submit(
+                    BracketVisualizer.render, render_data, image_format, lineage, key=lineage
+                )
+            except (RenderQueueFull, RenderTimeout, RenderFailed) as e:
+                logger.warning(f"Chave não renderizada: {e}")
+                return None
+            if png:
+                await self.render_cache.aput(key, png)
+        
+        return BytesIO(png) if png else None
+    
+    async def _render_match_region(self, bracket: Dict, keys: List[tuple], lineage: str) -> Optional[BytesIO]:
+        """Recorte da chave só com as partidas informadas (chaves grandes não cabem inteiras no chat)"""
+        render_data = BracketVisualizer.to_render_data(bracket)
+        region = BracketVisualizer.match_region(render_data, keys)
+        if region is None:
+            return None
+        key = content_key(BracketVisualizer.cache_key(render_data), region=list(region))
+        
+        png = await self.render_cache.aget(key)
+        if png is None:
+            try:
+                png = await self.render_pool.submit(
+                    BracketVisualizer.render_region, render_data, region, 'png', lineage, key=lineage
+                )
+            except (RenderQueueFull, RenderTimeout, RenderFailed) as e:
+                logger.warning(f"Recorte da chave não renderizado: {e}")
+                return None
+            if png:
+                await self.render_cache.aput(key, png)
+        
+        return BytesIO(png) if png else None
+    
+    async def _render_reveal(
+        self,
+        before: Dict,
+        bracket: Dict,
+        key: tuple,
+        next_key: Optional[tuple],
+        winner: str,
+        lineage: str
+    ) -> Optional[BytesIO]:
+        """GIF do vencedor avançando (um por resultado; repostar sai do cache)"""
+        after = BracketVisualizer.to_render_data(bracket)
+        cache_key = content_key(
+            BracketVisualizer.cache_key(after, 'gif'),
+            before=BracketVisualizer.cache_key(before),
+            reveal=[key, next_key, winner]
+        )
+        
+        gif = await self.render_cache.aget(cache_key)
+        if gif is None:
+            try:
+                gif = await self.render_pool.submit(
+                    BracketVisualizer.render_reveal, before, after, key, next_key, winner, 'gif', lineage,
+                    key=lineage
+                )
+            except (RenderQueueFull, RenderTimeout, RenderFailed) as e:
+                logger.warning(f"Animação do resultado não renderizada: {e}")
+                return None
+            if gif:
+                await self.render_cache.aput(cache_key, gif)
+        
+        return BytesIO(gif) if gif else None
+    
+    async def _render_group_pages(self, bracket: Dict, image_format: str = 'png') -> List[BytesIO]:
+        """Tabelas da fase de grupos (uma ou mais imagens, cada uma dentro do limite do Discord)"""
+        render_data = BracketVisualizer.to_render_data(bracket)
+        try:
+            pages = await self.render_pool.submit(
+                BracketVisualizer.render_group_pages, render_data, None, image_format
+            )
+        except (RenderQueueFull, RenderTimeout, RenderFailed) as e:
+            logger.warning(f"Grupos não renderizados: {e}")
+            return []
+        return [BytesIO(page) for page in pages]
+    
+    async def _render_round_robin_pages(self, bracket: Dict, first: int, count: int,
+                                        image_format: str = 'png') -> List[BytesIO]:
+        """Páginas da tabela do todos contra todos (geradas no worker, uma por vez)"""
+        render_data = BracketVisualizer.to_render_data(bracket)
+        pages = []
+        missing = []
+        for page in range(first, first + count):
+            png = await self.render_cache.aget(BracketVisualizer.cache_key(dict(render_data, page=page), image_format))
+            pages.append(png)
+            if png is None:
+                missing.append(page)
+        
+        if missing:
+            try:
+                rendered = await self.render_pool.submit(
+                    BracketVisualizer.render_round_robin_pages, render_data, missing[0],
+                    missing[-1] - missing[0] + 1, image_format
+                )
+            except (RenderQueueFull, RenderTimeout, RenderFailed) as e:
+                logger.warning(f"Todos contra todos não renderizado: {e}")
+                return []
+            for page, png in zip(range(missing[0], missing[-1] + 1), rendered):
+                if pages[page - first] is None:
+                    pages[page - first] = png
+                    await self.render_cache.aput(
+                        BracketVisualizer.cache_key(dict(render_data, page=page), image_format), png
+                    )
+        
+        return [BytesIO(png) for png in pages if png]
+    
+    # =============================================
+    # PERSISTÊNCIA
+    # =============================================
+    
+    async def _ensure_index(self, session):
+        """Cria o índice (event_id, phase) em bancos que já existiam antes dele"""
+        if self._index_ready:
+            return
+        connection = await session.connection()
+        await connection.run_sync(lambda sync_conn: ix_match_event_phase.create(sync_conn, checkfirst=True))
+        self._index_ready = True
+    
+    @staticmethod
+    async def _get_event(session, guild_id: int, evento: str) -> Optional[Event]:
+        # Nomes de evento só são únicos dentro do servidor
+        result = await session.execute(
+            select(Event).where(Event.guild_id == str(guild_id), Event.name == evento)
+        )
+        return result.scalars().first()
+    
+    @staticmethod
+    async def _get_bracket_row(session, event: Event) -> Optional[Bracket]:
+        result = await session.execute(select(Bracket).where(Bracket.event_id == event.id))
+        return result.scalars().first()
+    
+    @staticmethod
+    def _phase_type(phase: str) -> Optional[PhaseType]:
+        """Fase da rodada no modelo Match (losers e grande final ficam só no Bracket)"""
+        try:
+            return PhaseType(phase)
+        except ValueError:
+            return None
+    
+    @staticmethod
+    def _team_id(team) -> Optional[int]:
+        return team.id if team is not None else None
+    
+    @staticmethod
+    def _stage_data(bracket: Dict) -> str:
+        """
+        JSON de Bracket.data para grupos, Suíço e todos contra todos
+        
+        Os times vão por ID (e nome, para a mensagem de erro) na ordem que o
+        estado do formato usa para referenciá-los.
+        """
+        if bracket['type'] == 'groups':
+            teams = [team for group in bracket['groups'] for team in group['teams']]
+            state = BracketGenerator.group_stage_state(bracket)
+        elif bracket['type'] == 'swiss':
+            teams = bracket['swiss'].teams
+            state = bracket['swiss'].to_state()
+        else:
+            teams = bracket['teams']
+            state = {'home_away': bracket['home_away'], 'lobbies': bracket['lobbies']}
+        
+        return json.dumps({
+            'type': bracket['type'],
+            'ids': [team.id for team in teams],
+            'teams': [team.name for team in teams],
+            'state': state
+        }, ensure_ascii=False, separators=(',', ':'))
+    
+    @staticmethod
+    async def _resolve_teams(session, event: Event, ids: List[Optional[int]], names: List[str]) -> List[Team]:
+        """
+        Times salvos na chave, buscados pelo ID (pelo nome em chaves antigas, sem IDs)
+        
+        Raises:
+            ValueError: algum time foi excluído (ou renomeado, em chave sem IDs)
+        """
+        result = await session.execute(select(Team).where(Team.event_id == event.id))
+        teams = result.scalars().all()
+        by_id = {team.id: team for team in teams}
+        by_name = {team.name: team for team in teams}
+        
+        resolved, missing = [], []
+        for team_id, name in zip(ids, names):
+            team = by_id.get(team_id) if team_id is not None else by_name.get(name)
+            if team is None:
+                missing.append(name)
+            resolved.append(team)
+        
+        if missing:
+            raise ValueError(
+                f"Time(s) da chave não encontrado(s) no evento: {', '.join(missing)}. "
+                f"Gere a chave novamente com /gerar_chave."
+            )
+        return resolved
+    
+    async def _save_bracket(self, session, event: Event, bracket: Dict):
+        """
+        Grava a chave inteira numa transação: uma linha em Bracket e as
+        partidas de cada fase em Match com um único INSERT em lote
+        
+        Eliminatórias vão em formato compacto; os outros formatos guardam
+        o próprio estado em Bracket.data (as rodadas deles não têm PhaseType).
+        """
+        await self._ensure_index(session)
+        
+        elimination = bracket['type'] in ('single_elimination', 'double_elimination')
+        data = CompactBracket.from_dict(bracket).to_json() if elimination else BracketsCog._stage_data(bracket)
+        
+        rows = []
+        # Todos contra todos é gerado sob demanda: as rodadas não são expandidas aqui
+        rounds = bracket.get('rounds')
+        if not isinstance(rounds, list):
+            rounds = []
+        
+        for round_data in rounds:
+            phase = BracketsCog._phase_type(round_data['phase'])
+            if phase is None:
+                continue
+            for match in round_data['matches']:
+                rows.append({
+                    'event_id': event.id,
+                    'phase': phase,
+                    'match_number': match['match_number'],
+                    'team1_id': BracketsCog._team_id(match['team1']),
+                    'team2_id': BracketsCog._team_id(match['team2']),
+                    'winner_id': BracketsCog._team_id(match.get('winner'))
+                })
+        
+        try:
+            # Chave regerada substitui a anterior
+            await session.execute(Match.__table__.delete().where(Match.event_id == event.id))
+            await session.execute(Bracket.__table__.delete().where(Bracket.event_id == event.id))
+            
+            session.add(Bracket(
+                event_id=event.id,
+                bracket_type=bracket['type'],
+                current_phase=rounds[0]['phase'] if rounds else None,
+                data=data
+            ))
+            if rows:
+                await session.execute(insert(Match), rows)
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+    
+    async def _load_state(self, session, guild_id: int, evento: str, event: Event) -> Optional[BracketState]:
+        """
+        Estado da chave em memória ou reconstruído a partir do Bracket salvo
+        
+        Raises:
+            ValueError: a chave salva cita times que não existem mais
+        """
+        state = self.active_brackets.get((guild_id, evento))
+        if state is not None:
+            return state
+        
+        bracket_row = await BracketsCog._get_bracket_row(session, event)
+        if bracket_row is None or not bracket_row.data or \
+                bracket_row.bracket_type not in ('single_elimination', 'double_elimination'):
+            return None
+        
+        compact = CompactBracket.from_json(bracket_row.data)
+        teams = await BracketsCog._resolve_teams(session, event, compact.team_ids, compact.team_names)
+        
+        state = BracketState(compact.to_dict(teams))
+        phases = [round_data['phase'] for round_data in state.bracket['rounds']]
+        state.phase = phases.index(bracket_row.current_phase) if bracket_row.current_phase in phases else len(phases)
+        
+        self.active_brackets[(guild_id, evento)] = state
+        return state
+    
+    async def _load_groups(self, session, guild_id: int, evento: str, event: Event) -> Optional[Dict]:
+        """
+        Fase de grupos em memória ou reconstruída a partir do Bracket salvo
+        
+        Raises:
+            ValueError: a fase salva cita times que não existem mais
+        """
+        stage = self.active_groups.get((guild_id, evento))
+        if stage is not None:
+            return stage
+        
+        bracket_row = await BracketsCog._get_bracket_row(session, event)
+        if bracket_row is None or bracket_row.bracket_type != 'groups' or not bracket_row.data:
+            return None
+        
+        data = json.loads(bracket_row.data)
+        teams = await BracketsCog._resolve_teams(session, event, data['ids'], data['teams'])
+        stage = BracketGenerator.group_stage_from_state(data['state'], teams)
+        
+        self.active_groups[(guild_id, evento)] = stage
+        return stage
+    
+    async def _load_swiss(self, session, guild_id: int, evento: str, event: Event) -> Optional[Dict]:
+        """
+        Chave do Suíço em memória ou reconstruída a partir do Bracket salvo
+        
+        Raises:
+            ValueError: a chave salva cita times que não existem mais
+        """
+        bracket = self.active_swiss.get((guild_id, evento))
+        if bracket is not None:
+            return bracket
+        
+        bracket_row = await BracketsCog._get_bracket_row(session, event)
+        if bracket_row is None or bracket_row.bracket_type != 'swiss' or not bracket_row.data:
+            return None
+        
+        data = json.loads(bracket_row.data)
+        teams = await BracketsCog._resolve_teams(session, event, data['ids'], data['teams'])
+        bracket = BracketGenerator.swiss_bracket(SwissSystem.from_state(data['state'], teams))
+        
+        self.active_swiss[(guild_id, evento)] = bracket
+        return bracket
+    
+    @staticmethod
+    async def _load_round_robin(session, event: Event) -> Optional[Dict]:
+        """
+        Todos contra todos a partir do Bracket salvo (rodadas sob demanda)
+        
+        Raises:
+            ValueError: a tabela salva cita times que não existem mais
+        """
+        bracket_row = await BracketsCog._get_bracket_row(session, event)
+        if bracket_row is None or bracket_row.bracket_type != 'round_robin' or not bracket_row.data:
+            return None
+        
+        data = json.loads(bracket_row.data)
+        teams = await BracketsCog._resolve_teams(session, event, data['ids'], data['teams'])
+        state = data.get('state') or {}
+        return BracketGenerator.create_round_robin(teams, state.get('home_away', True), state.get('lobbies'))
+    
+    async def _phase_matches(self, session, event: Event, phase: PhaseType) -> List[Match]:
+        """Partidas de uma única fase (usa o índice event_id, phase)"""
+        result = await session.execute(
+            select(Match)
+            .where(Match.event_id == event.id, Match.phase == phase)
+            .order_by(Match.match_number)
+        )
+        return result.scalars().all()
+    
+    @staticmethod
+    def _format_matches(matches: List[Dict]) -> str:
+        lines = []
+        for match in matches:
+            team1 = match['team1'].name if match['team1'] else 'TBD'
+            team2 = match['team2'].name if match['team2'] else 'TBD'
+            result = f" → **{match['winner'].name}**" if match['winner'] else ""
+            lines.append(f"`#{match['match_number']}` {team1} x {team2}{result}")
+        return "\n".join(lines)[:1024] or "—"
+    
+    @staticmethod
+    def _parse_orgs(text: Optional[str]) -> Dict[str, str]:
+        """Lê organizações no formato `Time:Org;Time:Org` (nomes sem diferenciar maiúsculas)"""
+        orgs = {}
+        if not text:
+            return orgs
+        for entry in text.replace("\n", ";").split(";"):
+            entry = entry.strip()
+            if not entry:
+                continue
+            name, separator, org = entry.rpartition(":")
+            if not separator or not name.strip() or not org.strip():
+                raise ValueError(f"Organização inválida: '{entry}' (use Time:Org)")
+            orgs[name.strip().lower()] = org.strip().lower()
+        return orgs
+    
+    @staticmethod
+    def _build_bracket(
+        teams: List[Team],
+        tipo: str,
+        sortear: bool,
+        semente: Optional[int],
+        orgs: Optional[Dict[str, str]] = None
+    ) -> Optional[Dict]:
+        if tipo == "single":
+            return BracketGenerator.create_single_elimination(teams, shuffle=sortear, seed=semente)
+        elif tipo == "double":
+            return BracketGenerator.create_double_elimination(teams, shuffle=sortear, seed=semente)
+        elif tipo == "swiss":
+            return BracketGenerator.create_swiss(teams)
+        elif tipo == "groups":
+            org_key = (lambda team: orgs.get(team.name.lower())) if orgs else None
+            return BracketGenerator.create_groups(teams, shuffle=sortear, seed=semente, org_key=org_key)
+        elif tipo == "round_robin":
+            return BracketGenerator.create_round_robin(teams)
+        return None
+    
+    @app_commands.command(
+        name="gerar_chave",
+        description="Gera chaveamento automático para o evento"
+    )
+    @app_commands.describe(
+        evento="Nome do evento",
+        tipo="Tipo de chaveamento",
+        sortear="Sortear a ordem dos times dentro de cada pote de sementes",
+        semente="Semente do sorteio (repita o número para obter a mesma chave)",
+        leve="Imagem com menos cores e arquivo menor (para chaves grandes)",
+        organizacoes="Fase de grupos: Time:Org;Time:Org (mesma organização não cai no mesmo grupo)"
+    )
+    @app_commands.choices(tipo=[
+        app_commands.Choice(name="Eliminatória Simples", value="single"),
+        app_commands.Choice(name="Eliminatória Dupla", value="double"),
+        app_commands.Choice(name="Fase de Grupos", value="groups"),
+        app_commands.Choice(name="Sistema Suíço", value="swiss"),
+        app_commands.Choice(name="Todos contra Todos", value="round_robin")
+    ])
+    async def gerar_chave(
+        self,
+        interaction: discord.Interaction,
+        evento: str,
+        tipo: str,
+        sortear: bool = True,
+        semente: Optional[int] = None,
+        leve: bool = False,
+        organizacoes: Optional[str] = None
+    ):
+        await interaction.response.defer()
+        
+        # Verificar permissões
+        if not self.bot.is_vip_or_owner(interaction.user):
+            await interaction.followup.send(
+                Messages.error(Messages.VIP_ONLY),
+                ephemeral=True
+            )
+            return
+        
+        try:
+            orgs = BracketsCog._parse_orgs(organizacoes)
+        except ValueError as e:
+            await interaction.followup.send(Messages.error(str(e)), ephemeral=True)
+            return
+        
+        # Buscar evento e times
+        async for session in get_db_session():
+            event = await BracketsCog._get_event(session, interaction.guild_id, evento)
+            if event is None:
+                await interaction.followup.send(
+                    Messages.error(f"Evento '{evento}' não encontrado!"),
+                    ephemeral=True
+                )
+                return
+            
+            # Ordem de inscrição = ordem das sementes
+            result = await session.execute(
+                select(Team).where(Team.event_id == event.id).order_by(Team.id)
+            )
+            teams = result.scalars().all()
+            
+            if len(teams) < 2:
+                await interaction.followup.send(
+                    Messages.error("É necessário pelo menos 2 times para gerar chaveamento!"),
+                    ephemeral=True
+                )
+                return
+            
+            bracket = self._build_bracket(teams, tipo, sortear, semente, orgs)
+            if bracket is None:
+                await interaction.followup.send(
+                    Messages.error("Tipo de chaveamento não implementado ainda!"),
+                    ephemeral=True
+                )
+                return
+            
+            # Eliminatórias ganham progressão (byes já resolvidos antes de salvar e desenhar)
+            state = BracketState(bracket) if bracket['type'] in ('single_elimination', 'double_elimination') else None
+            
+            await self._save_bracket(session, event, bracket)
+            
+            # Só depois de salvar: a chave nova substitui qualquer estado anterior do evento
+            key = (interaction.guild_id, evento)
+            self.active_brackets.pop(key, None)
+            self.active_groups.pop(key, None)
+            self.active_swiss.pop(key, None)
+            if state is not None:
+                self.active_brackets[key] = state
+            elif bracket['type'] == 'groups':
+                self.active_groups[key] = bracket
+            elif bracket['type'] == 'swiss':
+                self.active_swiss[key] = bracket
+            break
+        
+        # Gerar imagem (a fase de grupos pode ocupar várias)
+        image_format = 'png_compact' if leve else 'png'
+        if bracket['type'] == 'groups':
+            pages = await self._render_group_pages(bracket, image_format)
+        elif bracket['type'] == 'round_robin':
+            pages = await self._render_round_robin_pages(bracket, 0, BracketsCog.ROUND_ROBIN_PREVIEW_PAGES, image_format)
+        else:
+            image_buffer = await self._render_bracket(bracket, f"{interaction.guild_id}:{evento}", image_format)
+            pages = [image_buffer] if image_buffer else []
+        
+        if pages:
+            file = discord.File(pages[0], filename="bracket.png")
+            
+            embed = discord.Embed(
+                title=f"{BotConfig.EMOJIS['trophy']} Chaveamento Gerado",
+                description=f"**Evento:** {evento}\n"
+                           f"**Times:** {len(teams)}\n"
+                           f"**Tipo:** {tipo}",
+                color=BotConfig.COLORS['success']
             )
+            if bracket['type'] == 'round_robin':
+                page_count = BracketVisualizer.round_robin_page_count(BracketVisualizer.to_render_data(bracket))
+                embed.add_field(name="Rodadas", value=str(bracket['rounds_total']), inline=True)
+                embed.add_field(name="Partidas", value=str(bracket['matches_total']), inline=True)
+                embed.add_field(name="Páginas", value=f"{len(pages)} de {page_count}", inline=True)
+                if page_count > len(pages):
+                    embed.set_footer(text="Use /rodadas_chave para ver as outras páginas")
             embed.set_image(url="attachment://bracket.png")
             
             await interaction.followup.send(embed=embed, file=file)
+            
+            # Páginas extras em mensagens separadas (limite de tamanho por mensagem)
+            prefix = "grupos" if bracket['type'] == 'groups' else "rodadas"
+            for number, page in enumerate(pages[1:], start=2):
+                await interaction.followup.send(file=discord.File(page, filename=f"{prefix}_{number}.png"))
         else:
             await interaction.followup.send(
                 Messages.error("Erro ao gerar visualização do chaveamento."),
                 ephemeral=True
             )
     
+    @app_commands.command(
+        name="rodadas_chave",
+        description="Mostra uma página das rodadas do todos contra todos"
+    )
+    @app_commands.describe(
+        evento="Nome do evento",
+        pagina="Página da tabela (8 rodadas por página)"
+    )
+    async def rodadas_chave(
+        self,
+        interaction: discord.Interaction,
+        evento: str,
+        pagina: app_commands.Range[int, 1, 9999] = 1
+    ):
+        """Gera só a página pedida, a partir da ordem dos times salva na chave"""
+        
+        await interaction.response.defer()
+        
+        async for session in get_db_session():
+            event = await BracketsCog._get_event(session, interaction.guild_id, evento)
+            try:
+                bracket = await BracketsCog._load_round_robin(session, event) if event else None
+            except ValueError as e:
+                await interaction.followup.send(Messages.error(str(e)), ephemeral=True)
+                return
+            break
+        
+        if bracket is None:
+            await interaction.followup.send(
+                Messages.error(f"Nenhum todos contra todos gerado para o evento '{evento}'!"),
+                ephemeral=True
+            )
+            return
+        
+        page_count = BracketVisualizer.round_robin_page_count(BracketVisualizer.to_render_data(bracket))
+        if pagina > page_count:
+            await interaction.followup.send(
+                Messages.error(f"A tabela tem {page_count} página(s)."),
+                ephemeral=True
+            )
+            return
+        
+        pages = await self._render_round_robin_pages(bracket, pagina - 1, 1)
+        if not pages:
+            await interaction.followup.send(
+                Messages.error("Erro ao gerar visualização do chaveamento."),
+                ephemeral=True
+            )
+            return
+        
+        embed = discord.Embed(
+            title=f"{BotConfig.EMOJIS['trophy']} Todos contra Todos",
+            description=f"**Evento:** {evento}\n**Página:** {pagina} de {page_count}",
+            color=BotConfig.COLORS['info']
+        )
+        embed.set_image(url="attachment://rodadas.png")
+        await interaction.followup.send(embed=embed, file=discord.File(pages[0], filename="rodadas.png"))
+    
+    @app_commands.command(
+        name="resultado_chave",
+        description="Registra o vencedor de uma partida da chave"
+    )
+    @app_commands.describe(
+        evento="Nome do evento",
+        vencedor="Nome do time vencedor",
+        animar="Enviar uma animação do vencedor avançando na chave"
+    )
+    async def resultado_chave(
+        self,
+        interaction: discord.Interaction,
+        evento: str,
+        vencedor: str,
+        animar: bool = False
+    ):
+        """Leva o vencedor para a próxima partida (e o perdedor para o losers, na dupla)"""
+        
+        if not self.bot.is_vip_or_owner(interaction.user):
+            await interaction.response.send_message(Messages.error(Messages.VIP_ONLY), ephemeral=True)
+            return
+        
+        await interaction.response.defer()
+        
+        async for session in get_db_session():
+            event = await BracketsCog._get_event(session, interaction.guild_id, evento)
+            try:
+                state = await self._load_state(session, interaction.guild_id, evento, event) if event else None
+            except ValueError as e:
+                await interaction.followup.send(Messages.error(str(e)), ephemeral=True)
+                return
+            if state is None:
+                await interaction.followup.send(
+                    Messages.error(f"Nenhuma chave ativa para o evento '{evento}'!"),
+                    ephemeral=True
+                )
+                return
+            
+            team = state.find_team(vencedor)
+            key = state.find_pending_match(team) if team else None
+            if key is None:
+                await interaction.followup.send(
+                    Messages.error(f"'{vencedor}' não tem partida pendente nessa chave!"),
+                    ephemeral=True
+                )
+                return
+            
+            # Chave antes do resultado: quadro base da animação
+            before = BracketVisualizer.to_render_data(state.bracket) if animar else None
+            next_key = state.record_result(key, team)
+            
+            try:
+                # Só a linha da partida (e a vaga seguinte) muda em Match
+                section, round_index, match_index = key
+                if section == 'W':
+                    phase = BracketsCog._phase_type(state.bracket['rounds'][round_index]['phase'])
+                    if phase is not None:
+                        await session.execute(
+                            update(Match)
+                            .where(Match.event_id == event.id, Match.phase == phase,
+                                   Match.match_number == match_index + 1)
+                            .values(winner_id=team.id)
+                        )
+                    if next_key is not None and next_key[0] == 'W':
+                        next_phase = BracketsCog._phase_type(state.bracket['rounds'][next_key[1]]['phase'])
+                        slot = BracketState._slot(match_index)
+                        if next_phase is not None:
+                            await session.execute(
+                                update(Match)
+                                .where(Match.event_id == event.id, Match.phase == next_phase,
+                                       Match.match_number == next_key[2] + 1)
+                                .values(**{f'{slot}_id': team.id})
+                            )
+                
+                bracket_row = await BracketsCog._get_bracket_row(session, event)
+                bracket_row.data = CompactBracket.from_dict(state.bracket).to_json()
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                # O resultado já foi aplicado ao estado em memória: descarta para reler do banco
+                self.active_brackets.pop((interaction.guild_id, evento), None)
+                raise
+            break
+        
+        champion = state.champion()
+        if champion is not None:
+            message = f"{BotConfig.EMOJIS['trophy']} **{champion.name}** é o campeão de {evento}!"
+        else:
+            message = Messages.success(f"Vitória de **{team.name}** registrada!")
+        
+        # Só o trecho da chave com a partida e a vaga seguinte (animado, se pedido)
+        lineage = f"{interaction.guild_id}:{evento}"
+        if animar:
+            image_buffer = await self._render_reveal(before, state.bracket, key, next_key, team.name, lineage)
+            filename = "partida.gif"
+        else:
+            image_buffer = await self._render_match_region(state.bracket, [key, next_key], lineage)
+            filename = "partida.png"
+        
+        if image_buffer:
+            await interaction.followup.send(message, file=discord.File(image_buffer, filename=filename))
+        else:
+            await interaction.followup.send(message)
+    
     @app_commands.command(
         name="avancar_fase",
         description="Avança para a próxima fase do torneio"
@@ -375,21 +3360,451 @@ class BracketsCog(commands.Cog):
     async def avancar_fase(self, interaction: discord.Interaction, evento: str):
         """Avança para próxima fase baseado nos vencedores"""
         
-        # Buscar evento
-        # Verificar fase atual
-        # Pegar vencedores
-        # Gerar nova chave
-        # Atualizar banco
+        if not self.bot.is_vip_or_owner(interaction.user):
+            await interaction.response.send_message(Messages.error(Messages.VIP_ONLY), ephemeral=True)
+            return
+        
+        await interaction.response.defer()
+        
+        async for session in get_db_session():
+            event = await BracketsCog._get_event(session, interaction.guild_id, evento)
+            bracket_row = await BracketsCog._get_bracket_row(session, event) if event else None
+            try:
+                state = await self._load_state(session, interaction.guild_id, evento, event) if bracket_row else None
+            except ValueError as e:
+                await interaction.followup.send(Messages.error(str(e)), ephemeral=True)
+                return
+            if state is None:
+                await interaction.followup.send(
+                    Messages.error(f"Nenhuma chave ativa para o evento '{evento}'!"),
+                    ephemeral=True
+                )
+                return
+            
+            # Pendências vêm do banco, carregando só a fase atual
+            phase = BracketsCog._phase_type(bracket_row.current_phase or '')
+            if phase is not None:
+                current = await self._phase_matches(session, event, phase)
+                pending = [match for match in current if match.winner_id is None]
+            else:
+                pending = state.pending_matches()
+            
+            if pending:
+                await interaction.followup.send(
+                    Messages.error(
+                        f"A fase **{state.phase_name()}** ainda tem "
+                        f"{len(pending)} partida(s) sem vencedor!"
+                    ),
+                    ephemeral=True
+                )
+                return
+            
+            losers_pending = state.losers_pending()
+            if losers_pending:
+                await interaction.followup.send(
+                    Messages.error(
+                        f"O losers bracket ainda tem {len(losers_pending)} partida(s) sem vencedor "
+                        f"antes da Grande Final!"
+                    ),
+                    ephemeral=True
+                )
+                return
+            
+            if not state.advance_phase():
+                await interaction.followup.send(
+                    Messages.error("O torneio já está na última fase!"),
+                    ephemeral=True
+                )
+                return
+            
+            rounds = state.bracket['rounds']
+            bracket_row.current_phase = rounds[state.phase]['phase'] if state.phase < len(rounds) else 'GF'
+            try:
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                self.active_brackets.pop((interaction.guild_id, evento), None)
+                raise
+            break
+        
+        # Os vencedores já estão nas vagas: só redesenhar a chave
+        image_buffer = await self._render_bracket(state.bracket, f"{interaction.guild_id}:{evento}")
+        
+        embed = discord.Embed(
+            title=f"{BotConfig.EMOJIS['trophy']} {state.phase_name()}",
+            description=f"**Evento:** {evento}",
+            color=BotConfig.COLORS['success']
+        )
+        embed.add_field(name="Partidas", value=BracketsCog._format_matches(state.phase_matches()), inline=False)
+        
+        if image_buffer:
+            embed.set_image(url="attachment://bracket.png")
+            await interaction.followup.send(embed=embed, file=discord.File(image_buffer, filename="bracket.png"))
+        else:
+            await interaction.followup.send(embed=embed)
+    
+    @app_commands.command(
+        name="resultado_suico",
+        description="Registra o resultado de uma partida do Sistema Suíço"
+    )
+    @app_commands.describe(
+        evento="Nome do evento",
+        vencedor="Time vencedor (ou qualquer um dos dois, se empate)",
+        empate="Marque se a partida terminou empatada"
+    )
+    async def resultado_suico(
+        self,
+        interaction: discord.Interaction,
+        evento: str,
+        vencedor: str,
+        empate: bool = False
+    ):
+        """Soma o resultado e, fechada a rodada, emparelha a próxima pela classificação"""
+        
+        if not self.bot.is_vip_or_owner(interaction.user):
+            await interaction.response.send_message(Messages.error(Messages.VIP_ONLY), ephemeral=True)
+            return
+        
+        await interaction.response.defer()
+        
+        async for session in get_db_session():
+            event = await BracketsCog._get_event(session, interaction.guild_id, evento)
+            try:
+                bracket = await self._load_swiss(session, interaction.guild_id, evento, event) if event else None
+            except ValueError as e:
+                await interaction.followup.send(Messages.error(str(e)), ephemeral=True)
+                return
+            if bracket is None:
+                await interaction.followup.send(
+                    Messages.error(f"Nenhum Sistema Suíço ativo para o evento '{evento}'!"),
+                    ephemeral=True
+                )
+                return
+            
+            swiss = bracket['swiss']
+            name = vencedor.strip().lower()
+            round_number = len(swiss.rounds)
+            found = None
+            for match_number, match in enumerate(swiss.rounds[-1]['matches'], start=1):
+                if match['winner'] is None and not match.get('draw'):
+                    for team in (match['team1'], match['team2']):
+                        if team.name.lower() == name:
+                            found = (match_number, team)
+            
+            if found is None:
+                await interaction.followup.send(
+                    Messages.error(f"'{vencedor}' não tem partida pendente na rodada {round_number}!"),
+                    ephemeral=True
+                )
+                return
+            
+            match_number, team = found
+            swiss.record_result(round_number, match_number, None if empate else team)
+            
+            # Rodada fechada: a próxima sai da classificação com este resultado
+            next_round = None
+            if all(match['winner'] is not None or match.get('draw') for match in swiss.rounds[-1]['matches']):
+                next_round = swiss.pair_next_round()
+            
+            try:
+                bracket_row = await BracketsCog._get_bracket_row(session, event)
+                bracket_row.data = BracketsCog._stage_data(bracket)
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                # Resultado (e rodada nova) já aplicados ao SwissSystem: descarta para reler do banco
+                self.active_swiss.pop((interaction.guild_id, evento), None)
+                raise
+            break
+        
+        message = Messages.success(
+            f"Empate de **{team.name}** registrado!" if empate else f"Vitória de **{team.name}** registrada!"
+        )
+        
+        if next_round is None:
+            finished = len(swiss.rounds) >= swiss.rounds_total and all(
+                match['winner'] is not None or match.get('draw') for match in swiss.rounds[-1]['matches']
+            )
+            if not finished:
+                await interaction.followup.send(message)
+                return
+            
+            lines = [
+                f"`{position}.` **{row['team'].name}** — {row['points']:g} pts "
+                f"({row['wins']}V {row['losses']}D, Buchholz {row['buchholz']:g})"
+                for position, row in enumerate(swiss.standings()[:16], start=1)
+            ]
+            embed = discord.Embed(
+                title=f"{BotConfig.EMOJIS['trophy']} Classificação Final",
+                description=f"**Evento:** {evento}\n\n" + "\n".join(lines),
+                color=BotConfig.COLORS['success']
+            )
+            await interaction.followup.send(message, embed=embed)
+            return
+        
+        image_buffer = await self._render_bracket(bracket, f"{interaction.guild_id}:{evento}")
+        
+        embed = discord.Embed(
+            title=f"{BotConfig.EMOJIS['trophy']} {next_round['name']}",
+            description=f"**Evento:** {evento}",
+            color=BotConfig.COLORS['success']
+        )
+        embed.add_field(name="Partidas", value=BracketsCog._format_matches(next_round['matches']), inline=False)
+        if next_round['bye'] is not None:
+            embed.add_field(name="Folga", value=next_round['bye'].name, inline=False)
+        
+        if image_buffer:
+            embed.set_image(url="attachment://bracket.png")
+            await interaction.followup.send(message, embed=embed, file=discord.File(image_buffer, filename="bracket.png"))
+        else:
+            await interaction.followup.send(message, embed=embed)
+    
+    @app_commands.command(
+        name="resultado_grupo",
+        description="Registra o resultado de uma partida da fase de grupos"
+    )
+    @app_commands.describe(
+        evento="Nome do evento",
+        vencedor="Time vencedor (ou o mandante, se empate)",
+        perdedor="Time perdedor (ou o visitante, se empate)",
+        abates_vencedor="Abates do vencedor",
+        abates_perdedor="Abates do perdedor",
+        empate="Marque se a partida terminou empatada"
+    )
+    async def resultado_grupo(
+        self,
+        interaction: discord.Interaction,
+        evento: str,
+        vencedor: str,
+        perdedor: str,
+        abates_vencedor: app_commands.Range[int, 0, 999] = 0,
+        abates_perdedor: app_commands.Range[int, 0, 999] = 0,
+        empate: bool = False
+    ):
+        """Atualiza a classificação do grupo sem recalcular os outros jogos"""
+        
+        if not self.bot.is_vip_or_owner(interaction.user):
+            await interaction.response.send_message(Messages.error(Messages.VIP_ONLY), ephemeral=True)
+            return
+        
+        await interaction.response.defer()
+        
+        async for session in get_db_session():
+            event = await BracketsCog._get_event(session, interaction.guild_id, evento)
+            try:
+                stage = await self._load_groups(session, interaction.guild_id, evento, event) if event else None
+            except ValueError as e:
+                await interaction.followup.send(Messages.error(str(e)), ephemeral=True)
+                return
+            if stage is None:
+                await interaction.followup.send(
+                    Messages.error(f"Nenhuma fase de grupos ativa para o evento '{evento}'!"),
+                    ephemeral=True
+                )
+                return
+            
+            names = {vencedor.strip().lower(), perdedor.strip().lower()}
+            found = None
+            for group in stage['groups']:
+                for match in group['matches']:
+                    if match['winner'] is None and not match.get('draw') and \
+                            {match['team1'].name.lower(), match['team2'].name.lower()} == names:
+                        found = (group, match)
+                        break
+                if found:
+                    break
+            
+            if found is None:
+                await interaction.followup.send(
+                    Messages.error(f"Nenhuma partida pendente entre '{vencedor}' e '{perdedor}'!"),
+                    ephemeral=True
+                )
+                return
+            
+            group, match = found
+            winner_first = match['team1'].name.lower() == vencedor.strip().lower()
+            winner = match['team1'] if winner_first else match['team2']
+            kills = (abates_vencedor, abates_perdedor) if winner_first else (abates_perdedor, abates_vencedor)
+            BracketGenerator.record_group_result(group, match, None if empate else winner, *kills)
+            
+            try:
+                bracket_row = await BracketsCog._get_bracket_row(session, event)
+                bracket_row.data = BracketsCog._stage_data(stage)
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                # O resultado já está na classificação em memória: descarta para reler do banco
+                self.active_groups.pop((interaction.guild_id, evento), None)
+                raise
+            break
+        
+        lines = [
+            f"`{position}.` **{row['team'].name}** — {row['points']} pts "
+            f"({row['wins']}V {row['draws']}E {row['losses']}D, {row['kills']} abates)"
+            for position, row in enumerate(group['standings'].standings(), start=1)
+        ]
+        
+        embed = discord.Embed(
+            title=f"{BotConfig.EMOJIS['trophy']} {group['name']}",
+            description="\n".join(lines),
+            color=BotConfig.COLORS['info']
+        )
+        await interaction.followup.send(embed=embed)
+    
+    @app_commands.command(
+        name="fechar_grupos",
+        description="Encerra a fase de grupos e gera a eliminatória com os classificados"
+    )
+    @app_commands.describe(
+        evento="Nome do evento",
+        classificados="Quantos times de cada grupo avançam"
+    )
+    async def fechar_grupos(
+        self,
+        interaction: discord.Interaction,
+        evento: str,
+        classificados: app_commands.Range[int, 1, 4] = 2
+    ):
+        if not self.bot.is_vip_or_owner(interaction.user):
+            await interaction.response.send_message(Messages.error(Messages.VIP_ONLY), ephemeral=True)
+            return
+        
+        await interaction.response.defer()
+        
+        async for session in get_db_session():
+            event = await BracketsCog._get_event(session, interaction.guild_id, evento)
+            try:
+                stage = await self._load_groups(session, interaction.guild_id, evento, event) if event else None
+            except ValueError as e:
+                await interaction.followup.send(Messages.error(str(e)), ephemeral=True)
+                return
+            if stage is None:
+                await interaction.followup.send(
+                    Messages.error(f"Nenhuma fase de grupos ativa para o evento '{evento}'!"),
+                    ephemeral=True
+                )
+                return
+            
+            pending = sum(
+                1 for group in stage['groups'] for match in group['matches']
+                if match['winner'] is None and not match.get('draw')
+            )
+            if pending:
+                await interaction.followup.send(
+                    Messages.error(f"Ainda há {pending} partida(s) da fase de grupos sem resultado!"),
+                    ephemeral=True
+                )
+                return
+            
+            bracket = BracketGenerator.create_knockout_from_groups(stage, classificados)
+            state = BracketState(bracket)
+            await self._save_bracket(session, event, bracket)
+            break
         
-        pass
+        self.active_brackets[(interaction.guild_id, evento)] = state
+        self.active_groups.pop((interaction.guild_id, evento), None)
+        
+        image_buffer = await self._render_bracket(bracket, f"{interaction.guild_id}:{evento}")
+        
+        embed = discord.Embed(
+            title=f"{BotConfig.EMOJIS['trophy']} Eliminatória Gerada",
+            description=f"**Evento:** {evento}\n**Classificados por grupo:** {classificados}",
+            color=BotConfig.COLORS['success']
+        )
+        
+        if image_buffer:
+            embed.set_image(url="attachment://bracket.png")
+            await interaction.followup.send(embed=embed, file=discord.File(image_buffer, filename="bracket.png"))
+        else:
+            await interaction.followup.send(embed=embed)
+    
+    @staticmethod
+    def _parse_ratings(text: Optional[str]) -> Dict[str, float]:
+        """Lê forças no formato `Time:rating;Time:rating`"""
+        ratings = {}
+        if not text:
+            return ratings
+        for entry in text.replace("\n", ";").split(";"):
+            entry = entry.strip()
+            if not entry:
+                continue
+            try:
+                name, rating = entry.rsplit(":", 1)
+                ratings[name.strip()] = float(rating)
+            except ValueError:
+                raise ValueError(f"Força inválida: '{entry}' (use Time:rating)")
+        return ratings
     
     @app_commands.command(
         name="simular_chave",
         description="Simula resultados aleatórios para teste"
     )
-    async def simular_chave(self, interaction: discord.Interaction, evento: str):
+    @app_commands.describe(
+        evento="Nome do evento",
+        simulacoes="Quantidade de torneios simulados",
+        forcas="Forças (Elo) no formato Time:1600;Time:1450 (padrão 1500)"
+    )
+    async def simular_chave(
+        self,
+        interaction: discord.Interaction,
+        evento: str,
+        simulacoes: app_commands.Range[int, 100, 200000] = 20000,
+        forcas: Optional[str] = None
+    ):
         """Útil para testar o sistema sem jogar as partidas"""
-        pass
+        
+        try:
+            ratings = BracketsCog._parse_ratings(forcas)
+        except ValueError as e:
+            await interaction.response.send_message(Messages.error(str(e)), ephemeral=True)
+            return
+        
+        await interaction.response.defer()
+        
+        async for session in get_db_session():
+            event = await BracketsCog._get_event(session, interaction.guild_id, evento)
+            try:
+                state = await self._load_state(session, interaction.guild_id, evento, event) if event else None
+            except ValueError as e:
+                await interaction.followup.send(Messages.error(str(e)), ephemeral=True)
+                return
+            break
+        
+        if state is None:
+            await interaction.followup.send(
+                Messages.error(f"Nenhuma chave ativa para o evento '{evento}'!"),
+                ephemeral=True
+            )
+            return
+        
+        simulator = BracketSimulator(state, ratings)
+        probabilities = await asyncio.to_thread(simulator.run, simulacoes)
+        columns = simulator.columns()
+        
+        # Top 10 por chance de título, com as três últimas fases
+        order = np.argsort(-probabilities[:, -1], kind='stable')
+        lines = []
+        for position, team_index in enumerate(order[:10], start=1):
+            stages = " • ".join(
+                f"{name} {probabilities[team_index, c] * 100:.1f}%"
+                for c, name in list(enumerate(columns))[-3:]
+            )
+            lines.append(f"**{position}. {simulator.teams[team_index].name}** — {stages}")
+        
+        embed = discord.Embed(
+            title=f"{BotConfig.EMOJIS['trophy']} Simulação da Chave",
+            description=f"**Evento:** {evento}\n**Simulações:** {simulacoes}\n\n" + "\n".join(lines),
+            color=BotConfig.COLORS['info']
+        )
+        
+        # Tabela completa em CSV
+        csv_lines = [";".join(["time"] + columns)]
+        for team_index in order:
+            values = [f"{value:.4f}" for value in probabilities[team_index]]
+            csv_lines.append(";".join([simulator.teams[team_index].name] + values))
+        file = discord.File(BytesIO("\n".join(csv_lines).encode("utf-8")), filename="simulacao.csv")
+        
+        await interaction.followup.send(embed=embed, file=file)
 
 async def setup(bot):
     await bot.add_cog(BracketsCog(bot))
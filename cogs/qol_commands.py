@@ -3,16 +3,23 @@ from discord import app_commands
 from discord.ext import commands
 from typing import Optional, List
 import random
+from io import BytesIO
 
 from config import BotConfig, Messages, TemplateConfig
 from database.models import Event, Team, Match, Template
 from utils.embeds import create_announcement_embed
+from utils.charts import ChartService
+from utils.render_pool import RenderFailed, RenderQueueFull, RenderTimeout
 
 class QualityOfLifeCog(commands.Cog):
     """Comandos que facilitam a vida dos organizadores"""
     
     def __init__(self, bot):
         self.bot = bot
+        self.charts = ChartService()
+    
+    def cog_unload(self):
+        self.charts.shutdown()
     
     # =============================================
     # QUICKMATCH - Confronto Rápido
@@ -494,24 +501,67 @@ class QualityOfLifeCog(commands.Cog):
         interaction: discord.Interaction,
         evento: str
     ):
-        """Exibe estatísticas gerais do evento"""
+        """Exibe estatísticas gerais do evento (tabela LBFF e confrontos de mesmo nome)"""
+        
+        db = self.bot.db
+        guild_id = str(interaction.guild.id)
+        versao = db.get_versao_tabela(guild_id, evento)
+        placar = db.get_placar(guild_id, evento)
+        
+        if not versao and not placar:
+            await interaction.response.send_message(
+                Messages.error(f"O evento '{evento}' não tem resultados registrados!"),
+                ephemeral=True
+            )
+            return
+        
+        await interaction.response.defer()
         
-        # Buscar no banco
-        # (implementar busca)
+        def nome_time(time_id: str) -> str:
+            # Confrontos guardam o ID do cargo do time
+            role = interaction.guild.get_role(int(time_id)) if time_id.isdigit() else None
+            return role.name if role else time_id
+        
+        placar = [(nome_time(time_id), vitorias, derrotas) for time_id, vitorias, derrotas in placar]
+        classificacao = db.get_classificacao(guild_id, evento) if versao else []
+        confrontos = db.get_confrontos_evento(guild_id, evento)
         
         embed = discord.Embed(
             title=f"📊 Estatísticas - {evento}",
             color=BotConfig.COLORS['info']
         )
         
-        embed.add_field(name="Times Inscritos", value="32", inline=True)
-        embed.add_field(name="Partidas Realizadas", value="16", inline=True)
-        embed.add_field(name="Fase Atual", value="Quartas de Final", inline=True)
-        embed.add_field(name="Kills Totais", value="450", inline=True)
-        embed.add_field(name="MVP", value="@JogadorX", inline=True)
-        embed.add_field(name="Time Líder", value="Los Grandes", inline=True)
+        times = {linha[0] for linha in classificacao} | {linha[0] for linha in placar}
+        embed.add_field(name="Times", value=str(len(times)), inline=True)
         
-        await interaction.response.send_message(embed=embed)
+        if classificacao:
+            lider, pontos = classificacao[0][:2]
+            embed.add_field(name="Quedas", value=str(max(linha[4] for linha in classificacao)), inline=True)
+            embed.add_field(name="Abates Totais", value=str(sum(linha[2] for linha in classificacao)), inline=True)
+            embed.add_field(name="Líder da Tabela", value=f"{lider} ({pontos} pts)", inline=True)
+        
+        if confrontos:
+            realizados = sum(1 for confronto in confrontos if confronto[5])
+            embed.add_field(name="Confrontos", value=f"{realizados}/{len(confrontos)} realizados", inline=True)
+            if placar:
+                time, vitorias, derrotas = placar[0]
+                embed.add_field(name="Melhor Campanha", value=f"{time} ({vitorias}V {derrotas}D)", inline=True)
+        
+        # Gráficos no processo do matplotlib, em cache enquanto a versão não mudar
+        try:
+            grafico = await self.charts.painel(
+                {"guild": guild_id, "evento": evento, "versao_tabela": versao, "placar": placar},
+                evento,
+                lambda: (db.get_rodadas(guild_id, evento) if versao else [], placar)
+            )
+        except (RenderQueueFull, RenderTimeout, RenderFailed):
+            grafico = None
+        
+        if grafico:
+            embed.set_image(url="attachment://stats.png")
+            await interaction.followup.send(embed=embed, file=discord.File(BytesIO(grafico), filename="stats.png"))
+        else:
+            await interaction.followup.send(embed=embed)
 
 async def setup(bot):
     await bot.add_cog(QualityOfLifeCog(bot))
@@ -7,6 +7,11 @@ from discord.ui import Select, View, Button
 from discord.utils import get
 from discord.ext import commands
 import time
+
+from io import BytesIO
+
+from utils.lbff import AgendaSalas, LoteResultados, TIMES_POR_QUEDA
+from utils.standings_image import render_classificacao, imagem_em_cache, guardar_imagem
 # =============================================
 # CONFIGURAÇÕES GLOBAIS E CONSTANTES
 # =============================================
@@ -35,6 +40,13 @@ EMOJIS = {
     "botao": "<:botao:1336783739090501702>"
 }
 
+# Cargos de time criados pelo /formular
+PREFIXO_CARGO_TIME = "⭐・"
+
+# Limites de componentes do Discord
+OPCOES_POR_SELECT = 25
+SELECTS_POR_MENSAGEM = 5
+
 # Configuração dos intents
 intents = discord.Intents.default()
 intents.messages = True
@@ -86,6 +98,68 @@ class DatabaseManager:
                                 NULL
                             )
                             ''')
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS confrontos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id TEXT NOT NULL,
+                evento TEXT NOT NULL,
+                sala_id TEXT NOT NULL,
+                time1_id TEXT NOT NULL,
+                time2_id TEXT NOT NULL,
+                criador_id TEXT NOT NULL,
+                vencedor_id TEXT,
+                criado_em TIMESTAMP NOT NULL
+            )
+        ''')
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_confrontos_evento
+            ON confrontos (guild_id, evento)
+        ''')
+        # Contadores mantidos a cada resultado: a classificação nunca relê o histórico
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS placar_times (
+                guild_id TEXT NOT NULL,
+                evento TEXT NOT NULL,
+                time_id TEXT NOT NULL,
+                vitorias INTEGER NOT NULL DEFAULT 0,
+                derrotas INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (guild_id, evento, time_id)
+            )
+        ''')
+        # Tabelas LBFF: histórico por queda + classificação acumulada
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS lbff_rodadas (
+                guild_id TEXT NOT NULL,
+                tabela TEXT NOT NULL,
+                rodada INTEGER NOT NULL,
+                time TEXT NOT NULL,
+                colocacao INTEGER NOT NULL,
+                abates INTEGER NOT NULL,
+                pontos INTEGER NOT NULL,
+                PRIMARY KEY (guild_id, tabela, rodada, time)
+            )
+        ''')
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS lbff_classificacao (
+                guild_id TEXT NOT NULL,
+                tabela TEXT NOT NULL,
+                time TEXT NOT NULL,
+                pontos INTEGER NOT NULL DEFAULT 0,
+                abates INTEGER NOT NULL DEFAULT 0,
+                booyahs INTEGER NOT NULL DEFAULT 0,
+                quedas INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (guild_id, tabela, time)
+            )
+        ''')
+        # Versão da classificação: muda a cada lote e invalida a imagem em cache
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS lbff_tabelas (
+                guild_id TEXT NOT NULL,
+                tabela TEXT NOT NULL,
+                versao INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (guild_id, tabela)
+            )
+        ''')
         self.conn.commit()
 
     def add_vip(self, uid: str, nome: str, validade: datetime):
@@ -129,6 +203,153 @@ class DatabaseManager:
         result = self.cursor.fetchone()
         return result[0] if result else None
 
+    def registrar_confronto(self, guild_id: str, evento: str, sala_id: str, time1_id: str, time2_id: str,
+                            criador_id: str) -> int:
+        """Registra um confronto e retorna seu ID."""
+        self.cursor.execute('''
+            INSERT INTO confrontos (guild_id, evento, sala_id, time1_id, time2_id, criador_id, criado_em)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (guild_id, evento, sala_id, time1_id, time2_id, criador_id, datetime.now().isoformat()))
+        self.conn.commit()
+        return self.cursor.lastrowid
+
+    def get_confronto(self, confronto_id: int):
+        """Retorna (guild_id, evento, sala_id, time1_id, time2_id, criador_id, vencedor_id) de um confronto."""
+        self.cursor.execute('''
+            SELECT guild_id, evento, sala_id, time1_id, time2_id, criador_id, vencedor_id
+            FROM confrontos WHERE id = ?
+        ''', (confronto_id,))
+        return self.cursor.fetchone()
+
+    def get_confrontos_evento(self, guild_id: str, evento: str):
+        """Lista os confrontos de um evento em ordem de criação."""
+        self.cursor.execute('''
+            SELECT id, sala_id, time1_id, time2_id, criador_id, vencedor_id, criado_em
+            FROM confrontos WHERE guild_id = ? AND evento = ? ORDER BY id
+        ''', (guild_id, evento))
+        return self.cursor.fetchall()
+
+    def _ajustar_placar(self, guild_id: str, evento: str, time_id: str, vitorias: int, derrotas: int):
+        """Soma (ou subtrai) vitórias e derrotas no placar de um time, sem commit."""
+        self.cursor.execute('''
+            INSERT INTO placar_times (guild_id, evento, time_id, vitorias, derrotas)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (guild_id, evento, time_id) DO UPDATE SET
+                vitorias = vitorias + excluded.vitorias,
+                derrotas = derrotas + excluded.derrotas
+        ''', (guild_id, evento, time_id, vitorias, derrotas))
+
+    def definir_vencedor(self, confronto_id: int, vencedor_id: str) -> bool:
+        """Grava o vencedor de um confronto e atualiza o placar incrementalmente.
+
+        Se o confronto já tinha outro vencedor, o resultado anterior é desfeito
+        antes de aplicar o novo. Retorna False se o confronto ou o time forem inválidos.
+        """
+        confronto = self.get_confronto(confronto_id)
+        if not confronto:
+            return False
+
+        guild_id, evento, _, time1_id, time2_id, _, vencedor_atual = confronto
+        if vencedor_id not in (time1_id, time2_id):
+            return False
+        if vencedor_atual == vencedor_id:
+            return True
+
+        try:
+            if vencedor_atual:
+                perdedor_atual = time2_id if vencedor_atual == time1_id else time1_id
+                self._ajustar_placar(guild_id, evento, vencedor_atual, -1, 0)
+                self._ajustar_placar(guild_id, evento, perdedor_atual, 0, -1)
+
+            perdedor_id = time2_id if vencedor_id == time1_id else time1_id
+            self._ajustar_placar(guild_id, evento, vencedor_id, 1, 0)
+            self._ajustar_placar(guild_id, evento, perdedor_id, 0, 1)
+
+            self.cursor.execute(
+                'UPDATE confrontos SET vencedor_id = ? WHERE id = ?',
+                (vencedor_id, confronto_id)
+            )
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        return True
+
+    def get_placar(self, guild_id: str, evento: str):
+        """Retorna (time_id, vitorias, derrotas) dos times de um evento, do melhor para o pior."""
+        self.cursor.execute('''
+            SELECT time_id, vitorias, derrotas FROM placar_times
+            WHERE guild_id = ? AND evento = ?
+            ORDER BY vitorias DESC, derrotas ASC
+        ''', (guild_id, evento))
+        return self.cursor.fetchall()
+
+    def get_proxima_rodada(self, guild_id: str, tabela: str) -> int:
+        """Retorna o número da próxima queda de uma tabela LBFF."""
+        self.cursor.execute(
+            'SELECT COALESCE(MAX(rodada), 0) + 1 FROM lbff_rodadas WHERE guild_id = ? AND tabela = ?',
+            (guild_id, tabela)
+        )
+        return self.cursor.fetchone()[0]
+
+    def registrar_rodadas(self, guild_id: str, tabela: str, lote: LoteResultados) -> int:
+        """Grava um lote de quedas e soma seus totais na classificação em uma única transação.
+
+        A classificação acumulada recebe apenas os totais do lote, sem recalcular
+        o histórico. Retorna o número da primeira queda registrada.
+        """
+        try:
+            primeira_rodada = self.get_proxima_rodada(guild_id, tabela)
+            self.cursor.executemany('''
+                INSERT INTO lbff_rodadas (guild_id, tabela, rodada, time, colocacao, abates, pontos)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', [(guild_id, tabela, *linha) for linha in lote.linhas(primeira_rodada)])
+            self.cursor.executemany('''
+                INSERT INTO lbff_classificacao (guild_id, tabela, time, pontos, abates, booyahs, quedas)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (guild_id, tabela, time) DO UPDATE SET
+                    pontos = pontos + excluded.pontos,
+                    abates = abates + excluded.abates,
+                    booyahs = booyahs + excluded.booyahs,
+                    quedas = quedas + excluded.quedas
+            ''', [(guild_id, tabela, *total) for total in lote.totais()])
+            self.cursor.execute('''
+                INSERT INTO lbff_tabelas (guild_id, tabela, versao) VALUES (?, ?, 1)
+                ON CONFLICT (guild_id, tabela) DO UPDATE SET versao = versao + 1
+            ''', (guild_id, tabela))
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        return primeira_rodada
+
+    def get_classificacao(self, guild_id: str, tabela: str):
+        """Retorna (time, pontos, abates, booyahs, quedas) de uma tabela LBFF, do líder para o último."""
+        self.cursor.execute('''
+            SELECT time, pontos, abates, booyahs, quedas FROM lbff_classificacao
+            WHERE guild_id = ? AND tabela = ?
+            ORDER BY pontos DESC, booyahs DESC, abates DESC
+        ''', (guild_id, tabela))
+        return self.cursor.fetchall()
+
+    def get_rodadas(self, guild_id: str, tabela: str):
+        """Retorna (rodada, time, colocacao, abates, pontos) de todas as quedas de uma tabela LBFF."""
+        self.cursor.execute('''
+            SELECT rodada, time, colocacao, abates, pontos FROM lbff_rodadas
+            WHERE guild_id = ? AND tabela = ?
+            ORDER BY rodada
+        ''', (guild_id, tabela))
+        return self.cursor.fetchall()
+
+    def get_versao_tabela(self, guild_id: str, tabela: str) -> int:
+        """Retorna a versão atual de uma tabela LBFF (0 se ela não existe)."""
+        self.cursor.execute(
+            'SELECT versao FROM lbff_tabelas WHERE guild_id = ? AND tabela = ?',
+            (guild_id, tabela)
+        )
+        result = self.cursor.fetchone()
+        return result[0] if result else 0
+
 
 # =============================================
 # CLASSE PRINCIPAL DO BOT
@@ -143,6 +364,8 @@ class Client(discord.Client):
         self.temp_roles = {}  # Armazena calls privadas ativas
         self.contador_channels = {}  # Armazena canais contadores
         self.contador_task = None  # Task de atualização de contadores
+        self.component_handlers = {}  # Prefixo do custom_id -> handler de componentes persistentes
+        self.event_roles = {}  # Cache por servidor dos cargos de time (⭐・), invalidado nos eventos de cargo
         self.tree = app_commands.CommandTree(self)
 
         try:
@@ -155,6 +378,30 @@ class Client(discord.Client):
         """Verifica se o usuário é VIP ou o dono do bot."""
         return user.id == DONO_UID or self.db.is_vip(str(user.id))
 
+    def get_event_roles(self, guild: discord.Guild) -> dict:
+        """Retorna {role_id: role} dos cargos de time do servidor, sem varrer guild.roles a cada uso."""
+        roles = self.event_roles.get(guild.id)
+        if roles is None:
+            roles = {role.id: role for role in guild.roles if role.name.startswith(PREFIXO_CARGO_TIME)}
+            self.event_roles[guild.id] = roles
+        return roles
+
+    async def on_guild_role_create(self, role: discord.Role):
+        self.event_roles.pop(role.guild.id, None)
+
+    async def on_guild_role_delete(self, role: discord.Role):
+        self.event_roles.pop(role.guild.id, None)
+
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        self.event_roles.pop(after.guild.id, None)
+
+    def component_handler(self, prefixo: str):
+        """Registra o handler dos componentes cujo custom_id segue o formato `prefixo:acao:alvo`."""
+        def decorator(func):
+            self.component_handlers[prefixo] = func
+            return func
+        return decorator
+
     async def on_ready(self):
         """Evento chamado quando o bot está pronto para uso."""
         await self.wait_until_ready()
@@ -386,6 +633,36 @@ class Client(discord.Client):
             if ticket_processed:
                 return
 
+        await self.process_component_interaction(interaction)
+
+    async def process_component_interaction(self, interaction: discord.Interaction) -> bool:
+        """Despacha componentes persistentes pelo prefixo do custom_id (sobrevive a reinícios)."""
+        custom_id = (interaction.data or {}).get("custom_id", "")
+        prefixo, _, resto = custom_id.partition(":")
+        handler = self.component_handlers.get(prefixo)
+        if handler is None:
+            return False
+
+        acao, _, alvo = resto.partition(":")
+        try:
+            await handler(interaction, acao, alvo)
+        except Exception as e:
+            print(f"Erro ao processar componente '{custom_id}': {e}")
+        return True
+
+
+def view_persistente(*items: discord.ui.Item) -> View:
+    """Monta uma View apenas com os componentes, sem guardá-la em memória.
+
+    Os callbacks ficam nos handlers registrados com `component_handler`, então a
+    View é parada antes do envio e não entra no ViewStore do discord.py.
+    """
+    view = View(timeout=None)
+    for item in items:
+        view.add_item(item)
+    view.stop()
+    return view
+
 # =============================================
 # INICIALIZAÇÃO DO BOT E REGISTRO DE COMANDOS
 # =============================================
@@ -838,9 +1115,11 @@ async def fase(interaction: discord.Interaction, numero: int):
     time1="Mencione o cargo do primeiro time.",
     time2="Mencione o cargo do segundo time.",
     id="ID do confronto.",
-    senha="Senha do confronto."
+    senha="Senha do confronto.",
+    evento="Nome do evento (padrão: categoria do canal atual)."
 )
-async def confronto(interaction: discord.Interaction, time1: discord.Role, time2: discord.Role, id: str, senha: str):
+async def confronto(interaction: discord.Interaction, time1: discord.Role, time2: discord.Role, id: str, senha: str,
+                    evento: str = None):
     if not interaction.client.is_vip_or_owner(interaction.user):
         await interaction.response.send_message(
             f"{EMOJIS['proibido']} Você precisa ser VIP para utilizar este comando.\nPara ser vip ou tirar suas dúvidas entre em contato com meu dono: (61) 98112-5850.",
@@ -857,6 +1136,12 @@ async def confronto(interaction: discord.Interaction, time1: discord.Role, time2
                                                 ephemeral=True)
         return
 
+    # O ID vai no custom_id dos componentes, que o Discord limita a 100 caracteres
+    if len(id) > 80:
+        await interaction.response.send_message(f"{EMOJIS['proibido']} O ID do confronto é longo demais.",
+                                                ephemeral=True)
+        return
+
     embed = discord.Embed(
         title=f"{EMOJIS['estrela']}ㅤCONFRONTOㅤ{EMOJIS['estrela']}",
         description=f"**{time1.mention}**ㅤ{EMOJIS['versus']}ㅤ**{time2.mention}**\n\n**ID:** {id}\n**Senha:** {senha}",
@@ -865,60 +1150,118 @@ async def confronto(interaction: discord.Interaction, time1: discord.Role, time2
     embed.set_thumbnail(
         url="https://cdn.discordapp.com/avatars/710114714306478130/a_181e57144058c56f5e88f69568635c49.gif?size=4096")
 
-    button = discord.ui.Button(label="Copiar ID", style=discord.ButtonStyle.green)
+    if not evento:
+        category = getattr(interaction.channel, "category", None)
+        evento = category.name if category else "geral"
 
-    async def button_callback(interaction: discord.Interaction):
-        await interaction.response.send_message(f"{id}", ephemeral=True)
+    confronto_id = aclient.db.registrar_confronto(
+        str(interaction.guild.id), evento, id, str(time1.id), str(time2.id), str(interaction.user.id)
+    )
+    embed.set_footer(text=f"Confronto #{confronto_id} • {evento}")
 
-    button.callback = button_callback
+    button = discord.ui.Button(
+        label="Copiar ID",
+        style=discord.ButtonStyle.green,
+        custom_id=f"confronto:copiar:{id}"
+    )
 
     select = discord.ui.Select(
         placeholder="Definir vencedor",
+        custom_id=f"confronto:vencedor:{confronto_id}",
         options=[
-            discord.SelectOption(label=time1.name, value="time1", description=f"Definir {time1.name} como vencedor"),
-            discord.SelectOption(label=time2.name, value="time2", description=f"Definir {time2.name} como vencedor"),
+            discord.SelectOption(label=time1.name, value=str(time1.id), description=f"Definir {time1.name} como vencedor"),
+            discord.SelectOption(label=time2.name, value=str(time2.id), description=f"Definir {time2.name} como vencedor"),
         ]
     )
 
-    async def select_callback(interaction: discord.Interaction):
-        if interaction.user.id != interaction.message.interaction.user.id:
+    await interaction.response.send_message(embed=embed, view=view_persistente(select, button))
+
+    try:
+        message_id = (await interaction.original_response()).id
+        aclient.db.set_setting(f"confronto_{id}", str(message_id))
+        print(f"ID da mensagem ({message_id}) armazenado no banco de dados para o confronto {id}.")
+    except Exception as e:
+        print(f"Erro ao salvar o ID da mensagem no banco de dados: {e}")
+
+
+@aclient.component_handler("confronto")
+async def confronto_componentes(interaction: discord.Interaction, acao: str, alvo: str):
+    """Botão "Copiar ID" e seleção de vencedor das mensagens de /confronto."""
+    if acao == "copiar":
+        await interaction.response.send_message(f"{alvo}", ephemeral=True)
+        return
+
+    if acao != "vencedor":
+        return
+
+    confronto_id = int(alvo) if alvo.isdigit() else None
+    registro = aclient.db.get_confronto(confronto_id) if confronto_id else None
+    if not registro:
+        await interaction.response.send_message(
+            f"{EMOJIS['proibido']} Esse confronto não está registrado.",
+            ephemeral=True)
+        return
+
+    criador_id = registro[5]
+    if str(interaction.user.id) != criador_id:
+        await interaction.response.send_message(
+            f"{EMOJIS['proibido']} Apenas o criador do confronto pode definir o vencedor!",
+            ephemeral=True)
+        return
+
+    values = interaction.data.get("values", [])
+    vencedor = interaction.guild.get_role(int(values[0])) if values else None
+    if vencedor is None or not aclient.db.definir_vencedor(confronto_id, str(vencedor.id)):
+        await interaction.response.send_message(
+            f"{EMOJIS['proibido']} Não foi possível registrar esse time como vencedor.",
+            ephemeral=True)
+        return
+
+    embed = interaction.message.embeds[0]
+
+    for field in embed.fields:
+        if "Vencedor" in field.name:
+            embed.set_field_at(embed.fields.index(field), name=f"{EMOJIS['gg']}ㅤVencedor", value=vencedor.mention,
+                               inline=False)
+            await interaction.message.edit(embed=embed)
             await interaction.response.send_message(
-                f"{EMOJIS['proibido']} Apenas o criador do confronto pode definir o vencedor!",
+                f"{EMOJIS['liberado']} O time {vencedor.mention} foi atualizado como vencedor!",
                 ephemeral=True)
             return
 
-        vencedor = time1 if select.values[0] == "time1" else time2
+    embed.add_field(name=f"{EMOJIS['gg']}ㅤVencedor", value=vencedor.mention, inline=False)
+    await interaction.message.edit(embed=embed)
+    await interaction.response.send_message(
+        f"{EMOJIS['liberado']} O time {vencedor.mention} foi marcado como vencedor!",
+        ephemeral=True)
 
-        for field in embed.fields:
-            if "Vencedor" in field.name:
-                embed.set_field_at(embed.fields.index(field), name=f"{EMOJIS['gg']}ㅤVencedor", value=vencedor.mention,
-                                   inline=False)
-                await interaction.message.edit(embed=embed)
-                await interaction.response.send_message(
-                    f"{EMOJIS['liberado']} O time {vencedor.mention} foi atualizado como vencedor!",
-                    ephemeral=True)
-                return
 
-        embed.add_field(name=f"{EMOJIS['gg']}ㅤVencedor", value=vencedor.mention, inline=False)
-        await interaction.message.edit(embed=embed)
+@aclient.tree.command(name="placar", description="Mostra vitórias e derrotas dos times de um evento.")
+@app_commands.describe(evento="Nome do evento (padrão: categoria do canal atual).")
+async def placar(interaction: discord.Interaction, evento: str = None):
+    if not evento:
+        category = getattr(interaction.channel, "category", None)
+        evento = category.name if category else "geral"
+
+    linhas = aclient.db.get_placar(str(interaction.guild.id), evento)
+    if not linhas:
         await interaction.response.send_message(
-            f"{EMOJIS['liberado']} O time {vencedor.mention} foi marcado como vencedor!",
+            f"{EMOJIS['proibido']} Nenhum resultado registrado para o evento '{evento}'.",
             ephemeral=True)
+        return
 
-    select.callback = select_callback
-
-    view = discord.ui.View(timeout=None)
-    view.add_item(select)
-    view.add_item(button)
+    descricao = "\n".join(
+        f"**{posicao}.** <@&{time_id}> — {vitorias}V / {derrotas}D"
+        for posicao, (time_id, vitorias, derrotas) in enumerate(linhas[:25], start=1)
+    )
 
-    message = await interaction.response.send_message(embed=embed, view=view)
+    embed = discord.Embed(
+        title=f"{EMOJIS['coroa']}ㅤPLACAR - {evento}ㅤ{EMOJIS['coroa']}",
+        description=descricao,
+        color=0xFFFF00
+    )
 
-    try:
-        message_id = (await message.original_response()).id
-        aclient.db.set_setting(f"confronto_{id}", str(message_id))
-        print(f"ID da mensagem ({message_id}) armazenado no banco de dados para o confronto {id}.")
-    except Exception as e:
-        print(f"Erro ao salvar o ID da mensagem no banco de dados: {e}")
+    await interaction.response.send_message(embed=embed)
 
 
 @aclient.tree.command(name="sala", description="Exibe o ID e senha do confronto em um embed.")
@@ -995,6 +1338,94 @@ async def pontos(interaction: discord.Interaction):
 
     await interaction.response.send_message(embed=embed)
 
+@aclient.tree.command(name="resultado", description="Registra o resultado de uma ou mais quedas da LBFF.")
+@app_commands.describe(
+    tabela="Nome da tabela (classificação) que receberá os pontos.",
+    resultados="Uma queda no formato Time:colocação:abates, separados por ';'.",
+    arquivo="CSV com as colunas time, colocacao, abates e (opcional) rodada."
+)
+async def resultado(interaction: discord.Interaction, tabela: str, resultados: str = None,
+                    arquivo: discord.Attachment = None):
+    if not interaction.client.is_vip_or_owner(interaction.user):
+        await interaction.response.send_message(
+            f"{EMOJIS['proibido']} Você precisa ser VIP para utilizar este comando.", ephemeral=True)
+        return
+
+    if not resultados and not arquivo:
+        await interaction.response.send_message(
+            f"{EMOJIS['proibido']} Informe os resultados ou envie um arquivo CSV.", ephemeral=True)
+        return
+
+    await interaction.response.defer(ephemeral=True)
+
+    try:
+        if arquivo:
+            lote = LoteResultados.from_csv(await arquivo.read())
+        else:
+            lote = LoteResultados.from_texto(resultados)
+        primeira_rodada = aclient.db.registrar_rodadas(str(interaction.guild.id), tabela, lote)
+    except (ValueError, UnicodeDecodeError) as e:
+        await interaction.followup.send(f"{EMOJIS['proibido']} {e}", ephemeral=True)
+        return
+    except sqlite3.Error as e:
+        await interaction.followup.send(f"{EMOJIS['proibido']} Erro ao registrar resultados: {e}", ephemeral=True)
+        return
+
+    ultima_rodada = primeira_rodada + lote.total_rodadas - 1
+    quedas = f"queda {primeira_rodada}" if lote.total_rodadas == 1 else f"quedas {primeira_rodada} a {ultima_rodada}"
+    await interaction.followup.send(
+        f"{EMOJIS['liberado']} Resultados da tabela '{tabela}' registrados ({quedas}).",
+        ephemeral=True
+    )
+
+@aclient.tree.command(name="salas", description="Distribui os times em salas de LBFF com rodízio entre as rodadas.")
+@app_commands.describe(
+    rodadas="Quantidade de rodadas a sortear.",
+    times="Times separados por ';' ou quebra de linha (padrão: times da tabela).",
+    tabela="Tabela LBFF de onde vêm os times, se 'times' não for informado.",
+    tamanho_sala=f"Times por sala (máximo {TIMES_POR_QUEDA})."
+)
+async def salas(interaction: discord.Interaction, rodadas: app_commands.Range[int, 1, 100], times: str = None,
+                tabela: str = None, tamanho_sala: app_commands.Range[int, 2, TIMES_POR_QUEDA] = TIMES_POR_QUEDA):
+    if not interaction.client.is_vip_or_owner(interaction.user):
+        await interaction.response.send_message(
+            f"{EMOJIS['proibido']} Você precisa ser VIP para utilizar este comando.", ephemeral=True)
+        return
+
+    if times:
+        lista = [time.strip() for time in times.replace("\n", ";").split(";") if time.strip()]
+    elif tabela:
+        lista = [linha[0] for linha in aclient.db.get_classificacao(str(interaction.guild.id), tabela)]
+    else:
+        await interaction.response.send_message(
+            f"{EMOJIS['proibido']} Informe os times ou uma tabela com resultados.", ephemeral=True)
+        return
+
+    try:
+        agenda = AgendaSalas(lista, tamanho_sala)
+    except ValueError as e:
+        await interaction.response.send_message(f"{EMOJIS['proibido']} {e}", ephemeral=True)
+        return
+
+    await interaction.response.defer()
+    await asyncio.to_thread(agenda.gerar, rodadas)
+
+    minimo, maximo, media = agenda.resumo_encontros()
+    embed = discord.Embed(
+        title=f"{EMOJIS['coroa']}ㅤSALAS - RODADA 1ㅤ{EMOJIS['coroa']}",
+        description=(
+            f"{len(lista)} times em {agenda.total_salas} sala(s), {rodadas} rodada(s).\n"
+            f"Encontros entre pares: mín. {minimo}, máx. {maximo}, média {media:.1f}.\n"
+            "O CSV anexado tem todas as rodadas e pode ser preenchido e enviado no /resultado."
+        ),
+        color=0xFFFF00
+    )
+    for numero, sala in enumerate(agenda.rodadas[0][:25], start=1):
+        embed.add_field(name=f"Sala {numero}", value="\n".join(sala)[:1024], inline=True)
+
+    arquivo = discord.File(BytesIO(agenda.modelo_csv().encode("utf-8")), filename="salas.csv")
+    await interaction.followup.send(embed=embed, file=arquivo)
+
 @aclient.tree.command(
     name="campcargos",
     description="Cria um embed para pegar cargos da call."
@@ -1003,7 +1434,7 @@ async def camp_cargos(interaction: discord.Interaction):
     # Verificando se o usuário tem VIP ou é o dono
     if not interaction.client.is_vip_or_owner(interaction.user):
         await interaction.response.send_message(
-            f"{proibido_emoji} Você precisa ser VIP para utilizar este comando.",
+            f"{EMOJIS['proibido']} Você precisa ser VIP para utilizar este comando.",
             ephemeral=True
         )
         return
@@ -1025,55 +1456,101 @@ async def camp_cargos(interaction: discord.Interaction):
     embed.set_image(url=image_url)
 
     # Obtendo os cargos das calls do evento
-    roles = [role for role in interaction.guild.roles if role.name.startswith("⭐・")]  # Prefixo para os cargos de time
-
-    # Criando as opções do menu de seleção
-    options = [
-        discord.SelectOption(
-            label=role.name.replace("⭐・", "・"),  # Nome do cargo sem prefixo
-            value=str(role.id),
-            emoji="<:botao:1336783739090501702>"  # Emoji associado ao menu
+    roles = list(interaction.client.get_event_roles(interaction.guild).values())
+    if not roles:
+        await interaction.response.send_message(
+            f"{EMOJIS['proibido']} Nenhum cargo de time ({PREFIXO_CARGO_TIME}) encontrado.",
+            ephemeral=True
         )
-        for role in roles
-    ]
+        return
 
-    # Criando o menu de seleção
-    select = discord.ui.Select(
-        placeholder="Selecione seu time...",
-        options=options
-    )
+    # Um select por grupo de até 25 times, no máximo 5 selects por mensagem
+    selects = []
+    for pagina, inicio in enumerate(range(0, len(roles), OPCOES_POR_SELECT)):
+        grupo = roles[inicio:inicio + OPCOES_POR_SELECT]
+        nomes = [role.name.replace(PREFIXO_CARGO_TIME, "", 1) for role in grupo]
+        placeholder = "Selecione seu time..."
+        if len(roles) > OPCOES_POR_SELECT:
+            placeholder = f"Selecione seu time ({nomes[0][:20]} … {nomes[-1][:20]})"
+
+        selects.append(discord.ui.Select(
+            placeholder=placeholder,
+            custom_id=f"campcargos:selecionar:{interaction.id}:{pagina}",
+            options=[
+                discord.SelectOption(
+                    label=f"・{nome}"[:100],  # Nome do cargo sem prefixo
+                    value=str(role.id),
+                    emoji=EMOJIS["botao"]  # Emoji associado ao menu
+                )
+                for role, nome in zip(grupo, nomes)
+            ]
+        ))
 
-    async def select_callback(interaction: discord.Interaction):
-        selected_role_id = int(select.values[0])
-        selected_role = interaction.guild.get_role(selected_role_id)
+    # Enviando a mensagem com o embed e as primeiras views; o restante vai em mensagens seguintes
+    await interaction.response.send_message(embed=embed, view=view_persistente(*selects[:SELECTS_POR_MENSAGEM]))
+    for inicio in range(SELECTS_POR_MENSAGEM, len(selects), SELECTS_POR_MENSAGEM):
+        await interaction.followup.send(view=view_persistente(*selects[inicio:inicio + SELECTS_POR_MENSAGEM]))
 
-        # Remover todos os outros cargos relacionados ao evento
-        for role in roles:
-            if role in interaction.user.roles:
-                await interaction.user.remove_roles(role)
-        liberado="<:permitido:1336370678118617089>"
-        # Adicionando o novo cargo selecionado
-        await interaction.user.add_roles(selected_role)
 
+@aclient.component_handler("campcargos")
+async def campcargos_componentes(interaction: discord.Interaction, acao: str, alvo: str):
+    """Seleção de time dos painéis de /campcargos."""
+    if acao != "selecionar":
+        return
+
+    event_roles = interaction.client.get_event_roles(interaction.guild)
+    values = interaction.data.get("values", [])
+    selected_role = event_roles.get(int(values[0])) if values else None
+    if selected_role is None:
         await interaction.response.send_message(
-            f"{liberado} Você agora tem o cargo {selected_role.mention}.",
+            f"{EMOJIS['proibido']} Esse cargo não existe mais.",
             ephemeral=True
         )
+        return
 
-    select.callback = select_callback
-
-    # Criando a view com timeout indefinido
-    view = discord.ui.View(timeout=None)
-    view.add_item(select)
+    # Troca os cargos de time em uma única edição do membro
+    member = interaction.user
+    current_roles = [role for role in member.roles if not role.is_default()]
+    new_roles = [role for role in current_roles if role.id not in event_roles] + [selected_role]
+    if set(new_roles) != set(current_roles):
+        await member.edit(roles=new_roles, reason="Seleção de time (/campcargos)")
 
-    # Enviando a mensagem com o embed e a view
-    await interaction.response.send_message(embed=embed, view=view)
+    await interaction.response.send_message(
+        f"{EMOJIS['liberado']} Você agora tem o cargo {selected_role.mention}.",
+        ephemeral=True
+    )
 
 @aclient.tree.command(name="tabela", description="Cria um embed com os dados da tabela enviada.")
 @app_commands.describe(nome_tabela="Nome da tabela que será exibida no embed.")
 async def tabela(interaction: discord.Interaction, nome_tabela: str):
     if not interaction.client.is_vip_or_owner(interaction.user):
-        await interaction.response
+        await interaction.response.send_message(
+            f"{EMOJIS['proibido']} Você precisa ser VIP para utilizar este comando.", ephemeral=True)
+        return
+
+    guild_id = str(interaction.guild.id)
+    versao = aclient.db.get_versao_tabela(guild_id, nome_tabela)
+    if not versao:
+        await interaction.response.send_message(
+            f"{EMOJIS['proibido']} A tabela '{nome_tabela}' não tem resultados registrados.", ephemeral=True)
+        return
+
+    await interaction.response.defer()
+
+    # A imagem só é redesenhada quando a versão da tabela muda
+    imagem = await imagem_em_cache(guild_id, nome_tabela, versao)
+    if imagem is None:
+        linhas = aclient.db.get_classificacao(guild_id, nome_tabela)
+        imagem = await asyncio.to_thread(render_classificacao, nome_tabela, linhas)
+        await guardar_imagem(guild_id, nome_tabela, versao, imagem)
+
+    embed = discord.Embed(
+        title=f"{EMOJIS['coroa']}ㅤ{nome_tabela.upper()}ㅤ{EMOJIS['coroa']}",
+        color=0xFFFF00
+    )
+    embed.set_image(url="attachment://tabela.png")
+
+    await interaction.followup.send(embed=embed, file=discord.File(BytesIO(imagem), filename="tabela.png"))
 
 
 @aclient.tree.command(name="sync", description="Sincroniza comandos (owner only)")
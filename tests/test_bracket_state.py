@@ -0,0 +1,146 @@
+"""
+Testes da progressão das eliminatórias (BracketState)
+"""
+
+import random
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+
+from cogs.brackets_system import BracketGenerator, BracketState
+
+
+def make_teams(count: int) -> list:
+    return [SimpleNamespace(id=i + 1, name=f"Time {i + 1}") for i in range(count)]
+
+
+def ready_matches(state: BracketState, section: str = None) -> list:
+    return [
+        key for key, node in state.nodes.items()
+        if node.match['winner'] is None and node.match['team1'] is not None
+        and node.match['team2'] is not None and (section is None or key[0] == section)
+    ]
+
+
+def play_out(state: BracketState, rng: random.Random) -> Counter:
+    """Joga a chave até o fim com vencedores aleatórios; devolve as derrotas de cada time"""
+    losses = Counter()
+    while True:
+        keys = ready_matches(state)
+        if not keys:
+            return losses
+        key = keys[0]
+        match = state.nodes[key].match
+        winner = match['team1'] if rng.random() < 0.5 else match['team2']
+        loser = match['team2'] if winner is match['team1'] else match['team1']
+        state.record_result(key, winner)
+        losses[loser.id] += 1
+
+
+def test_winner_moves_to_next_slot():
+    state = BracketState(BracketGenerator.create_single_elimination(make_teams(8), shuffle=False))
+
+    for index in range(4):
+        match = state.nodes[('W', 0, index)].match
+        assert state.record_result(('W', 0, index), match['team1']) == ('W', 1, index // 2)
+        slot = 'team1' if index % 2 == 0 else 'team2'
+        assert state.nodes[('W', 1, index // 2)].match[slot] is match['team1']
+
+
+@pytest.mark.parametrize("count", [2, 3, 5, 6, 8, 13])
+def test_single_elimination_byes_and_champion(count):
+    for seed in range(10):
+        state = BracketState(BracketGenerator.create_single_elimination(make_teams(count), shuffle=False))
+        losses = play_out(state, random.Random(seed))
+
+        champion = state.champion()
+        assert champion is not None
+        # Cada time perde uma vez, menos o campeão
+        assert champion.id not in losses
+        assert sorted(losses) == sorted(t for t in range(1, count + 1) if t != champion.id)
+        assert set(losses.values()) == {1}
+
+
+def test_loser_drops_to_losers_bracket():
+    bracket = BracketGenerator.create_double_elimination(make_teams(8), shuffle=False)
+    state = BracketState(bracket)
+
+    for index, match in enumerate(bracket['rounds'][0]['matches']):
+        target = match['loser_to']
+        loser = match['team2']
+        state.record_result(('W', 0, index), match['team1'])
+        assert state.nodes[('L', target['round'], target['match'])].match[target['slot']] is loser
+
+
+@pytest.mark.parametrize("count", [3, 4, 6, 8, 11, 16])
+def test_double_elimination_needs_two_losses(count):
+    for seed in range(10):
+        state = BracketState(BracketGenerator.create_double_elimination(make_teams(count), shuffle=False))
+        losses = play_out(state, random.Random(seed))
+
+        champion = state.champion()
+        assert champion is not None
+        # Todos saem com duas derrotas; o campeão perde no máximo uma (a do reset)
+        assert all(losses[t] == 2 for t in range(1, count + 1) if t != champion.id)
+        assert losses[champion.id] <= 1
+
+
+def test_grand_final_reset_when_losers_side_wins():
+    state = BracketState(BracketGenerator.create_double_elimination(make_teams(4), shuffle=False))
+    while ('GF', 0, 0) not in ready_matches(state):
+        key = ready_matches(state)[0]
+        state.record_result(key, state.nodes[key].match['team1'])
+
+    final = state.nodes[('GF', 0, 0)].match
+    assert state.record_result(('GF', 0, 0), final['team2']) == ('GF', 1, 0)
+    assert state.champion() is None
+
+    state.record_result(('GF', 1, 0), final['team1'])
+    assert state.champion() is final['team1']
+    assert not ready_matches(state)
+
+
+def test_record_result_rejects_invalid_winner():
+    teams = make_teams(4)
+    state = BracketState(BracketGenerator.create_single_elimination(teams, shuffle=False))
+    match = state.nodes[('W', 0, 0)].match
+    outsider = next(t for t in teams if t is not match['team1'] and t is not match['team2'])
+
+    with pytest.raises(ValueError):
+        state.record_result(('W', 0, 0), outsider)
+    with pytest.raises(ValueError):
+        state.record_result(('W', 1, 0), match['team1'])  # final ainda sem os dois times
+    state.record_result(('W', 0, 0), match['team1'])
+    with pytest.raises(ValueError):
+        state.record_result(('W', 0, 0), match['team2'])
+
+
+@pytest.mark.parametrize("count", [6, 8])
+def test_grand_final_waits_for_losers_bracket(count):
+    state = BracketState(BracketGenerator.create_double_elimination(make_teams(count), shuffle=False))
+    rng = random.Random(1)
+    last_winners = len(state.bracket['rounds']) - 1
+
+    # Só o winners: fase por fase até a última rodada
+    while True:
+        for key in ready_matches(state, 'W'):
+            match = state.nodes[key].match
+            state.record_result(key, match['team1'] if rng.random() < 0.5 else match['team2'])
+        if state.phase == last_winners:
+            break
+        assert state.advance_phase()
+
+    assert not state.pending_matches()
+    assert state.losers_pending()
+    assert not state.advance_phase()
+    assert state.phase == last_winners
+
+    # Com o losers decidido, a grande final é liberada
+    while ready_matches(state, 'L'):
+        key = ready_matches(state, 'L')[0]
+        state.record_result(key, state.nodes[key].match['team1'])
+    assert not state.losers_pending()
+    assert state.advance_phase()
+    assert state.phase_name() == 'Grande Final'
+    assert state.nodes[('GF', 0, 0)].match['team2'] is not None
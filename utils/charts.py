@@ -0,0 +1,159 @@
+"""
+Gráficos de Estatísticas (matplotlib em processo separado)
+"""
+
+from io import BytesIO
+from typing import Any, Callable, List, Optional, Tuple
+
+from utils.render_cache import RenderCache, content_key
+from utils.render_pool import RenderPool
+
+# Mudou o desenho? Incrementar invalida os gráficos em cache
+CHARTS_VERSION = 1
+
+# Mesmo tema do chaveamento
+COR_FUNDO = '#2C2F33'
+COR_EIXOS = '#36393F'
+COR_DESTAQUE = '#7289DA'
+COR_TEXTO = '#FFFFFF'
+
+# =============================================
+# DESENHO (roda no processo de gráficos)
+# =============================================
+
+def _pyplot():
+    # Importado só no processo de gráficos: o bot nunca carrega o matplotlib
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _estilizar(eixo, titulo: str):
+    eixo.set_facecolor(COR_EIXOS)
+    eixo.set_title(titulo, color=COR_TEXTO, loc="left", fontsize=13)
+    eixo.tick_params(colors=COR_TEXTO, labelsize=9)
+    for borda in eixo.spines.values():
+        borda.set_color(COR_FUNDO)
+    eixo.grid(axis="y", color=COR_FUNDO, linewidth=0.8)
+    eixo.set_axisbelow(True)
+
+
+def render_painel(titulo: str, rodadas: List[tuple], placar: List[tuple], top: int = 8) -> Optional[bytes]:
+    """
+    Painel PNG com os gráficos que houver dados para desenhar
+
+    Args:
+        titulo: Título do painel (nome do evento)
+        rodadas: (rodada, time, colocacao, abates, pontos) das quedas LBFF
+        placar: (time, vitorias, derrotas) dos confrontos
+        top: Quantos times aparecem na evolução de pontos
+
+    Gráficos: evolução dos pontos acumulados (líderes), abates por queda e
+    aproveitamento nos confrontos. Retorna None se não houver nenhum dado.
+    """
+    import pandas as pd
+
+    graficos = []
+    if rodadas:
+        graficos += ["pontos", "abates"]
+    if placar:
+        graficos.append("aproveitamento")
+    if not graficos:
+        return None
+
+    plt = _pyplot()
+    figura, eixos = plt.subplots(len(graficos), 1, figsize=(10, 3.8 * len(graficos)), squeeze=False)
+    figura.patch.set_facecolor(COR_FUNDO)
+    figura.suptitle(titulo.upper(), color=COR_TEXTO, fontsize=16, x=0.06, ha="left")
+
+    for eixo, grafico in zip(eixos[:, 0], graficos):
+        if grafico == "pontos":
+            quedas = pd.DataFrame(rodadas, columns=["rodada", "time", "colocacao", "abates", "pontos"])
+            acumulado = quedas.pivot_table(
+                index="rodada", columns="time", values="pontos", aggfunc="sum", fill_value=0
+            ).cumsum()
+            lideres = acumulado.iloc[-1].sort_values(ascending=False).index[:top]
+            for time in lideres:
+                eixo.plot(acumulado.index, acumulado[time], marker="o", markersize=3, linewidth=1.8, label=time)
+            _estilizar(eixo, "Pontos acumulados")
+            eixo.set_xlabel("Queda", color=COR_TEXTO)
+            legenda = eixo.legend(fontsize=8, ncol=2, facecolor=COR_FUNDO, edgecolor=COR_FUNDO)
+            for texto in legenda.get_texts():
+                texto.set_color(COR_TEXTO)
+
+        elif grafico == "abates":
+            quedas = pd.DataFrame(rodadas, columns=["rodada", "time", "colocacao", "abates", "pontos"])
+            por_queda = quedas.groupby("rodada")["abates"].sum()
+            eixo.bar(por_queda.index, por_queda.values, color=COR_DESTAQUE)
+            _estilizar(eixo, "Abates por queda")
+            eixo.set_xlabel("Queda", color=COR_TEXTO)
+
+        else:
+            confrontos = pd.DataFrame(placar, columns=["time", "vitorias", "derrotas"])
+            confrontos["jogos"] = confrontos["vitorias"] + confrontos["derrotas"]
+            confrontos = confrontos[confrontos["jogos"] > 0].copy()
+            confrontos["aproveitamento"] = confrontos["vitorias"] / confrontos["jogos"] * 100
+            confrontos = confrontos.sort_values(["aproveitamento", "vitorias"]).tail(15)
+
+            barras = eixo.barh(confrontos["time"], confrontos["aproveitamento"], color=COR_DESTAQUE)
+            for barra, (vitorias, derrotas) in zip(barras, confrontos[["vitorias", "derrotas"]].values):
+                eixo.text(barra.get_width() + 1, barra.get_y() + barra.get_height() / 2,
+                          f"{vitorias}V {derrotas}D", va="center", color=COR_TEXTO, fontsize=8)
+            eixo.set_xlim(0, 115)
+            _estilizar(eixo, "Aproveitamento nos confrontos (%)")
+            eixo.grid(axis="x", color=COR_FUNDO, linewidth=0.8)
+
+    figura.tight_layout(rect=(0, 0, 1, 0.96))
+    buffer = BytesIO()
+    figura.savefig(buffer, format="png", dpi=100, facecolor=figura.get_facecolor())
+    plt.close(figura)
+    return buffer.getvalue()
+
+# =============================================
+# SERVIÇO (bot)
+# =============================================
+
+class ChartService:
+    """
+    Gera os gráficos em um processo próprio e guarda o PNG por versão
+
+    O processo de gráficos é criado no primeiro pedido e reaproveitado, então
+    o custo de importar matplotlib/pandas é pago uma vez e fora do bot. A
+    chave do cache é a versão dos dados do evento (não os dados), de modo que
+    um gráfico já desenhado não precisa nem reler o histórico do banco.
+    """
+
+    def __init__(self, cache: Optional[RenderCache] = None, timeout: float = 60.0):
+        # Um só worker: o matplotlib é pesado e os pedidos de /stats são raros.
+        # Sempre em processo e sem nova tentativa: se o processo morrer, o pedido
+        # falha (RenderFailed) em vez de desenhar com pyplot, que não é thread-safe,
+        # dentro do bot
+        self.pool = RenderPool(max_workers=1, max_queue=4, timeout=timeout,
+                               use_processes=True, retries=0, name="gráficos")
+        self.cache = cache or RenderCache(directory="cache/charts")
+
+    async def painel(self, versao: Any, titulo: str,
+                     carregar: Callable[[], Tuple[List[tuple], List[tuple]]]) -> Optional[bytes]:
+        """
+        PNG do painel de estatísticas
+
+        Args:
+            versao: Identifica o estado dos dados (ex.: guild, evento, versão da tabela)
+            titulo: Título do painel
+            carregar: Busca (rodadas, placar); só é chamada se o gráfico não estiver em cache
+
+        Raises:
+            RenderQueueFull, RenderTimeout, RenderFailed: vindos do pool de gráficos
+        """
+        chave = content_key(versao, titulo=titulo, grafico="painel", version=CHARTS_VERSION)
+        png = await self.cache.aget(chave)
+        if png is None:
+            rodadas, placar = carregar()
+            png = await self.pool.submit(render_painel, titulo, rodadas, placar)
+            if png:
+                await self.cache.aput(chave, png)
+        return png
+
+    def shutdown(self):
+        self.pool.shutdown()
@@ -0,0 +1,74 @@
+"""
+Fontes e Medidas de Texto (compartilhadas pelas imagens)
+"""
+
+import os
+from functools import lru_cache
+from typing import Tuple
+
+from loguru import logger
+from PIL import ImageFont
+
+# =============================================
+# REGISTRO DE FONTES
+# =============================================
+
+# Caminhos extras (separados por os.pathsep) testados antes das fontes padrão
+FONT_PATH_ENV = "FONT_PATH"
+DEFAULT_FONTS = ("arial.ttf", "DejaVuSans.ttf", "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf")
+
+ELLIPSIS = "…"
+
+
+def font_candidates() -> Tuple[str, ...]:
+    configured = os.getenv(FONT_PATH_ENV, "")
+    return tuple(path for path in configured.split(os.pathsep) if path) + DEFAULT_FONTS
+
+
+@lru_cache(maxsize=None)
+def load_font(size: int):
+    """
+    Fonte no tamanho pedido, carregada uma única vez por processo
+
+    Usa o primeiro arquivo de FONT_PATH/DEFAULT_FONTS que abrir; sem
+    nenhum, cai para a fonte padrão do Pillow no mesmo tamanho.
+    """
+    for path in font_candidates():
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            continue
+
+    logger.warning(f"Nenhuma fonte TrueType encontrada, usando a padrão (tamanho {size})")
+    return ImageFont.load_default(size)
+
+# =============================================
+# MEDIDAS DE TEXTO
+# =============================================
+
+@lru_cache(maxsize=16384)
+def text_width(text: str, size: int) -> float:
+    """Largura do texto em pixels"""
+    return load_font(size).getlength(text)
+
+
+@lru_cache(maxsize=16384)
+def fit_text(text: str, size: int, max_width: int) -> str:
+    """
+    Texto que cabe em `max_width` pixels
+
+    Nomes longos são cortados e terminam em reticências; o corte é uma
+    busca binária pelo maior prefixo que ainda cabe.
+    """
+    if text_width(text, size) <= max_width:
+        return text
+
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if text_width(text[:middle].rstrip() + ELLIPSIS, size) <= max_width:
+            low = middle
+        else:
+            high = middle - 1
+
+    return text[:low].rstrip() + ELLIPSIS if low else ELLIPSIS
@@ -0,0 +1,283 @@
+"""
+Motor de Pontuação LBFF (colocação + abates)
+"""
+
+import csv
+import io
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# =============================================
+# TABELA DE PONTUAÇÃO
+# =============================================
+
+# Pontos por colocação (índice 0 = 1º lugar)
+PONTOS_COLOCACAO = np.array([12, 9, 8, 7, 6, 5, 4, 3, 2, 1, 1, 1], dtype=np.int64)
+PONTOS_POR_ABATE = 1
+TIMES_POR_QUEDA = len(PONTOS_COLOCACAO)
+
+
+def calcular_pontos(colocacoes: np.ndarray, abates: np.ndarray) -> np.ndarray:
+    """Aplica a tabela LBFF a um vetor de colocações (1-12) e abates"""
+    return PONTOS_COLOCACAO[colocacoes - 1] + abates * PONTOS_POR_ABATE
+
+
+# =============================================
+# LOTE DE RESULTADOS
+# =============================================
+
+class LoteResultados:
+    """
+    Resultados de uma ou mais quedas em vetores paralelos
+
+    Cada posição i representa um time em uma queda: rodadas[i] (rótulo da
+    queda dentro do lote), times[i], colocacoes[i] e abates[i].
+    """
+
+    def __init__(self, rodadas: List[str], times: List[str], colocacoes: List[int], abates: List[int]):
+        if not times:
+            raise ValueError("Nenhum resultado informado!")
+
+        self.times = np.array(times, dtype=object)
+        self.colocacoes = np.array(colocacoes, dtype=np.int64)
+        self.abates = np.array(abates, dtype=np.int64)
+
+        # Rótulos das quedas -> índices 0..n-1 na ordem em que aparecem
+        rotulos, primeira_ocorrencia, self.rodadas = np.unique(
+            np.array(rodadas, dtype=object), return_index=True, return_inverse=True
+        )
+        ordem = np.argsort(np.argsort(primeira_ocorrencia))
+        self.rodadas = ordem[self.rodadas]
+        self.total_rodadas = len(rotulos)
+
+        self._validar()
+        self.pontos = calcular_pontos(self.colocacoes, self.abates)
+
+    def _validar(self):
+        if ((self.colocacoes < 1) | (self.colocacoes > TIMES_POR_QUEDA)).any():
+            raise ValueError(f"As colocações devem estar entre 1 e {TIMES_POR_QUEDA}!")
+        if (self.abates < 0).any():
+            raise ValueError("O número de abates não pode ser negativo!")
+
+        # Colocação e time repetidos na mesma queda
+        ordem = np.lexsort((self.colocacoes, self.rodadas))
+        rodadas, colocacoes = self.rodadas[ordem], self.colocacoes[ordem]
+        repetidas = (rodadas[1:] == rodadas[:-1]) & (colocacoes[1:] == colocacoes[:-1])
+        if repetidas.any():
+            raise ValueError(f"Colocação {colocacoes[1:][repetidas][0]}º repetida na mesma queda!")
+
+        chaves = set()
+        for rodada, time in zip(self.rodadas.tolist(), self.times.tolist()):
+            if (rodada, time) in chaves:
+                raise ValueError(f"O time '{time}' aparece duas vezes na mesma queda!")
+            chaves.add((rodada, time))
+
+    @staticmethod
+    def from_texto(texto: str) -> "LoteResultados":
+        """
+        Lê uma única queda no formato `Time:colocação:abates`
+
+        As entradas são separadas por `;` ou quebra de linha.
+        """
+        times, colocacoes, abates = [], [], []
+        for entrada in texto.replace("\n", ";").split(";"):
+            entrada = entrada.strip()
+            if not entrada:
+                continue
+            try:
+                time, colocacao, kills = entrada.rsplit(":", 2)
+                colocacoes.append(int(colocacao))
+                abates.append(int(kills))
+            except ValueError:
+                raise ValueError(f"Entrada inválida: '{entrada}' (use Time:colocação:abates)")
+            times.append(time.strip())
+
+        return LoteResultados(["1"] * len(times), times, colocacoes, abates)
+
+    @staticmethod
+    def from_csv(conteudo: bytes) -> "LoteResultados":
+        """
+        Lê um CSV com as colunas `time`, `colocacao`, `abates` e opcionalmente `rodada`
+
+        Sem a coluna `rodada`, todas as linhas formam uma única queda.
+        """
+        texto = conteudo.decode("utf-8-sig")
+        cabecalho = texto.split("\n", 1)[0]
+        delimitador = ";" if cabecalho.count(";") > cabecalho.count(",") else ","
+        leitor = csv.DictReader(io.StringIO(texto), delimiter=delimitador)
+
+        def coluna(linha: dict, *nomes: str) -> Optional[str]:
+            for nome in nomes:
+                if nome in linha and linha[nome] is not None:
+                    return linha[nome].strip()
+            return None
+
+        leitor.fieldnames = [(nome or "").strip().lower() for nome in (leitor.fieldnames or [])]
+        rodadas, times, colocacoes, abates = [], [], [], []
+        for numero, linha in enumerate(leitor, start=2):
+            time = coluna(linha, "time", "equipe")
+            colocacao = coluna(linha, "colocacao", "colocação", "posicao", "posição")
+            kills = coluna(linha, "abates", "kills")
+            if not time or colocacao is None or kills is None:
+                raise ValueError(f"Linha {numero} do CSV incompleta!")
+            try:
+                colocacoes.append(int(colocacao))
+                abates.append(int(kills))
+            except ValueError:
+                raise ValueError(f"Linha {numero} do CSV com número inválido!")
+            rodadas.append(coluna(linha, "rodada", "queda") or "1")
+            times.append(time)
+
+        return LoteResultados(rodadas, times, colocacoes, abates)
+
+    def linhas(self, primeira_rodada: int) -> List[Tuple[int, str, int, int, int]]:
+        """Linhas (rodada, time, colocação, abates, pontos) numeradas a partir de `primeira_rodada`"""
+        return list(zip(
+            (self.rodadas + primeira_rodada).tolist(),
+            self.times.tolist(),
+            self.colocacoes.tolist(),
+            self.abates.tolist(),
+            self.pontos.tolist()
+        ))
+
+    def totais(self) -> List[Tuple[str, int, int, int, int]]:
+        """Soma por time do lote: (time, pontos, abates, booyahs, quedas)"""
+        nomes, indices = np.unique(self.times, return_inverse=True)
+        tamanho = len(nomes)
+
+        pontos = np.bincount(indices, weights=self.pontos, minlength=tamanho).astype(np.int64)
+        abates = np.bincount(indices, weights=self.abates, minlength=tamanho).astype(np.int64)
+        booyahs = np.bincount(indices, weights=self.colocacoes == 1, minlength=tamanho).astype(np.int64)
+        quedas = np.bincount(indices, minlength=tamanho)
+
+        return list(zip(nomes.tolist(), pontos.tolist(), abates.tolist(), booyahs.tolist(), quedas.tolist()))
+
+
+# =============================================
+# AGENDA DE SALAS (BATTLE ROYALE)
+# =============================================
+
+class AgendaSalas:
+    """
+    Distribui os times em salas de até 12 e faz o rodízio entre as rodadas
+
+    Guarda uma matriz de encontros (quantas vezes cada par de times já
+    dividiu sala). A cada rodada os times são colocados, um por vez, na sala
+    com vaga onde menos reencontram adversários, de modo que os pares se
+    enfrentem com frequência parecida ao longo da competição.
+    """
+
+    def __init__(self, times: List[str], tamanho_sala: int = TIMES_POR_QUEDA, semente: Optional[int] = None):
+        if len(times) < 2:
+            raise ValueError("São necessários pelo menos 2 times!")
+        if len(set(times)) != len(times):
+            raise ValueError("Há times repetidos na lista!")
+        if not 2 <= tamanho_sala <= TIMES_POR_QUEDA:
+            raise ValueError(f"O tamanho da sala deve estar entre 2 e {TIMES_POR_QUEDA}!")
+
+        self.times = list(times)
+        self.rng = np.random.default_rng(semente)
+
+        total = len(self.times)
+        self.total_salas = -(-total // tamanho_sala)
+        # Salas com tamanhos equilibrados (diferença máxima de 1 time)
+        base, sobra = divmod(total, self.total_salas)
+        self.capacidades = np.array([base + (1 if s < sobra else 0) for s in range(self.total_salas)])
+
+        self.encontros = np.zeros((total, total), dtype=np.int32)
+        self.rodadas: List[List[List[str]]] = []
+
+    def proxima_rodada(self) -> List[List[str]]:
+        """Sorteia a próxima rodada e atualiza a matriz de encontros"""
+        total = len(self.times)
+        # custo[t, s]: encontros anteriores de t com quem já está na sala s
+        custo = np.zeros((total, self.total_salas), dtype=np.float64)
+        ocupacao = np.zeros(self.total_salas, dtype=np.int64)
+        salas: List[List[int]] = [[] for _ in range(self.total_salas)]
+
+        # Quem mais acumulou encontros escolhe primeiro; empates no sorteio
+        ordem = np.lexsort((self.rng.random(total), -self.encontros.sum(axis=1)))
+        for t in ordem:
+            opcoes = custo[t] + self.rng.random(self.total_salas) * 1e-3
+            opcoes[ocupacao >= self.capacidades] = np.inf
+            s = int(np.argmin(opcoes))
+
+            salas[s].append(int(t))
+            ocupacao[s] += 1
+            custo[:, s] += self.encontros[:, t]
+
+        self._melhorar_por_trocas(salas, custo)
+
+        for membros in salas:
+            indices = np.array(membros)
+            self.encontros[np.ix_(indices, indices)] += 1
+        np.fill_diagonal(self.encontros, 0)
+
+        rodada = [[self.times[t] for t in membros] for membros in salas]
+        self.rodadas.append(rodada)
+        return rodada
+
+    def _melhorar_por_trocas(self, salas: List[List[int]], custo: np.ndarray, max_passadas: int = 20):
+        """
+        Troca pares de times entre salas enquanto isso reduzir os reencontros
+
+        A cada passada o ganho de todas as trocas possíveis é calculado de uma
+        vez (matriz times x times) e são aplicadas as melhores trocas que não
+        compartilham sala, já que essas não alteram o ganho umas das outras.
+        """
+        total = len(self.times)
+        sala_de = np.empty(total, dtype=np.int64)
+        for s, membros in enumerate(salas):
+            sala_de[membros] = s
+        todos = np.arange(total)
+
+        for _ in range(max_passadas):
+            proprio = custo[todos, sala_de]
+            # ganho[t, u]: variação de reencontros se t e u trocarem de sala
+            cruzado = custo[:, sala_de]
+            ganho = cruzado + cruzado.T - 2 * self.encontros - proprio[:, None] - proprio[None, :]
+            ganho[sala_de[:, None] == sala_de[None, :]] = 0
+
+            candidatos = np.flatnonzero(ganho < 0)
+            if candidatos.size == 0:
+                return
+            candidatos = candidatos[np.argsort(ganho.ravel()[candidatos], kind='stable')]
+
+            usadas = set()
+            for posicao in candidatos:
+                t, u = divmod(int(posicao), total)
+                a, b = int(sala_de[t]), int(sala_de[u])
+                if a in usadas or b in usadas:
+                    continue
+                usadas.update((a, b))
+
+                salas[a][salas[a].index(t)] = u
+                salas[b][salas[b].index(u)] = t
+                sala_de[t], sala_de[u] = b, a
+                custo[:, a] += self.encontros[:, u] - self.encontros[:, t]
+                custo[:, b] += self.encontros[:, t] - self.encontros[:, u]
+                if len(usadas) >= self.total_salas - 1:
+                    break
+
+    def gerar(self, rodadas: int) -> List[List[List[str]]]:
+        """Gera várias rodadas seguidas"""
+        return [self.proxima_rodada() for _ in range(rodadas)]
+
+    def resumo_encontros(self) -> Tuple[int, int, float]:
+        """(mínimo, máximo, média) de encontros entre pares distintos de times"""
+        pares = self.encontros[np.triu_indices(len(self.times), k=1)]
+        return int(pares.min()), int(pares.max()), float(pares.mean())
+
+    def modelo_csv(self, primeira_rodada: int = 1) -> str:
+        """
+        CSV pronto para preencher e enviar no /resultado
+
+        Cada sala de cada rodada vira uma queda (`rodada` = "R1-S1", "R1-S2"...),
+        e as colunas colocacao/abates ficam em branco.
+        """
+        linhas = ["rodada;time;colocacao;abates"]
+        for numero, rodada in enumerate(self.rodadas, start=primeira_rodada):
+            for sala, times in enumerate(rodada, start=1):
+                linhas.extend(f"R{numero}-S{sala};{time};;" for time in times)
+        return "\n".join(linhas) + "\n"
@@ -0,0 +1,197 @@
+"""
+Cache de Imagens Renderizadas (endereçado por conteúdo)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+# =============================================
+# CHAVES
+# =============================================
+
+def content_key(payload: Any, **options: Any) -> str:
+    """
+    Hash sha256 do conteúdo desenhado + opções de layout
+
+    O JSON é canônico (chaves ordenadas, sem espaços), então dados iguais
+    geram sempre a mesma chave, no bot e no dashboard.
+    """
+    canonical = json.dumps(
+        {"payload": payload, "options": options},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+# =============================================
+# CACHE EM MEMÓRIA + DISCO
+# =============================================
+
+class RenderCache:
+    """
+    Bytes de imagens indexados pela chave de conteúdo
+
+    Memória: LRU limitada por bytes. Disco: um arquivo por chave, com limite
+    de tamanho total; os arquivos menos usados (mtime mais antigo) saem
+    primeiro. O diretório pode ser compartilhado entre processos (bot e
+    dashboard): as gravações são atômicas.
+    """
+
+    def __init__(self, directory: str = "cache/renders", memory_limit: int = 64 * 1024 * 1024,
+                 disk_limit: int = 512 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.memory_limit = memory_limit
+        self.disk_limit = disk_limit
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_size = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._disk: "OrderedDict[str, int]" = OrderedDict()  # chave -> tamanho, do mais antigo ao mais novo
+        self._disk_size = 0
+        self._disk_lock = threading.Lock()  # leituras/gravações em disco rodam em threads
+        self._scan_disk()
+
+    def _scan_disk(self):
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            entries = [entry for entry in os.scandir(self.directory) if entry.is_file() and len(entry.name) == 64]
+        except OSError as e:
+            logger.warning(f"Cache de imagens em disco indisponível: {e}")
+            self.disk_limit = 0
+            return
+
+        for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime):
+            size = entry.stat().st_size
+            self._disk[entry.name] = size
+            self._disk_size += size
+
+    # ---------- Memória ----------
+
+    def _remember(self, key: str, data: bytes):
+        if len(data) > self.memory_limit:
+            return
+        if key in self._memory:
+            self._memory_size -= len(self._memory.pop(key))
+        self._memory[key] = data
+        self._memory_size += len(data)
+        while self._memory_size > self.memory_limit:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+
+    def get_memory(self, key: str) -> Optional[bytes]:
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+        return data
+
+    # ---------- Disco ----------
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if not self.disk_limit:
+            return None
+        with self._disk_lock:
+            return self._read_disk_locked(key)
+
+    def _read_disk_locked(self, key: str) -> Optional[bytes]:
+        path = self.directory / key
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            # Apagado por outro processo ou nunca gravado aqui
+            if key in self._disk:
+                self._disk_size -= self._disk.pop(key)
+            return None
+
+        if key in self._disk:
+            self._disk.move_to_end(key)
+        else:
+            self._disk[key] = len(data)
+            self._disk_size += len(data)
+        return data
+
+    def _write_disk(self, key: str, data: bytes):
+        if not self.disk_limit or len(data) > self.disk_limit:
+            return
+        with self._disk_lock:
+            self._write_disk_locked(key, data)
+
+    def _write_disk_locked(self, key: str, data: bytes):
+        path = self.directory / key
+        temporary = path.with_name(f"{key}.{os.getpid()}.tmp")
+        try:
+            temporary.write_bytes(data)
+            os.replace(temporary, path)
+        except OSError as e:
+            logger.warning(f"Falha ao gravar imagem no cache: {e}")
+            return
+
+        if key in self._disk:
+            self._disk_size -= self._disk.pop(key)
+        self._disk[key] = len(data)
+        self._disk_size += len(data)
+
+        while self._disk_size > self.disk_limit and self._disk:
+            evicted, size = self._disk.popitem(last=False)
+            self._disk_size -= size
+            try:
+                (self.directory / evicted).unlink()
+            except OSError:
+                pass
+
+    # ---------- API ----------
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Memória primeiro, depois disco (o que vem do disco volta para a memória)"""
+        data = self.get_memory(key)
+        if data is not None:
+            return data
+
+        return self._after_disk_read(key, self._read_disk(key))
+
+    def _after_disk_read(self, key: str, data: Optional[bytes]) -> Optional[bytes]:
+        if data is None:
+            self.misses += 1
+            return None
+
+        self.disk_hits += 1
+        self._remember(key, data)
+        return data
+
+    def put(self, key: str, data: bytes):
+        self._remember(key, data)
+        self._write_disk(key, data)
+
+    async def aget(self, key: str) -> Optional[bytes]:
+        """Como get, mas a leitura do disco roda fora do event loop"""
+        data = self.get_memory(key)
+        if data is not None:
+            return data
+        return self._after_disk_read(key, await asyncio.to_thread(self._read_disk, key))
+
+    async def aput(self, key: str, data: bytes):
+        self._remember(key, data)
+        await asyncio.to_thread(self._write_disk, key, data)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_size,
+            "disk_entries": len(self._disk),
+            "disk_bytes": self._disk_size
+        }
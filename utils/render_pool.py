@@ -0,0 +1,292 @@
+"""
+Fila de Renderização de Imagens (pool de processos)
+"""
+
+import asyncio
+import multiprocessing
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+
+# =============================================
+# ERROS
+# =============================================
+
+class RenderQueueFull(Exception):
+    """A fila de renderização atingiu o limite de pedidos pendentes"""
+
+
+class RenderTimeout(Exception):
+    """A renderização passou do tempo limite"""
+
+
+class RenderFailed(Exception):
+    """O processo de renderização morreu (crash, falta de memória) e a nova tentativa também falhou"""
+
+# =============================================
+# PROCESSO DE RENDERIZAÇÃO
+# =============================================
+
+def _worker_main(connection):
+    """Laço do processo: recebe (func, args) e devolve (True, resultado) ou (False, exceção)"""
+    while True:
+        try:
+            job = connection.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+
+        func, args = job
+        try:
+            reply = (True, func(*args))
+        except Exception as error:
+            reply = (False, error)
+        try:
+            connection.send(reply)
+        except Exception as error:
+            # Resultado ou exceção que não passa pelo pickle
+            connection.send((False, RuntimeError(f"{type(error).__name__}: {error}")))
+
+
+class _ProcessWorker(Executor):
+    """
+    Um processo de renderização (spawn) com um pipe só dele
+
+    O processo é nosso, não de um ProcessPoolExecutor: kill() interrompe o
+    trabalho em andamento pela API pública do multiprocessing. Cada trabalho
+    espera a resposta no pipe em uma thread; se o processo morrer (kill,
+    crash, falta de memória), o trabalho falha com BrokenProcessPool.
+    """
+
+    def __init__(self, name: str):
+        context = multiprocessing.get_context("spawn")
+        self._connection, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child,), name=name, daemon=True)
+        self.process.start()
+        child.close()
+        self._waiter = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{name}-pipe")
+
+    def _call(self, func: Callable, args: tuple) -> Any:
+        try:
+            self._connection.send((func, args))
+            ok, value = self._connection.recv()
+        except (EOFError, OSError) as error:
+            raise BrokenProcessPool(f"Processo {self.process.name} encerrado (código {self.process.exitcode})") from error
+        if not ok:
+            raise value
+        return value
+
+    def submit(self, fn, /, *args, **kwargs):
+        return self._waiter.submit(self._call, fn, args)
+
+    def kill(self):
+        """Encerra o processo, inclusive no meio de um trabalho"""
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        self._waiter.shutdown(wait=False, cancel_futures=cancel_futures)
+        self.kill()
+
+# =============================================
+# POOL DE RENDERIZAÇÃO
+# =============================================
+
+class RenderPool:
+    """
+    Executa renderizações fora do event loop
+
+    Cada worker é um processo próprio (o Pillow não trava o loop nem
+    disputa o GIL com o bot) que roda um trabalho por vez. No máximo
+    `max_workers` rodam ao mesmo tempo e até `max_queue` esperam na fila;
+    além disso o pedido é recusado com RenderQueueFull. As funções e
+    argumentos precisam ser picklable (dados simples, sem objetos do banco).
+
+    Um trabalho que estoura o tempo (ou é cancelado) tem o processo
+    encerrado e o worker recriado; a vaga só é liberada quando o trabalho
+    de fato termina, então a fila nunca passa do limite. Se o processo morrer no meio, o trabalho
+    é repetido `retries` vezes em um processo novo, nunca no processo do bot.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 8, timeout: float = 30.0,
+                 use_processes: bool = True, retries: int = 1, name: str = "render"):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.use_processes = use_processes
+        self.retries = retries
+        self.name = name
+
+        # Um executor de um processo por worker: recriar um não derruba os outros
+        self._executors: List[Optional[Executor]] = [None] * max_workers
+        self._slots = [asyncio.Lock() for _ in range(max_workers)]
+        self._queued = [0] * max_workers
+        self._pending = 0
+
+        # Métricas (latência = espera na fila + renderização, inclusive dos que estouraram o tempo)
+        self._latencies = deque(maxlen=500)
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.recycled = 0
+
+    def _get_executor(self, index: int) -> Executor:
+        if self._executors[index] is None:
+            if self.use_processes:
+                # spawn: fork copiaria o event loop e as threads do bot no meio do trabalho
+                self._executors[index] = _ProcessWorker(f"{self.name}-{index}")
+            else:
+                self._executors[index] = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix=f"{self.name}-{index}"
+                )
+        return self._executors[index]
+
+    def _recycle(self, index: int, kill: bool = False):
+        """
+        Descarta o executor do worker
+
+        O processo próprio sempre é encerrado (com `kill`, no meio de um
+        trabalho abandonado por timeout ou cancelamento).
+        """
+        executor = self._executors[index]
+        self._executors[index] = None
+        if executor is None:
+            return
+
+        if kill and not isinstance(executor, _ProcessWorker):
+            # Thread não tem como ser interrompida: o worker segue ocupado até o trabalho acabar
+            logger.warning(f"Renderização abandonada em {self.name}-{index} continua rodando em thread")
+        # No processo próprio, shutdown encerra o processo (e o trabalho abandonado junto)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _pick_worker(self, key: Optional[str]) -> int:
+        if key is not None:
+            # Mesma chave, mesmo processo: os caches em memória do worker continuam valendo
+            return zlib.crc32(key.encode('utf-8')) % self.max_workers
+        return min(range(self.max_workers), key=lambda index: self._queued[index])
+
+    def _release(self, index: int):
+        self._slots[index].release()
+        self._queued[index] -= 1
+        self._pending -= 1
+
+    def _release_abandoned(self, index: int, job: asyncio.Future):
+        if not job.cancelled():
+            job.exception()  # já tratado (ou ninguém mais espera); evita o aviso de exceção não lida
+        self._release(index)
+
+    async def submit(self, func: Callable, *args: Any, key: Optional[str] = None) -> Any:
+        """
+        Roda func(*args) no pool e devolve o resultado
+
+        Com `key`, o trabalho vai sempre para o mesmo worker (ex.: a lineage
+        de uma chave, cuja última imagem fica em cache naquele processo).
+
+        Raises:
+            RenderQueueFull: já há trabalhos demais esperando
+            RenderTimeout: o trabalho passou de `timeout` segundos
+            RenderFailed: o processo morreu em todas as tentativas
+        """
+        if self._pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise RenderQueueFull("Fila de renderização cheia")
+
+        index = self._pick_worker(key)
+        self._pending += 1
+        self._queued[index] += 1
+        started = time.perf_counter()
+
+        try:
+            await self._slots[index].acquire()
+        except BaseException:
+            self._queued[index] -= 1
+            self._pending -= 1
+            raise
+
+        job = None
+        try:
+            attempt = 0
+            while True:
+                job = asyncio.wrap_future(self._get_executor(index).submit(func, *args))
+                try:
+                    # shield: o timeout não cancela o trabalho, quem cuida dele é o _recycle
+                    result = await asyncio.wait_for(asyncio.shield(job), timeout=self.timeout)
+                    break
+                except asyncio.TimeoutError:
+                    self.timeouts += 1
+                    self._latencies.append(time.perf_counter() - started)
+                    self._recycle(index, kill=True)
+                    self.recycled += 1
+                    raise RenderTimeout(f"Renderização passou de {self.timeout:g}s")
+                except asyncio.CancelledError:
+                    # Ninguém mais espera o resultado: o processo não segue ocupado com ele
+                    self._recycle(index, kill=True)
+                    self.recycled += 1
+                    raise
+                except BrokenProcessPool:
+                    self.failures += 1
+                    self._recycle(index)
+                    self.recycled += 1
+                    if attempt >= self.retries:
+                        raise RenderFailed(f"Processo de renderização morreu ({func.__qualname__})")
+                    attempt += 1
+                    logger.error("Processo de renderização morreu, tentando de novo em um processo novo")
+        finally:
+            if job is None or job.done():
+                self._release(index)
+            else:
+                # Timeout ou cancelamento: a vaga continua ocupada até o processo largar o trabalho
+                job.add_done_callback(lambda done: self._release_abandoned(index, done))
+
+        latency = time.perf_counter() - started
+        self._latencies.append(latency)
+        self.completed += 1
+        logger.debug(f"Renderização concluída em {latency * 1000:.0f} ms ({func.__qualname__})")
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores e latências (ms) das últimas renderizações"""
+        latencies = sorted(self._latencies)
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 1)
+
+        return {
+            "pending": self._pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "recycled": self.recycled,
+            "latency_p50_ms": percentile(0.50),
+            "latency_p95_ms": percentile(0.95),
+            "latency_max_ms": percentile(1.0)
+        }
+
+    def summary(self) -> str:
+        """Uma linha com as métricas, para log e para o comando de status"""
+        stats = self.stats()
+        latency = " / ".join(
+            "-" if stats[key] is None else f"{stats[key]:.0f}"
+            for key in ("latency_p50_ms", "latency_p95_ms", "latency_max_ms")
+        )
+        return (
+            f"{self.name}: latência p50/p95/máx {latency} ms | {stats['completed']} concluídas, "
+            f"{stats['pending']} pendentes, {stats['rejected']} recusadas, {stats['timeouts']} timeouts, "
+            f"{stats['failures']} falhas"
+        )
+
+    def shutdown(self):
+        """Encerra os processos do pool (sem esperar trabalhos pendentes)"""
+        for index in range(self.max_workers):
+            self._recycle(index, kill=True)
@@ -0,0 +1,94 @@
+"""
+Imagem da Classificação LBFF (/tabela)
+"""
+
+from io import BytesIO
+from typing import List, Optional
+
+from PIL import Image, ImageDraw
+
+from utils.fonts import fit_text, load_font
+from utils.render_cache import RenderCache, content_key
+
+# Dimensões e cores (mesmo tema do chaveamento)
+LARGURA = 760
+ALTURA_TITULO = 70
+ALTURA_LINHA = 36
+MARGEM = 20
+COR_FUNDO = '#2C2F33'
+COR_LINHA_ALTERNADA = '#36393F'
+COR_DESTAQUE = '#7289DA'
+COR_TEXTO = '#FFFFFF'
+
+# (título, posição x, alinhamento à direita)
+COLUNAS = [
+    ("#", 30, False),
+    ("Time", 80, False),
+    ("Quedas", 470, True),
+    ("Booyahs", 560, True),
+    ("Abates", 645, True),
+    ("Pontos", 735, True),
+]
+
+# Mudou o desenho? Incrementar invalida as imagens em cache
+CLASSIFICACAO_VERSION = 1
+
+# Mesmo cache das chaves (memória + disco, com limite e LRU)
+render_cache = RenderCache()
+
+
+def render_classificacao(nome_tabela: str, linhas: List[tuple]) -> bytes:
+    """
+    Desenha a classificação e retorna os bytes do PNG
+
+    Args:
+        nome_tabela: Título exibido no topo
+        linhas: (time, pontos, abates, booyahs, quedas) já ordenadas
+    """
+    altura = ALTURA_TITULO + ALTURA_LINHA * (len(linhas) + 1) + MARGEM
+    img = Image.new('RGB', (LARGURA, altura), color=COR_FUNDO)
+    draw = ImageDraw.Draw(img)
+
+    fonte = load_font(16)
+    fonte_titulo = load_font(24)
+
+    draw.text((MARGEM, 22), nome_tabela.upper(), fill=COR_TEXTO, font=fonte_titulo)
+
+    def escrever(y: int, valores: list, cor: str):
+        for (_, x, direita), valor in zip(COLUNAS, valores):
+            texto = str(valor)
+            if direita:
+                x -= draw.textlength(texto, font=fonte)
+            draw.text((x, y + 9), texto, fill=cor, font=fonte)
+
+    y = ALTURA_TITULO
+    draw.rectangle([(MARGEM, y), (LARGURA - MARGEM, y + ALTURA_LINHA)], fill=COR_DESTAQUE)
+    escrever(y, [titulo for titulo, _, _ in COLUNAS], COR_TEXTO)
+
+    # Espaço da coluna Time até o início da coluna Quedas
+    largura_time = COLUNAS[2][1] - COLUNAS[1][1] - 60
+
+    for posicao, (time, pontos, abates, booyahs, quedas) in enumerate(linhas, start=1):
+        y += ALTURA_LINHA
+        if posicao % 2 == 0:
+            draw.rectangle([(MARGEM, y), (LARGURA - MARGEM, y + ALTURA_LINHA)], fill=COR_LINHA_ALTERNADA)
+        escrever(y, [posicao, fit_text(time, 16, largura_time), quedas, booyahs, abates, pontos], COR_TEXTO)
+
+    buffer = BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def chave_cache(guild_id: str, nome_tabela: str, versao: int) -> str:
+    """Chave da imagem: a versão da tabela muda a cada resultado registrado"""
+    return content_key([guild_id, nome_tabela, versao], imagem="classificacao", version=CLASSIFICACAO_VERSION)
+
+
+async def imagem_em_cache(guild_id: str, nome_tabela: str, versao: int) -> Optional[bytes]:
+    """Retorna o PNG já renderizado para a versão atual da tabela"""
+    return await render_cache.aget(chave_cache(guild_id, nome_tabela, versao))
+
+
+async def guardar_imagem(guild_id: str, nome_tabela: str, versao: int, imagem: bytes):
+    """Guarda o PNG da versão atual (os de versões anteriores saem pela LRU)"""
+    await render_cache.aput(chave_cache(guild_id, nome_tabela, versao), imagem)